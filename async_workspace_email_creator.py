@@ -0,0 +1,384 @@
+#!/usr/bin/env python3
+"""
+Asinxron (asyncio) Workspace email creator
+Yuzlab Directory API so'rovlarini bitta thread'da parallel bajarish uchun:
+thread va httplib2 ulanishi o'rniga aiohttp'ning umumiy keep-alive pool'i ishlatiladi
+"""
+
+import asyncio
+import gzip
+import json
+import time
+from urllib.parse import quote
+
+import httplib2
+from googleapiclient.errors import HttpError
+
+from workspace_email_creator import (
+    EMAIL_SHARD_PREFIXES, HTTP_TIMEOUT, MAX_PAGE_SIZE, MAX_RETRIES, PATCH_MAX_KEYS,
+    RECOVERY_FIELDS, RESPONSE_FIELDS, USER_SUMMARY_FIELDS, WorkspaceEmailCreator, _is_rate_limited, _is_retriable, _may_have_applied, _retry_after, _with_retry_stats
+)
+
+try:
+    import aiohttp
+except ImportError:  # ixtiyoriy dependency
+    aiohttp = None
+
+DIRECTORY_API_URL = 'https://admin.googleapis.com/'
+
+# Bir vaqtda bajariladigan so'rovlar soni (config'dagi "async_concurrency")
+DEFAULT_CONCURRENCY = 100
+
+# Google javobni faqat User-Agent'da "gzip" bo'lsa siqadi
+USER_AGENT = 'workspace-email-creator (gzip)'
+
+# Ledger'ga bitta tranzaksiyada yoziladigan yozuvlar soni
+LEDGER_FLUSH_SIZE = 500
+
+
+class AsyncWorkspaceEmailCreator:
+    """WorkspaceEmailCreator'ning asyncio varianti
+
+    Config, reestr, metrikalar va audit log sinxron creator bilan umumiy.
+    Misol:
+        async with AsyncWorkspaceEmailCreator("mycompany.com") as creator:
+            results = await creator.create_multiple_users(users_data)
+    """
+
+    def __init__(self, domain, config_file="workspace_config.json", concurrency=None):
+        if aiohttp is None:
+            raise ImportError("AsyncWorkspaceEmailCreator uchun aiohttp kerak: pip install aiohttp")
+
+        self.creator = WorkspaceEmailCreator(domain, config_file=config_file)
+        self.domain = domain
+        self.config = self.creator.config
+        self.logger = self.creator.logger
+        self.metrics = self.creator.metrics
+        self.ledger = self.creator.ledger
+        self.rate_limiter = self.creator.rate_limiter
+
+        self.concurrency = concurrency or self.config.get('async_concurrency', DEFAULT_CONCURRENCY)
+        api_endpoint = self.config.get('api_endpoint') or DIRECTORY_API_URL
+        self.base_url = api_endpoint.rstrip('/') + '/admin/directory/v1/'
+        self._session = None
+        self._semaphore = None
+        # create_multiple_users'dagi reestr yozuvlari bilan birga nusxaga yoziladigan yozuvlar
+        self._mirror_pending = []
+
+    async def __aenter__(self):
+        await self.authenticate()
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def authenticate(self):
+        """Credentials'ni yuklash (OAuth flow kerak bo'lsa, alohida thread'da)"""
+        if not self.creator.service:
+            await asyncio.get_running_loop().run_in_executor(None, self.creator.authenticate)
+
+    async def close(self):
+        """HTTP ulanishlar pool'ini yopish"""
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    def _get_session(self):
+        """Umumiy aiohttp sessiyasi (birinchi so'rovda, joriy event loop ichida yaratiladi)"""
+        if self._session is None:
+            connector = aiohttp.TCPConnector(limit=self.concurrency, keepalive_timeout=30)
+            timeout = aiohttp.ClientTimeout(total=self.config.get('http_timeout', HTTP_TIMEOUT))
+            # Javob o'zimiz ochamiz - tarmoqdagi (siqilgan) hajmni o'lchash uchun
+            self._session = aiohttp.ClientSession(
+                connector=connector, timeout=timeout, auto_decompress=False,
+                headers={'Accept-Encoding': 'gzip', 'User-Agent': USER_AGENT})
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+        return self._session
+
+    async def _headers(self):
+        """Authorization sarlavhasi; muddati o'tgan token alohida thread'da yangilanadi"""
+        credentials = self.creator.credentials
+        if credentials is None:
+            return {}
+        if not credentials.valid:
+            await asyncio.get_running_loop().run_in_executor(
+                None, self.creator._refresh_credentials)
+        return {'Authorization': f"Bearer {credentials.token}"}
+
+    @staticmethod
+    def _is_retriable(error):
+        return _is_retriable(error) or isinstance(error, aiohttp.ClientConnectionError)
+
+    async def _request(self, method_name, method, path, params=None, body=None, stats=None):
+        """Bitta Directory API so'rovi: semaphore, rate limiter, qayta urinishlar va backoff
+
+        Xatolar sinxron creator'dagi kabi googleapiclient HttpError sifatida ko'tariladi.
+        fields berilmagan bo'lsa, sinxron creator'dagi RESPONSE_FIELDS field mask'i qo'shiladi.
+        """
+        if stats is None:
+            stats = {}
+        stats.setdefault('retries', 0)
+        stats.setdefault('backoff_seconds', 0.0)
+        stats.setdefault('first_attempt', time.time())
+        max_retries = self.config.get('max_retries', MAX_RETRIES)
+        url = self.base_url + path
+        params = {key: value for key, value in (params or {}).items() if value is not None}
+        if 'fields' not in params and method_name in RESPONSE_FIELDS:
+            params['fields'] = RESPONSE_FIELDS[method_name]
+        data = json.dumps(body).encode('utf-8') if body is not None else None
+        session = self._get_session()
+
+        attempt = 0
+        async with self._semaphore:
+            with self.metrics.in_flight('api_in_flight', method=method_name):
+                while True:
+                    waited = self.rate_limiter.reserve()
+                    if waited:
+                        self.metrics.observe('rate_limit_wait_seconds', waited)
+                        await asyncio.sleep(waited)
+
+                    headers = await self._headers()
+                    if data is not None:
+                        headers['Content-Type'] = 'application/json'
+                        self.metrics.inc('api_wire_bytes_total', len(data), method=method_name,
+                                         direction='sent')
+                    started = time.perf_counter()
+                    try:
+                        async with session.request(method, url, params=params, data=data,
+                                                   headers=headers) as response:
+                            content = await response.read()
+                            self.metrics.inc('api_wire_bytes_total', len(content),
+                                             method=method_name, direction='received')
+                            if response.headers.get('Content-Encoding') == 'gzip':
+                                content = gzip.decompress(content)
+                            if response.status >= 400:
+                                resp = httplib2.Response(dict(response.headers))
+                                resp.status = response.status
+                                raise HttpError(resp, content, uri=str(response.url))
+                    except Exception as e:
+                        self.creator._record_call(method_name, started, e)
+                        if not self._is_retriable(e) or attempt >= max_retries:
+                            raise
+                        if _may_have_applied(e):
+                            stats['unanswered'] = stats.get('unanswered', 0) + 1
+
+                        retry_after = _retry_after(e)
+                        if _is_rate_limited(e):
+                            self.rate_limiter.on_throttle(retry_after)
+
+                        delay = self.creator._retry_delay(attempt, retry_after)
+                        attempt += 1
+                        stats['retries'] += 1
+                        stats['backoff_seconds'] += delay
+                        self.creator._record_retry(method_name, e, delay)
+                        self.logger.warning(
+                            f"Retrying after error ({attempt}/{max_retries}, {delay:.2f}s): {str(e)}")
+                        await asyncio.sleep(delay)
+                        continue
+
+                    self.creator._record_call(method_name, started)
+                    self.rate_limiter.on_success()
+                    return self._parse(method_name, content)
+
+    def _parse(self, method_name, content):
+        """JSON javobni o'qish (vaqti va ochilgan hajmi metrikaga yoziladi)"""
+        started = time.perf_counter()
+        try:
+            return json.loads(content) if content else {}
+        finally:
+            self.metrics.observe('response_parse_seconds', time.perf_counter() - started,
+                                 method=method_name)
+            self.metrics.inc('api_response_bytes_total', len(content), method=method_name)
+
+    @staticmethod
+    def _user_path(email):
+        return 'users/' + quote(email, safe='@')
+
+    async def create_user(self, first_name, last_name, username=None, custom_password=None,
+                          pending=None, org_unit=None, suspended=None):
+        """Yangi foydalanuvchi yaratish
+
+        pending ro'yxati berilsa, reestr (va lokal nusxa) yozuvi keyinroq
+        bitta tranzaksiyada yoziladi.
+        """
+        started = time.perf_counter()
+        email = self.creator.user_email(first_name, last_name, username)
+
+        stats = {}
+        try:
+            email, password, user_body = self.creator._prepare_user(
+                first_name, last_name, username, custom_password, org_unit, suspended)
+            try:
+                user = await self._request('users.insert', 'POST', 'users', body=user_body,
+                                           stats=stats)
+            except HttpError as e:
+                user_id = None
+                if e.resp.status == 409 and stats.get('unanswered'):
+                    user_id = await self._recover_conflict(email, first_name, last_name, stats)
+                if user_id is None:
+                    raise
+                user = {'id': user_id}
+
+            result = self.creator._record_created_user(
+                email, password, first_name, last_name, user['id'], pending=pending)
+            record = self.creator._mirror_record(user['id'], user_body)
+            if pending is None:
+                self.creator._mirror_write_through('upsert_many', [record])
+            else:
+                self._mirror_pending.append(record)
+
+        except Exception as e:
+            result = self.creator._create_user_failed(email, e)
+
+        self.creator._audit_result('create_user', email, result, started, stats)
+        return _with_retry_stats(result, stats)
+
+    async def _recover_conflict(self, email, first_name, last_name, stats):
+        """Qayta yuborilgan insert'ga 409 kelsa: avvalgi (javobsiz yoki 5xx) urinishda yaratilganmi tekshirish"""
+        try:
+            user = await self._request('users.get', 'GET', self._user_path(email),
+                                       params={'fields': RECOVERY_FIELDS})
+        except HttpError:
+            return None
+        return self.creator._created_by_attempt(email, user, first_name, last_name, stats)
+
+    async def create_multiple_users(self, users_data, concurrency=None):
+        """Ko'p foydalanuvchilarni parallel yaratish (natijalar kirish tartibida)
+
+        Bir vaqtda ko'pi bilan concurrency ta so'rov bajariladi - qolgan
+        foydalanuvchilar uchun coroutine'lar oldindan yaratilmaydi, shuning uchun
+        xotira ro'yxat hajmiga emas, concurrency'ga bog'liq.
+        """
+        users_data = self.creator._with_passwords(list(users_data))
+        results = [None] * len(users_data)
+        pending = []
+        positions = iter(range(len(users_data)))
+
+        def flush():
+            with self.metrics.timer('local_io_seconds', operation='ledger_add_many'):
+                self.ledger.add_many(pending)
+            pending.clear()
+            self.creator._mirror_write_through('upsert_many', self._mirror_pending)
+            self._mirror_pending.clear()
+
+        async def worker():
+            for position in positions:
+                user_data = users_data[position]
+                results[position] = await self.create_user(
+                    first_name=user_data['first_name'],
+                    last_name=user_data['last_name'],
+                    username=user_data.get('username'),
+                    custom_password=user_data.get('password'),
+                    pending=pending,
+                    org_unit=user_data.get('org_unit'),
+                    suspended=user_data.get('suspended')
+                )
+                if len(pending) >= LEDGER_FLUSH_SIZE:
+                    flush()
+
+        workers = min(concurrency or self.concurrency, len(users_data))
+        try:
+            await asyncio.gather(*(worker() for _ in range(workers)))
+        finally:
+            flush()
+        return results
+
+    async def iter_users(self, fields=USER_SUMMARY_FIELDS, query=None, max_results=MAX_PAGE_SIZE):
+        """Domen foydalanuvchilarini sahifama-sahifa qaytarish (async generator)"""
+        page_token = None
+        while True:
+            response = await self._request('users.list', 'GET', 'users', params={
+                'domain': self.domain,
+                'query': query,
+                'maxResults': max_results,
+                'pageToken': page_token,
+                'fields': f"nextPageToken,users({fields})"
+            })
+            for user in response.get('users', []):
+                yield user
+
+            page_token = response.get('nextPageToken')
+            if not page_token:
+                break
+
+    async def list_users(self, shards=None):
+        """Barcha foydalanuvchilarni ko'rsatish
+
+        shards > 1 bo'lsa (yoki config'dagi "scan_shards"), email prefikslari
+        bo'yicha shard'lar bir vaqtda o'qiladi.
+        """
+        shards = max(1, min(shards or self.config.get('scan_shards') or 1, len(EMAIL_SHARD_PREFIXES)))
+
+        async def scan(prefixes):
+            users = []
+            for prefix in prefixes:
+                query = f"email:{prefix}*" if prefix else None
+                users.extend([WorkspaceEmailCreator._user_summary(user)
+                              async for user in self.iter_users(query=query)])
+            return users
+
+        try:
+            if shards == 1:
+                users_info = await scan([None])
+            else:
+                pages = await asyncio.gather(*(scan(EMAIL_SHARD_PREFIXES[i::shards])
+                                               for i in range(shards)))
+                seen = set()
+                users_info = []
+                for user in (user for page in pages for user in page):
+                    if user['email'].lower() not in seen:
+                        seen.add(user['email'].lower())
+                        users_info.append(user)
+
+            self.logger.info(f"Found {len(users_info)} users in domain {self.domain}")
+            return users_info
+
+        except Exception as e:
+            self.logger.error(f"Error listing users: {str(e)}")
+            return []
+
+    async def update_user(self, email, updates):
+        """Foydalanuvchi ma'lumotlarini yangilash (bir nechta maydon bo'lsa - PATCH)"""
+        started = time.perf_counter()
+        stats = {}
+        try:
+            if len(updates) <= self.config.get('patch_max_keys', PATCH_MAX_KEYS):
+                await self._request('users.patch', 'PATCH', self._user_path(email), body=updates,
+                                    stats=stats)
+            else:
+                await self._request('users.update', 'PUT', self._user_path(email), body=updates,
+                                    stats=stats)
+            self.creator._mirror_write_through('patch_many', [(email, updates)])
+            self.logger.info(f"Successfully updated user: {email}")
+            result = {'success': True, 'message': f"User {email} updated"}
+
+        except Exception as e:
+            error_msg = f"Error updating user {email}: {str(e)}"
+            self.logger.error(error_msg)
+            result = {'success': False, 'error': error_msg}
+
+        self.creator._audit_result('update_user', email, result, started, stats,
+                                   changed_fields=sorted(updates))
+        return _with_retry_stats(result, stats)
+
+    async def delete_user(self, email):
+        """Foydalanuvchini o'chirish"""
+        started = time.perf_counter()
+        stats = {}
+        try:
+            await self._request('users.delete', 'DELETE', self._user_path(email), stats=stats)
+
+            with self.metrics.timer('local_io_seconds', operation='ledger_remove'):
+                self.ledger.remove(email)
+            self.creator._mirror_write_through('remove_emails', [email])
+
+            self.logger.info(f"Successfully deleted user: {email}")
+            result = {'success': True, 'message': f"User {email} deleted"}
+
+        except Exception as e:
+            error_msg = f"Error deleting user {email}: {str(e)}"
+            self.logger.error(error_msg)
+            result = {'success': False, 'error': error_msg}
+
+        self.creator._audit_result('delete_user', email, result, started, stats)
+        return _with_retry_stats(result, stats)
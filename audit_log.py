@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Bloklamaydigan logging va JSON-lines audit hodisalari
+Yozuvlar navbat orqali fon thread'iga uzatiladi, fayllar hajm bo'yicha
+aylantiriladi (rotation) va eski fayllar gzip bilan siqiladi
+"""
+
+import atexit
+import gzip
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import shutil
+import threading
+from datetime import datetime, timezone
+
+AUDIT_LOGGER = 'workspace_audit'
+
+# Audit yozuvlariga hech qachon tushmasligi kerak bo'lgan maydonlar
+SECRET_FIELDS = ('password', 'hashFunction')
+
+_LISTENERS = []
+_SETUP_LOCK = threading.Lock()
+
+
+def _gzip_rotator(source, dest):
+    """Aylantirilgan faylni gzip bilan siqish"""
+    with open(source, 'rb') as f_in, gzip.open(dest, 'wb') as f_out:
+        shutil.copyfileobj(f_in, f_out)
+    os.remove(source)
+
+
+class CompressingRotatingFileHandler(logging.handlers.RotatingFileHandler):
+    """Hajm bo'yicha aylantiriladigan fayl: eski nusxalar .gz sifatida saqlanadi"""
+
+    def __init__(self, filename, max_bytes=10 * 1024 * 1024, backup_count=5, encoding='utf-8'):
+        super().__init__(filename, maxBytes=max_bytes, backupCount=backup_count,
+                         encoding=encoding, delay=True)
+        self.namer = lambda name: name + '.gz'
+        self.rotator = _gzip_rotator
+
+
+class JsonLinesFormatter(logging.Formatter):
+    """Audit yozuvini bitta JSON qatoriga aylantirish (parollarsiz)"""
+
+    def format(self, record):
+        event = {
+            'time': datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            'event': record.getMessage()
+        }
+        for key, value in getattr(record, 'audit', {}).items():
+            if value is not None and not any(secret.lower() in key.lower() for secret in SECRET_FIELDS):
+                event[key] = value
+        return json.dumps(event, ensure_ascii=False)
+
+
+def audit_handler(path, max_bytes, backup_count):
+    handler = CompressingRotatingFileHandler(path, max_bytes, backup_count)
+    handler.setFormatter(JsonLinesFormatter())
+    return handler
+
+
+def start_queue_logging(logger, handlers):
+    """logger'ni QueueHandler'ga ulash; haqiqiy handler'lar fon thread'ida ishlaydi
+
+    Listener jarayon tugaganda (atexit) navbatdagi yozuvlarni yozib to'xtatiladi.
+    """
+    records = queue.Queue(-1)
+    listener = logging.handlers.QueueListener(records, *handlers, respect_handler_level=True)
+    with _SETUP_LOCK:
+        logger.addHandler(logging.handlers.QueueHandler(records))
+        listener.start()
+        _LISTENERS.append(listener)
+    return listener
+
+
+def stop_queue_logging():
+    """Barcha listener'larni to'xtatish (navbatdagi yozuvlar yozib bo'linadi)"""
+    with _SETUP_LOCK:
+        while _LISTENERS:
+            _LISTENERS.pop().stop()
+
+
+atexit.register(stop_queue_logging)
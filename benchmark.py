@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+WorkspaceEmailCreator tezlik o'lchovlari
+Lokal fake Directory server'ga qarshi: users/sec, p50/p99 chaqiruv latency va peak xotira
+
+Ishlatish:
+    python3 benchmark.py                       # 1k va 10k
+    python3 benchmark.py --sizes 1000 10000 100000 --latency 0.005
+    python3 benchmark.py --json bench_output.json
+"""
+
+import argparse
+import json
+import logging
+import multiprocessing
+import os
+import tempfile
+import time
+import tracemalloc
+
+from fake_directory import FakeDirectoryServer
+from workspace_email_creator import WorkspaceEmailCreator
+
+
+def percentile(values, fraction):
+    """Saralangan qiymatlardan percentile (nearest-rank)"""
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(fraction * (len(values) - 1))))]
+
+
+class _TimedHttp:
+    """httplib2.Http o'rami: har bir HTTP round trip vaqtini yozib boradi"""
+
+    def __init__(self, http, samples):
+        self._http = http
+        self._samples = samples
+
+    def request(self, *args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return self._http.request(*args, **kwargs)
+        finally:
+            self._samples.append(time.perf_counter() - started)
+
+    def __getattr__(self, name):
+        return getattr(self._http, name)
+
+
+class BenchmarkCreator(WorkspaceEmailCreator):
+    """Chaqiruv latency'larini yig'adigan creator"""
+
+    def __init__(self, *args, **kwargs):
+        self.samples = []
+        super().__init__(*args, **kwargs)
+
+    def _http(self):
+        return _TimedHttp(super()._http(), self.samples)
+
+
+def _serve(conn, options):
+    """Fake server'ni alohida jarayonda ishga tushirish (xotira o'lchoviga aralashmasligi uchun)"""
+    with FakeDirectoryServer(**options) as server:
+        conn.send(server.url)
+        conn.recv()
+
+
+def _measure(creator, name, count, func):
+    """Bitta ssenariyni o'lchash"""
+    creator.samples.clear()
+    tracemalloc.start()
+    started = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    samples = list(creator.samples)
+    return {
+        'scenario': name,
+        'users': count,
+        'seconds': round(elapsed, 3),
+        'users_per_sec': round(count / elapsed, 1) if elapsed else 0.0,
+        'calls': len(samples),
+        'p50_ms': round(percentile(samples, 0.50) * 1000, 2),
+        'p99_ms': round(percentile(samples, 0.99) * 1000, 2),
+        'peak_memory_mb': round(peak / 1024 / 1024, 2)
+    }
+
+
+def run_size(size, args, workdir):
+    """Bitta hajm uchun barcha ssenariylar"""
+    parent, child = multiprocessing.Pipe()
+    server = multiprocessing.Process(target=_serve, args=(child, {
+        'latency': args.latency,
+        'throttle_rate': args.throttle_rate,
+        'error_rate': args.error_rate,
+        'seed': 1
+    }), daemon=True)
+    server.start()
+    url = parent.recv()
+
+    config_file = os.path.join(workdir, f"bench_{size}.json")
+    with open(config_file, 'w') as f:
+        json.dump({
+            'domain': 'bench.example.com',
+            'credentials_file': 'credentials.json',
+            'organizational_unit': '/',
+            'api_endpoint': url,
+            'ledger_file': os.path.join(workdir, f"bench_{size}_users.db"),
+            'mirror_file': os.path.join(workdir, f"bench_{size}_directory.db"),
+            'mirror_max_staleness': None,
+            'rate_limit_qps': 100000,
+            'max_qps': 100000,
+            'retry_base_delay': 0.01
+        }, f)
+
+    creator = BenchmarkCreator('bench.example.com', config_file=config_file)
+    users_data = [{'first_name': 'Bench', 'last_name': f"User{i}", 'password': 'Bench-Passw0rd!'}
+                  for i in range(size)]
+
+    results = [
+        _measure(creator, 'create_batched', size, lambda: creator.create_multiple_users(
+            users_data, batch_size=args.batch_size)),
+        _measure(creator, 'list_users', size, lambda: creator.list_users()),
+        _measure(creator, 'list_users_sharded', size, lambda: creator.list_users(shards=args.shards)),
+        _measure(creator, 'get_domain_info', size, lambda: creator.get_domain_info()),
+        _measure(creator, 'sync_mirror', size, lambda: creator.sync_mirror()),
+        _measure(creator, 'get_domain_info_mirror', size,
+                 lambda: creator.get_domain_info(max_staleness=3600)),
+    ]
+    if size <= args.concurrent_limit:
+        results.insert(1, _measure(creator, 'delete_concurrent', size, lambda: creator.delete_users(
+            [f"bench.user{i}@bench.example.com" for i in range(size)], workers=args.workers)))
+        results.insert(2, _measure(creator, 'create_concurrent', size, lambda: creator.create_multiple_users(
+            users_data, workers=args.workers)))
+
+    parent.send('stop')
+    server.join(timeout=5)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="WorkspaceEmailCreator benchmark (fake Directory API)")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000])
+    parser.add_argument('--latency', type=float, default=0.002, help="har bir HTTP so'rov uchun server kechikishi (s)")
+    parser.add_argument('--throttle-rate', type=float, default=0.0, help="429 javoblar ulushi")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="503 javoblar ulushi")
+    parser.add_argument('--batch-size', type=int, default=500)
+    parser.add_argument('--workers', type=int, default=16)
+    parser.add_argument('--shards', type=int, default=8)
+    parser.add_argument('--concurrent-limit', type=int, default=10000,
+                        help="bundan katta hajmlar uchun parallel (batch'siz) ssenariylar o'tkazib yuboriladi")
+    parser.add_argument('--json', help="natijalarni JSON faylga yozish")
+    args = parser.parse_args()
+
+    # Har bir foydalanuvchi uchun INFO loglar o'lchovni buzmasligi uchun
+    logging.disable(logging.INFO)
+
+    results = []
+    with tempfile.TemporaryDirectory() as workdir:
+        cwd = os.getcwd()
+        os.chdir(workdir)  # workspace_emails.log vaqtinchalik papkaga yoziladi
+        try:
+            for size in args.sizes:
+                results.extend(run_size(size, args, workdir))
+        finally:
+            os.chdir(cwd)
+
+    header = f"{'scenario':<24}{'users':>8}{'sec':>9}{'users/s':>11}{'calls':>8}{'p50 ms':>9}{'p99 ms':>9}{'peak MB':>9}"
+    print(header)
+    print('-' * len(header))
+    for row in results:
+        print(f"{row['scenario']:<24}{row['users']:>8}{row['seconds']:>9}{row['users_per_sec']:>11}"
+              f"{row['calls']:>8}{row['p50_ms']:>9}{row['p99_ms']:>9}{row['peak_memory_mb']:>9}")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
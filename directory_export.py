@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+"""
+Directory'ni faylga oqim (streaming) sifatida eksport qilish
+users().list sahifalari kelishi bilan CSV/JSONL (ixtiyoriy gzip) faylga yoziladi:
+xotira sahifa hajmi bilan cheklanadi, yozish keyingi sahifani olish bilan parallel bajariladi
+
+Buyruqlar qatoridan: workspace_cli.py export
+"""
+
+import csv
+import gzip
+import io
+import json
+import os
+import queue
+import threading
+import time
+
+# Standart eksport maydonlari (partial response field mask)
+EXPORT_FIELDS = ('primaryEmail,name(givenName,familyName,fullName),suspended,orgUnitPath,'
+                 'creationTime,lastLoginTime')
+
+FORMATS = ('csv', 'jsonl')
+
+
+def field_columns(fields):
+    """Field mask'dan CSV ustunlari: "name(givenName,familyName),suspended" ->
+    ['name.givenName', 'name.familyName', 'suspended']
+    """
+    columns = []
+    position = 0
+
+    def parse(prefix):
+        nonlocal position
+        while position < len(fields) and fields[position] != ')':
+            start = position
+            while position < len(fields) and fields[position] not in ',()':
+                position += 1
+            path = prefix + fields[start:position].strip().replace('/', '.')
+            if position < len(fields) and fields[position] == '(':
+                position += 1
+                parse(path + '.')
+                position += 1  # ')'
+            elif path:
+                columns.append(path)
+            if position < len(fields) and fields[position] == ',':
+                position += 1
+
+    parse('')
+    return columns
+
+
+def _column_value(user, column):
+    value = user
+    for key in column.split('.'):
+        if not isinstance(value, dict):
+            return ''
+        value = value.get(key)
+    if value is None:
+        return ''
+    if isinstance(value, list):
+        return ';'.join(str(item) if not isinstance(item, dict) else json.dumps(item)
+                        for item in value)
+    if isinstance(value, dict):
+        return json.dumps(value)
+    return value
+
+
+def detect_format(filename):
+    """Fayl kengaytmasidan format va gzip: users.csv.gz -> ('csv', True)"""
+    compressed = filename.endswith('.gz')
+    base = filename[:-3] if compressed else filename
+    return ('jsonl' if base.endswith(('.jsonl', '.ndjson', '.json')) else 'csv'), compressed
+
+
+class DirectoryExport:
+    """Davom ettirish mumkin bo'lgan Directory eksporti
+
+    Har bir yozilgan sahifadan keyin keyingi sahifa tokeni va fayl hajmi
+    <filename>.state.json ga yoziladi. To'xtagan eksport qayta ishga
+    tushirilganda fayl oxirgi to'liq sahifagacha qisqartiriladi va o'qish
+    saqlangan tokendan davom etadi. gzip'da har bir sahifa alohida gzip
+    a'zosi (member) sifatida yoziladi - bunday fayllarni gzip/zcat odatdagidek o'qiydi.
+    """
+
+    def __init__(self, creator, filename, fields=EXPORT_FIELDS, query=None, file_format=None,
+                 compress=None, resume=True, on_progress=None):
+        detected_format, detected_compress = detect_format(filename)
+        self.creator = creator
+        self.filename = filename
+        self.fields = fields
+        self.query = query
+        self.file_format = file_format or detected_format
+        self.compress = detected_compress if compress is None else compress
+        self.resume = resume
+        self.on_progress = on_progress
+        self.state_file = f"{filename}.state.json"
+        self.columns = field_columns(fields)
+
+        if self.file_format not in FORMATS:
+            raise ValueError(f"file_format must be one of {FORMATS}")
+
+    def load_state(self):
+        """Saqlangan holat (mos kelmasa yoki yo'q bo'lsa - None)"""
+        try:
+            with open(self.state_file, 'r') as f:
+                state = json.load(f)
+        except (FileNotFoundError, ValueError):
+            return None
+        if state.get('fields') != self.fields or state.get('query') != self.query:
+            return None
+        return state
+
+    def _save_state(self, state):
+        tmp = f"{self.state_file}.tmp"
+        with open(tmp, 'w') as f:
+            json.dump(state, f)
+        os.replace(tmp, self.state_file)
+
+    def _encode(self, users, header):
+        """Bitta sahifani baytlarga aylantirish (gzip bo'lsa - alohida gzip a'zosi)"""
+        if self.file_format == 'jsonl':
+            text = ''.join(json.dumps(user, ensure_ascii=False) + '\n' for user in users)
+        else:
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            if header:
+                writer.writerow(self.columns)
+            writer.writerows([_column_value(user, column) for column in self.columns]
+                             for user in users)
+            text = buffer.getvalue()
+
+        data = text.encode('utf-8')
+        return gzip.compress(data) if self.compress else data
+
+    def _write_pages(self, pages, output, state, errors):
+        """Writer thread: navbatdagi sahifalarni yozish va holatni saqlash"""
+        try:
+            while True:
+                item = pages.get()
+                if item is None:
+                    return
+                users, next_token = item
+                output.write(self._encode(users, header=state['offset'] == 0))
+                output.flush()
+                os.fsync(output.fileno())
+
+                state.update(offset=output.tell(), users=state['users'] + len(users),
+                             pages=state['pages'] + 1, next_page_token=next_token,
+                             complete=next_token is None)
+                self._save_state(state)
+                if self.on_progress:
+                    self.on_progress(dict(state))
+        except Exception as e:
+            errors.append(e)
+            # Fetch thread navbat to'lib qolsa bloklanmasligi uchun qolganlarini bo'shatish
+            while pages.get() is not None:
+                pass
+
+    def run(self):
+        """Eksportni bajarish yoki to'xtagan joyidan davom ettirish"""
+        started = time.monotonic()
+        state = self.load_state() if self.resume else None
+        resumed = bool(state and not state.get('complete') and os.path.exists(self.filename))
+        if not resumed:
+            state = {'fields': self.fields, 'query': self.query, 'offset': 0, 'users': 0,
+                     'pages': 0, 'next_page_token': None, 'complete': False}
+        else:
+            self.creator.logger.info(
+                f"Resuming export to {self.filename} after {state['users']} users")
+
+        initial_users = state['users']
+        pages = queue.Queue(maxsize=2)
+        errors = []
+        with open(self.filename, 'r+b' if resumed else 'wb') as output:
+            # Oxirgi to'liq saqlangan sahifadan keyingi chala yozuvlarni olib tashlash
+            output.truncate(state['offset'])
+            output.seek(state['offset'])
+
+            writer = threading.Thread(target=self._write_pages, args=(pages, output, state, errors),
+                                      daemon=True)
+            writer.start()
+            try:
+                for page in self.creator.iter_user_pages(fields=self.fields, query=self.query,
+                                                         page_token=state['next_page_token']):
+                    if errors:
+                        break
+                    pages.put(page)
+            finally:
+                pages.put(None)
+                writer.join()
+
+        if errors:
+            raise errors[0]
+
+        elapsed = time.monotonic() - started
+        stats = {
+            'filename': self.filename,
+            'users': state['users'],
+            'pages': state['pages'],
+            'resumed': resumed,
+            'elapsed': round(elapsed, 3),
+            'users_per_sec': round((state['users'] - initial_users) / elapsed, 2) if elapsed > 0 else 0.0
+        }
+        self.creator.logger.info(
+            f"Exported {stats['users']} users to {self.filename} ({stats['users_per_sec']} users/sec)")
+        return stats
@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Domen foydalanuvchilarining lokal nusxasi (SQLite)
+Google user id bo'yicha saqlanadi, etag orqali qisman yangilanadi
+"""
+
+import json
+import sqlite3
+import threading
+import time
+
+
+class DirectoryMirror:
+    """Directory foydalanuvchilarining lokal ko'zgusi"""
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS users ('
+            ' id TEXT PRIMARY KEY,'
+            ' primary_email TEXT,'
+            ' suspended INTEGER NOT NULL DEFAULT 0,'
+            ' etag TEXT,'
+            ' data TEXT NOT NULL)'
+        )
+        self._conn.execute(
+            'CREATE INDEX IF NOT EXISTS idx_users_primary_email ON users (primary_email)'
+        )
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS sync_state (key TEXT PRIMARY KEY, value TEXT)'
+        )
+        self._conn.commit()
+
+    def upsert_many(self, users):
+        """Foydalanuvchilarni qo'shish yoki yangilash (user resource lug'atlari)"""
+        rows = [
+            (
+                user['id'],
+                user.get('primaryEmail', '').lower(),
+                int(bool(user.get('suspended', False))),
+                user.get('etag'),
+                json.dumps(user)
+            )
+            for user in users
+        ]
+        if not rows:
+            return
+        with self._lock, self._conn:
+            self._conn.executemany(
+                'INSERT OR REPLACE INTO users (id, primary_email, suspended, etag, data) '
+                'VALUES (?, ?, ?, ?, ?)',
+                rows
+            )
+
+    def remove_many(self, user_ids):
+        """Foydalanuvchilarni id bo'yicha o'chirish"""
+        rows = [(user_id,) for user_id in user_ids]
+        if not rows:
+            return
+        with self._lock, self._conn:
+            self._conn.executemany('DELETE FROM users WHERE id = ?', rows)
+
+    def patch_many(self, changes):
+        """(email, o'zgargan maydonlar) juftliklarini mavjud yozuvlarga qo'llash
+
+        etag o'chiriladi - keyingi sync_mirror bu foydalanuvchilarni API'dan qayta oladi.
+        """
+        changes = list(changes)
+        if not changes:
+            return
+        with self._lock, self._conn:
+            for email, fields in changes:
+                row = self._conn.execute(
+                    'SELECT data FROM users WHERE primary_email = ?', (email.lower(),)
+                ).fetchone()
+                if row is None:
+                    continue
+                user = json.loads(row[0])
+                for key, value in fields.items():
+                    if isinstance(value, dict) and isinstance(user.get(key), dict):
+                        value = dict(user[key], **value)
+                    user[key] = value
+                if 'name' in fields:
+                    name = user['name']
+                    name['fullName'] = f"{name.get('givenName', '')} {name.get('familyName', '')}".strip()
+                user.pop('etag', None)
+                self._conn.execute(
+                    'UPDATE users SET primary_email = ?, suspended = ?, etag = NULL, data = ? '
+                    'WHERE primary_email = ?',
+                    (user.get('primaryEmail', email).lower(),
+                     int(bool(user.get('suspended', False))), json.dumps(user), email.lower())
+                )
+
+    def remove_emails(self, emails):
+        """Foydalanuvchilarni primaryEmail bo'yicha o'chirish"""
+        rows = [(email.lower(),) for email in emails]
+        if not rows:
+            return
+        with self._lock, self._conn:
+            self._conn.executemany('DELETE FROM users WHERE primary_email = ?', rows)
+
+    def etags(self):
+        """{user_id: etag} lug'ati"""
+        with self._lock:
+            return dict(self._conn.execute('SELECT id, etag FROM users').fetchall())
+
+    def get(self, user_id):
+        """Foydalanuvchini id bo'yicha olish"""
+        with self._lock:
+            row = self._conn.execute('SELECT data FROM users WHERE id = ?', (user_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def get_by_email(self, email):
+        """Foydalanuvchini primaryEmail bo'yicha olish"""
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT data FROM users WHERE primary_email = ?', (email.lower(),)
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def iter_users(self):
+        """Barcha foydalanuvchilarni email tartibida qaytarish"""
+        with self._lock:
+            rows = self._conn.execute('SELECT data FROM users ORDER BY primary_email').fetchall()
+        for (data,) in rows:
+            yield json.loads(data)
+
+    def count(self):
+        """(jami, to'xtatilgan) foydalanuvchilar soni"""
+        with self._lock:
+            total, suspended = self._conn.execute(
+                'SELECT COUNT(*), COALESCE(SUM(suspended), 0) FROM users'
+            ).fetchone()
+        return total, suspended
+
+    def data_version(self):
+        """Boshqa ulanish (jarayon) nusxaga yozganda o'zgaradigan raqam"""
+        with self._lock:
+            return self._conn.execute('PRAGMA data_version').fetchone()[0]
+
+    def mark_synced(self, timestamp=None):
+        """Oxirgi sinxronizatsiya vaqtini saqlash"""
+        timestamp = time.time() if timestamp is None else timestamp
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO sync_state (key, value) VALUES ('last_sync', ?)",
+                (str(timestamp),)
+            )
+
+    def last_sync(self):
+        """Oxirgi sinxronizatsiya vaqti (epoch) yoki None"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value FROM sync_state WHERE key = 'last_sync'"
+            ).fetchone()
+        return float(row[0]) if row else None
+
+    def age(self):
+        """Oxirgi sinxronizatsiyadan beri o'tgan vaqt (soniya) yoki None"""
+        last_sync = self.last_sync()
+        return None if last_sync is None else time.time() - last_sync
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+"""
+Lokal nusxa (DirectoryMirror) ustidan indeksli so'rovlar
+"/Sales'da martdan beri kirmaganlar" yoki "Karimov ismli foydalanuvchilar" kabi
+savollarga API'ga murojaatsiz, ikkilamchi indekslar orqali javob beriladi
+"""
+
+from array import array
+from bisect import bisect_left
+from datetime import date, datetime, timezone
+from operator import itemgetter
+
+from user_table import StringColumn, format_time, parse_time
+
+# Prefiks oralig'ining yuqori chegarasi uchun eng katta belgi
+_MAX_CHAR = '\U0010ffff'
+
+
+def to_millis(value):
+    """Vaqt chegarasi -> epoch millisekund
+
+    datetime (tzinfo'siz bo'lsa UTC), date, "YYYY-MM-DD" yoki RFC 3339 satr qabul qilinadi.
+    """
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        return int(value.timestamp() * 1000)
+    if isinstance(value, date):
+        return to_millis(datetime(value.year, value.month, value.day))
+    if len(value) == 10:
+        value += 'T00:00:00Z'
+    return parse_time(value)
+
+
+class SortedIndex:
+    """Qiymat bo'yicha saralangan qatorlar: oraliq so'rovi - ikkita bisect"""
+
+    def __init__(self, values):
+        order = sorted(range(len(values)), key=values.__getitem__)
+        self.values = array('q', (values[row] for row in order))
+        self.rows = array('I', order)
+
+    def range(self, low=None, high=None):
+        """low <= qiymat < high bo'lgan qatorlarning rows'dagi oralig'i (start, stop)"""
+        start = 0 if low is None else bisect_left(self.values, low)
+        stop = len(self.values) if high is None else bisect_left(self.values, high)
+        return start, max(start, stop)
+
+
+class PrefixIndex:
+    """Saralangan kalitlar (email, alias va ism so'zlari, kichik harflarda) - prefiks bo'yicha qidiruv"""
+
+    def __init__(self, entries):
+        # Takrorlar olib tashlanadi; barqaror saralash bir kalit ichida qator tartibini saqlaydi
+        entries = sorted(dict.fromkeys(entries), key=itemgetter(0))
+        self.keys = StringColumn()
+        self.keys.extend(key for key, _ in entries)
+        self.rows = array('I', (row for _, row in entries))
+
+    def range(self, prefix):
+        """Kaliti prefix bilan boshlanadigan yozuvlar oralig'i (start, stop)"""
+        prefix = prefix.lower()
+        start = bisect_left(self.keys, prefix)
+        return start, bisect_left(self.keys, prefix + _MAX_CHAR, start)
+
+
+class DirectoryIndex:
+    """Directory snapshot'i ustidagi so'rov indekslari
+
+    Qatorlar email tartibida saqlanadi (satrlar - StringColumn, vaqtlar -
+    epoch millisekund massivlari). Indekslar: orgUnitPath bo'yicha qatorlar
+    ro'yxatlari, suspended/faol qatorlar, lastLoginTime va creationTime
+    bo'yicha saralangan massivlar, email/alias/ism so'zlari bo'yicha prefiks
+    indeksi. So'rovda eng kam qator qaytaradigan indeks tanlanadi, qolgan
+    shartlar faqat shu qatorlar ustida tekshiriladi.
+    Misol:
+        index = DirectoryIndex.from_users(mirror.iter_users())
+        index.query(org_unit='/Sales', last_login_before='2026-03-01')
+        index.query(prefix='karimov', suspended=False, limit=20)
+    """
+
+    def __init__(self):
+        self.ids = StringColumn()
+        self.emails = StringColumn()
+        self.names = StringColumn()
+        self.units = array('I')
+        self.suspended = bytearray()
+        self.created = array('q')
+        self.last_login = array('q')
+        self.org_units = []
+        self._unit_rows = []
+        self._suspended_rows = array('I')
+        self._active_rows = array('I')
+        self._created_index = None
+        self._login_index = None
+        self._prefix_index = None
+
+    @classmethod
+    def from_users(cls, users):
+        """Directory API foydalanuvchilaridan (email tartibida) indekslarni qurish"""
+        index = cls()
+        unit_numbers = {}
+        ids, emails, names, prefixes = [], [], [], []
+        for row, user in enumerate(users):
+            email = user['primaryEmail']
+            name = user.get('name', {}).get('fullName') or ''
+            unit = user.get('orgUnitPath', '/')
+            if unit not in unit_numbers:
+                unit_numbers[unit] = len(index.org_units)
+                index.org_units.append(unit)
+                index._unit_rows.append(array('I'))
+
+            ids.append(user.get('id'))
+            emails.append(email)
+            names.append(name)
+            index.units.append(unit_numbers[unit])
+            index._unit_rows[unit_numbers[unit]].append(row)
+            suspended = bool(user.get('suspended', False))
+            index.suspended.append(suspended)
+            (index._suspended_rows if suspended else index._active_rows).append(row)
+            index.created.append(parse_time(user.get('creationTime')))
+            index.last_login.append(parse_time(user.get('lastLoginTime')))
+
+            prefixes.append((email.lower(), row))
+            prefixes.extend((alias.lower(), row) for alias in user.get('aliases', []))
+            prefixes.extend((word, row) for word in name.lower().split())
+
+        # Satrlar ustunlari bitta join bilan to'ldiriladi
+        index.ids.extend(ids)
+        index.emails.extend(emails)
+        index.names.extend(names)
+        index._created_index = SortedIndex(index.created)
+        index._login_index = SortedIndex(index.last_login)
+        index._prefix_index = PrefixIndex(prefixes)
+        return index
+
+    def __len__(self):
+        return len(self.units)
+
+    def row(self, row):
+        """Qator - list_users natijasi kabi lug'at (id va org_unit bilan)"""
+        return {
+            'id': self.ids[row],
+            'email': self.emails[row],
+            'name': self.names[row],
+            'org_unit': self.org_units[self.units[row]],
+            'suspended': bool(self.suspended[row]),
+            'created_time': format_time(self.created[row]),
+            'last_login': format_time(self.last_login[row])
+        }
+
+    def _matching_units(self, org_unit, include_children):
+        """org_unit (va include_children bo'lsa, uning ichidagi bo'limlar) raqamlari"""
+        org_unit = org_unit.rstrip('/') or '/'
+        children = '/' if org_unit == '/' else org_unit + '/'
+        return {number for number, unit in enumerate(self.org_units)
+                if unit == org_unit or (include_children and unit.startswith(children))}
+
+    # Har bir shart rejasi: (qatorlar soni, qatorlarni olish, bitta qatorni tekshirish)
+
+    def _unit_plan(self, org_unit, include_children):
+        units = self._matching_units(org_unit, include_children)
+        unit_rows = [self._unit_rows[unit] for unit in units]
+        return (sum(map(len, unit_rows)),
+                lambda: [row for rows in unit_rows for row in rows],
+                lambda row: self.units[row] in units)
+
+    def _suspended_plan(self, suspended):
+        flag = int(bool(suspended))
+        rows = self._suspended_rows if flag else self._active_rows
+        return len(rows), lambda: rows, lambda row: self.suspended[row] == flag
+
+    @staticmethod
+    def _range_plan(sorted_index, column, low, high):
+        low, high = to_millis(low), to_millis(high)
+        start, stop = sorted_index.range(low, high)
+        low = float('-inf') if low is None else low
+        high = float('inf') if high is None else high
+        return (stop - start, lambda: sorted_index.rows[start:stop],
+                lambda row: low <= column[row] < high)
+
+    def _prefix_plan(self, prefix):
+        start, stop = self._prefix_index.range(prefix)
+        # Bitta qator bir nechta kalit bilan mos kelishi mumkin
+        rows = set(self._prefix_index.rows[start:stop])
+        return len(rows), lambda: rows, rows.__contains__
+
+    def _plans(self, org_unit=None, include_children=True, suspended=None, last_login_after=None,
+               last_login_before=None, created_after=None, created_before=None, prefix=None):
+        plans = []
+        if org_unit is not None:
+            plans.append(self._unit_plan(org_unit, include_children))
+        if suspended is not None:
+            plans.append(self._suspended_plan(suspended))
+        if last_login_after is not None or last_login_before is not None:
+            plans.append(self._range_plan(self._login_index, self.last_login,
+                                          last_login_after, last_login_before))
+        if created_after is not None or created_before is not None:
+            plans.append(self._range_plan(self._created_index, self.created,
+                                          created_after, created_before))
+        if prefix:
+            plans.append(self._prefix_plan(prefix))
+        return plans
+
+    def _match(self, limit=None, **filters):
+        """Shartlarga mos qatorlar (email tartibida)"""
+        plans = self._plans(**filters)
+        if not plans:
+            return list(range(len(self)))[:limit]
+
+        plans.sort(key=lambda plan: plan[0])
+        rows = plans[0][1]()
+        for _, _, check in plans[1:]:
+            rows = list(filter(check, rows))
+        return sorted(rows)[:limit]
+
+    def query(self, org_unit=None, include_children=True, suspended=None, last_login_after=None,
+              last_login_before=None, created_after=None, created_before=None, prefix=None,
+              limit=None):
+        """Shartlarga mos foydalanuvchilar (email tartibida)
+
+        org_unit - bo'lim (include_children=True bo'lsa, ichki bo'limlar bilan).
+        *_after - chegara kiradi, *_before - kirmaydi; hech kirmaganlar
+        (lastLoginTime 1970-01-01) har qanday last_login_before'ga mos keladi.
+        prefix - email, alias yoki ism so'zining boshi (katta-kichik harf farqsiz).
+        """
+        rows = self._match(
+            limit, org_unit=org_unit, include_children=include_children, suspended=suspended,
+            last_login_after=last_login_after, last_login_before=last_login_before,
+            created_after=created_after, created_before=created_before, prefix=prefix)
+        return [self.row(row) for row in rows]
+
+    def count(self, **filters):
+        """query() bilan bir xil shartlar - natijani qurmasdan faqat soni"""
+        return len(self._match(**filters))
+
+    def org_unit_counts(self):
+        """{bo'lim: foydalanuvchilar soni}"""
+        return {unit: len(rows) for unit, rows in zip(self.org_units, self._unit_rows)}
@@ -0,0 +1,326 @@
+#!/usr/bin/env python3
+"""
+users().watch push kanallari orqali lokal nusxani (mirror) yangilab turish
+Google add/update/delete hodisalarini lokal HTTP receiver'ga yuboradi -
+list_users'ni qayta-qayta skan qilish o'rniga faqat o'zgargan foydalanuvchilar olinadi
+"""
+
+import json
+import queue
+import secrets
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from googleapiclient.errors import HttpError
+
+WATCH_EVENTS = ('add', 'update', 'delete', 'undelete')
+
+# Kanal muddati (Directory API maksimal 6 soat) va muddat tugashidan qancha oldin yangilash (soniya)
+DEFAULT_CHANNEL_TTL = 6 * 3600
+DEFAULT_RENEW_MARGIN = 600
+
+# Renewal va kanal holatini tekshirish oralig'i (soniya)
+CHECK_INTERVAL = 30
+
+# Har shuncha tekshiruvda nusxa sync_mirror bilan solishtiriladi - Google
+# xabar yubormay qo'ysa ham nusxa eskirib qolmaydi (30 * 10 = 5 daqiqa)
+SYNC_EVERY = 10
+
+# Bitta users.get batch'iga yig'iladigan hodisalar soni
+MAX_EVENTS_PER_BATCH = 500
+
+
+class _ReceiverHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length', 0))
+        body = self.rfile.read(length) if length else b''
+        status = self.server.watch.receive(self.headers, body)
+        self.send_response(status)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+
+class DirectoryWatch:
+    """Push xabarlar bilan yangilanadigan lokal Directory ko'rinishi
+
+    start() - lokal nusxani sinxronlaydi, receiver'ni ishga tushiradi va har
+    bir hodisa turi uchun users().watch kanalini ochadi. Kanallar muddati
+    tugashidan renew_margin soniya oldin yangilanadi. Xabar raqamlarida
+    uzilish bo'lsa (yo'qolgan xabar) yoki kanal yangilanmay qolsa, to'liq
+    resync (sync_mirror) bajariladi. Xabarlar kelmay qolganini sezib
+    bo'lmagani uchun resync har sync_every * check_interval soniyada ham
+    bajariladi (0 - o'chirilgan); nusxaning sinxronizatsiya vaqti faqat
+    hodisalar qo'llanganda yoki resync'dan keyin yangilanadi.
+
+    address - Google yuboradigan public HTTPS manzil (masalan, reverse proxy
+    orqali host:port'ga); berilmasa, http://host:port/ ishlatiladi.
+    """
+
+    def __init__(self, creator, address=None, host='127.0.0.1', port=0, events=WATCH_EVENTS,
+                 ttl=DEFAULT_CHANNEL_TTL, renew_margin=DEFAULT_RENEW_MARGIN,
+                 check_interval=CHECK_INTERVAL, sync_every=SYNC_EVERY, on_change=None):
+        self.creator = creator
+        self.logger = creator.logger
+        self.address = address
+        self._given_address = address
+        self.host = host
+        self.port = port
+        self.events = tuple(events)
+        self.ttl = ttl
+        self.renew_margin = renew_margin
+        self.check_interval = check_interval
+        self.sync_every = sync_every
+        self.on_change = on_change
+        self.stats = {'notifications': 0, 'applied': 0, 'removed': 0, 'renewals': 0, 'resyncs': 0}
+
+        self._token = secrets.token_urlsafe(24)
+        self._channels = {}
+        self._lock = threading.Lock()
+        self._events = queue.Queue()
+        self._resync = threading.Event()
+        self._stopping = threading.Event()
+        self._server = None
+        self._worker = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    # --- kanallar ---
+
+    def _register(self, event):
+        """Bitta hodisa turi uchun kanal ochish"""
+        expiration = time.time() + self.ttl
+        channel = {'id': str(uuid.uuid4()), 'event': event, 'resource_id': None,
+                   'expiration': expiration, 'message_number': 0}
+        body = {
+            'id': channel['id'],
+            'type': 'web_hook',
+            'address': self.address,
+            'token': self._token,
+            'expiration': str(int(expiration * 1000))
+        }
+        # "sync" xabari watch javobidan oldin kelishi mumkin - kanal oldindan qayd etiladi
+        with self._lock:
+            self._channels[channel['id']] = channel
+        try:
+            response = self.creator._execute(self.creator._users().watch(
+                domain=self.creator.domain, event=event, projection='basic', body=body))
+        except Exception:
+            with self._lock:
+                self._channels.pop(channel['id'], None)
+            raise
+        with self._lock:
+            channel['resource_id'] = response['resourceId']
+            channel['expiration'] = int(response.get('expiration') or body['expiration']) / 1000
+        self.creator.metrics.inc('watch_channels_total', event=event)
+        self.logger.info(f"Watching {event} events on channel {channel['id']}")
+        return channel
+
+    def _stop_channel(self, channel):
+        with self._lock:
+            self._channels.pop(channel['id'], None)
+        try:
+            self.creator._execute(self.creator._resource('channels').stop(
+                body={'id': channel['id'], 'resourceId': channel['resource_id']}))
+        except HttpError as e:
+            # Muddati o'tgan kanal serverda allaqachon yo'q
+            if e.resp.status != 404:
+                self.logger.warning(f"Could not stop channel {channel['id']}: {str(e)}")
+
+    def _renew(self):
+        """Muddati yaqin kanallarni yangisi bilan almashtirish
+
+        Yangi kanal eskisi to'xtatilishidan oldin ochiladi - oraliqdagi
+        hodisalar ikki marta kelishi mumkin, lekin yo'qolmaydi.
+        """
+        now = time.time()
+        with self._lock:
+            expiring = [channel for channel in self._channels.values()
+                        if channel['expiration'] - now <= self.renew_margin]
+        for channel in expiring:
+            try:
+                self._register(channel['event'])
+            except Exception as e:
+                self.logger.error(f"Could not renew {channel['event']} channel: {str(e)}")
+                if channel['expiration'] <= now:
+                    # Kanal yopildi va o'rniga yangisi yo'q - hodisalar yo'qolgan bo'lishi mumkin
+                    with self._lock:
+                        self._channels.pop(channel['id'], None)
+                    self._resync.set()
+                continue
+            self._stop_channel(channel)
+            self.stats['renewals'] += 1
+
+        # Hech bir kanal qolmagan hodisa turlari (masalan, renewal xato bergan)
+        with self._lock:
+            watched = {channel['event'] for channel in self._channels.values()}
+        for event in self.events:
+            if event not in watched:
+                try:
+                    self._register(event)
+                    self._resync.set()
+                except Exception as e:
+                    self.logger.error(f"Could not register {event} channel: {str(e)}")
+
+    # --- xabarlar ---
+
+    def receive(self, headers, body):
+        """Push xabarni qabul qilish (receiver thread'ida): HTTP status qaytaradi
+
+        Xabar navbatga qo'yiladi - API'ga murojaat worker thread'ida bajariladi.
+        """
+        with self._lock:
+            channel = self._channels.get(headers.get('X-Goog-Channel-ID'))
+            if channel is None or headers.get('X-Goog-Channel-Token') != self._token:
+                # Noma'lum yoki to'xtatilgan kanal
+                return 404 if channel is None else 403
+
+            number = int(headers.get('X-Goog-Message-Number', 0))
+            if number > channel['message_number'] + 1:
+                self.logger.warning(
+                    f"Missed {number - channel['message_number'] - 1} notifications on "
+                    f"channel {channel['id']}, scheduling resync")
+                self._resync.set()
+            channel['message_number'] = max(channel['message_number'], number)
+            self.stats['notifications'] += 1
+
+        state = headers.get('X-Goog-Resource-State')
+        self.creator.metrics.inc('watch_notifications_total', state=state)
+        if state != 'sync' and body:
+            self._events.put((state, json.loads(body)))
+        return 200
+
+    def _apply(self, events):
+        """Hodisalarni lokal nusxaga qo'llash
+
+        Xabarda faqat id, etag va primaryEmail bo'ladi, shuning uchun qo'shilgan
+        yoki o'zgargan foydalanuvchilar bitta batch users.get bilan olinadi.
+        """
+        changed = {}
+        removed = set()
+        for state, payload in events:
+            user_id = str(payload['id'])
+            if state == 'delete':
+                removed.add(user_id)
+                changed.pop(user_id, None)
+            else:
+                removed.discard(user_id)
+                changed[user_id] = payload.get('primaryEmail')
+
+        for fetched, missing in self.creator._fetch_users(changed):
+            # Xabar kelguncha o'chirilganlar
+            removed.update(missing)
+            self.creator._mirror_write('upsert_many', fetched)
+            self.stats['applied'] += len(fetched)
+
+        self.creator._mirror_write('remove_many', removed)
+        self.stats['removed'] += len(removed)
+        if self.on_change:
+            self.on_change(sorted(changed.values()), sorted(removed))
+
+    def _run(self):
+        """Worker: hodisalarni batch'lab qo'llash, kanallarni yangilash va kerak bo'lsa resync"""
+        next_check = time.monotonic() + self.check_interval
+        checks = 0
+        while not self._stopping.is_set():
+            events = []
+            try:
+                events.append(self._events.get(timeout=max(0.0, next_check - time.monotonic())))
+                while len(events) < MAX_EVENTS_PER_BATCH:
+                    events.append(self._events.get_nowait())
+            except queue.Empty:
+                pass
+            # None - stop() yuborgan uyg'otish belgisi
+            events = [event for event in events if event is not None]
+
+            try:
+                if time.monotonic() >= next_check:
+                    next_check = time.monotonic() + self.check_interval
+                    checks += 1
+                    self._renew()
+                    if self.sync_every and checks % self.sync_every == 0:
+                        self._resync.set()
+
+                if self._resync.is_set():
+                    self._resync.clear()
+                    self.resync()
+                elif events:
+                    self._apply(events)
+                    self.creator.mirror.mark_synced()
+            except Exception as e:
+                self.logger.error(f"Error applying directory notifications: {str(e)}")
+                self._resync.set()
+                self._stopping.wait(self.check_interval)
+
+    def resync(self):
+        """To'liq resync: nusxani etag bo'yicha Directory bilan solishtirish"""
+        # Resync boshlanishidan oldingi xabarlar skanda hisobga olinadi
+        while True:
+            try:
+                self._events.get_nowait()
+            except queue.Empty:
+                break
+        self.stats['resyncs'] += 1
+        self.creator.metrics.inc('watch_resyncs_total')
+        return self.creator.sync_mirror()
+
+    # --- hayot sikli ---
+
+    def start(self):
+        """Receiver, kanallar va worker'ni ishga tushirish
+
+        Ishlab turgan watch uchun hech narsa qilmaydi - watch_directory()
+        natijasini "with" bilan ishlatish mumkin. Ishga tushirish yarmida xato
+        bo'lsa, ochilgan kanallar va receiver yopiladi.
+        """
+        if self._server is not None:
+            return self
+        self._server = ThreadingHTTPServer((self.host, self.port), _ReceiverHandler)
+        self._server.daemon_threads = True
+        self._server.watch = self
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        if not self._given_address:
+            host, port = self._server.server_address[:2]
+            self.address = f"http://{host}:{port}/"
+
+        try:
+            if not self.creator.service:
+                self.creator.authenticate()
+            # Kanallar nusxa sinxronlanishidan oldin ochiladi - oraliqdagi o'zgarishlar yo'qolmaydi
+            for event in self.events:
+                self._register(event)
+            self.creator.sync_mirror()
+        except Exception:
+            self.stop()
+            raise
+
+        self._stopping.clear()
+        self._worker = threading.Thread(target=self._run, daemon=True)
+        self._worker.start()
+        return self
+
+    def stop(self):
+        """Kanallarni yopish va receiver'ni to'xtatish"""
+        self._stopping.set()
+        if self._worker is not None:
+            self._events.put(None)
+            self._worker.join()
+            self._worker = None
+        with self._lock:
+            channels = list(self._channels.values())
+        for channel in channels:
+            self._stop_channel(channel)
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
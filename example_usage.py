@@ -5,6 +5,7 @@ Bu misolda script'ni kod orqali qanday ishlatishni ko'rsatamiz
 """
 
 from workspace_email_creator import WorkspaceEmailCreator
+from import_job import ImportJob
 import json
 
 def create_team_emails():
@@ -112,44 +113,49 @@ def create_bulk_emails_from_csv():
     
     print(f"📁 {csv_filename} fayli yaratildi (misol uchun)")
     
-    # CSV fayldan o'qish va email'lar yaratish
-    results = []
+    def department_row(row):
+        first_name = row['first_name']
+        last_name = row['last_name']
+        department = row.get('department', 'general')
+        
+        # Department asosida username yaratish
+        return {
+            'first_name': first_name,
+            'last_name': last_name,
+            'username': f"{first_name.lower()}.{last_name.lower()}.{department.lower()}"
+        }
+    
+    # CSV fayldan o'qish va email'lar yaratish.
+    # Har bir qator natijasi employees.csv.checkpoint.jsonl ga yoziladi:
+    # jarayon to'xtab qolsa, qayta ishga tushirilganda yaratilgan qatorlar o'tkazib yuboriladi.
+    job = ImportJob(
+        creator,
+        csv_filename,
+        row_mapper=department_row,
+        on_progress=lambda stats: print(
+            f"🔄 {stats['processed']} ta qator, {stats['users_per_sec']} user/s")
+    )
     
     try:
-        with open(csv_filename, 'r', encoding='utf-8') as csvfile:
-            reader = csv.DictReader(csvfile)
-            
-            for row in reader:
-                first_name = row['first_name']
-                last_name = row['last_name']
-                department = row.get('department', 'general')
-                
-                # Department asosida username yaratish
-                username = f"{first_name.lower()}.{last_name.lower()}.{department.lower()}"
-                
-                print(f"\n🔄 {first_name} {last_name} ({department}) uchun email yaratilmoqda...")
-                
-                result = creator.create_user(
-                    first_name=first_name,
-                    last_name=last_name,
-                    username=username
-                )
-                
-                result['department'] = department
-                results.append(result)
-                
-                if result['success']:
-                    print(f"✅ Yaratildi: {result['email']}")
-                else:
-                    print(f"❌ Xato: {result['error']}")
+        stats = job.run()
+        results = job.results()
         
-        # Natijalarni ko'rsatish
-        successful = [r for r in results if r['success']]
-        failed = [r for r in results if not r['success']]
+        for result in results:
+            if result['status'] == 'created':
+                print(f"✅ Yaratildi: {result['email']}")
+            else:
+                print(f"❌ Xato: {result.get('error', result['email'])}")
         
+        # Natijalarni ko'rsatish
         print(f"\n📊 CSV'dan yaratish natijasi:")
-        print(f"✅ Muvaffaqiyatli: {len(successful)}")
-        print(f"❌ Muvaffaqiyatsiz: {len(failed)}")
+        print(f"✅ Muvaffaqiyatli: {stats['created']}")
+        print(f"❌ Muvaffaqiyatsiz: {stats['failed']}")
+        print(f"⏭️  Oldin bajarilgan: {stats['skipped']}")
+        
+        # Xodimlarni bo'lim guruhlariga qo'shish (it@, hr@, finance@ ...)
+        group_stats = creator.sync_department_groups(csv_filename, row_mapper=department_row)
+        print(f"👥 Guruhlarga qo'shildi: {group_stats['changed']}, "
+              f"oldin a'zo: {group_stats['skipped']}")
         
         return results
         
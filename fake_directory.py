@@ -0,0 +1,608 @@
+#!/usr/bin/env python3
+"""
+Lokal Directory API stand-in (admin/directory_v1 users, groups, members va users.watch)
+Google kvotalariga tegmasdan WorkspaceEmailCreator'ni sinash va o'lchash uchun
+"""
+
+import gzip
+import json
+import queue
+import random
+import threading
+import time
+import urllib.request
+import uuid
+from bisect import bisect_left, bisect_right, insort
+from datetime import datetime, timezone
+from email.parser import BytesParser
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlsplit
+
+USERS_PATH = '/admin/directory/v1/users'
+GROUPS_PATH = '/admin/directory/v1/groups'
+WATCH_KEY = 'watch'
+CHANNELS_STOP_PATH = '/admin/directory_v1/channels/stop'
+BATCH_PATH = '/batch'
+
+HTTP_REASONS = {
+    200: 'OK', 204: 'No Content', 400: 'Bad Request', 404: 'Not Found',
+    409: 'Conflict', 429: 'Too Many Requests', 503: 'Service Unavailable'
+}
+
+
+def parse_fields(spec):
+    """Partial response "fields" ifodasini daraxtga o'girish
+
+    "nextPageToken,users(id,name/fullName)" ->
+    {'nextPageToken': None, 'users': {'id': None, 'name': {'fullName': None}}}
+    """
+    position = 0
+
+    def parse_list():
+        nonlocal position
+        tree = {}
+        while position < len(spec) and spec[position] != ')':
+            start = position
+            while position < len(spec) and spec[position] not in ',()':
+                position += 1
+            path = spec[start:position].strip().split('/')
+
+            subtree = None
+            if position < len(spec) and spec[position] == '(':
+                position += 1
+                subtree = parse_list()
+                position += 1  # ')'
+
+            node = tree
+            for name in path[:-1]:
+                if name in node and node[name] is None:
+                    break  # butun obyekt allaqachon so'ralgan
+                node = node.setdefault(name, {})
+            else:
+                node[path[-1]] = subtree
+
+            if position < len(spec) and spec[position] == ',':
+                position += 1
+        return tree
+
+    return parse_list()
+
+
+def project(value, tree):
+    """Qiymatdan faqat fields daraxtidagi maydonlarni qoldirish"""
+    if tree is None:
+        return value
+    if isinstance(value, list):
+        return [project(item, tree) for item in value]
+    if isinstance(value, dict):
+        return {key: project(value[key], subtree)
+                for key, subtree in tree.items() if key in value}
+    return value
+
+
+class ApiError(Exception):
+    """Directory API xato javobi"""
+
+    def __init__(self, status, reason, message):
+        super().__init__(message)
+        self.status = status
+        self.reason = reason
+
+    def body(self):
+        return {'error': {'code': self.status, 'message': str(self),
+                          'errors': [{'reason': self.reason, 'message': str(self)}]}}
+
+
+class FakeDirectory:
+    """Xotiradagi foydalanuvchilar/guruhlar ombori va endpoint'lar mantiqi"""
+
+    def __init__(self, latency=0.0, throttle_rate=0.0, error_rate=0.0, seed=None):
+        self.latency = latency
+        self.throttle_rate = throttle_rate
+        self.error_rate = error_rate
+        self.random = random.Random(seed)
+        self.request_counts = {}
+
+        self._users = {}
+        self._by_email = {}
+        self._sorted_emails = []
+        self._groups = {}
+        self._members = {}
+        self._channels = {}
+        self._notifications = None
+        self._next_id = 100000000000000000000
+        self._lock = threading.Lock()
+        # Sinov uchun: keyingi shuncha push xabar yuborilmaydi (yo'qolgan xabarlar)
+        self.drop_notifications = 0
+
+    # --- ombor ---
+
+    def _new_id(self):
+        self._next_id += 1
+        return str(self._next_id)
+
+    @staticmethod
+    def _now():
+        return datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%S.000Z')
+
+    def _store(self, user):
+        user['etag'] = f'"{uuid.uuid4().hex}"'
+        self._users[user['id']] = user
+        email = user['primaryEmail'].lower()
+        if email not in self._by_email:
+            insort(self._sorted_emails, email)
+        self._by_email[email] = user['id']
+        for alias in user.get('aliases', []):
+            self._by_email[alias.lower()] = user['id']
+
+    def _unstore(self, user):
+        email = user['primaryEmail'].lower()
+        del self._users[user['id']]
+        del self._by_email[email]
+        for alias in user.get('aliases', []):
+            self._by_email.pop(alias.lower(), None)
+        del self._sorted_emails[bisect_left(self._sorted_emails, email)]
+
+    def _find(self, user_key):
+        user_id = self._by_email.get(user_key.lower(), user_key)
+        user = self._users.get(user_id)
+        if user is None:
+            raise ApiError(404, 'notFound', 'Resource Not Found: userKey')
+        return user
+
+    def _build_user(self, body):
+        name = dict(body.get('name', {}))
+        name.setdefault('fullName', f"{name.get('givenName', '')} {name.get('familyName', '')}".strip())
+        user = {key: value for key, value in body.items() if key not in ('password', 'hashFunction')}
+        user.update({
+            'kind': 'admin#directory#user',
+            'id': self._new_id(),
+            'primaryEmail': body['primaryEmail'],
+            'name': name,
+            'isAdmin': False,
+            'isDelegatedAdmin': False,
+            'lastLoginTime': '1970-01-01T00:00:00.000Z',
+            'creationTime': self._now(),
+            'agreedToTerms': False,
+            'suspended': bool(body.get('suspended', False)),
+            'archived': False,
+            'changePasswordAtNextLogin': bool(body.get('changePasswordAtNextLogin', False)),
+            'ipWhitelisted': False,
+            'emails': [{'address': body['primaryEmail'], 'primary': True}],
+            'customerId': 'C00000000',
+            'orgUnitPath': body.get('orgUnitPath', '/'),
+            'isMailboxSetup': True,
+            'includeInGlobalAddressList': True,
+            'thumbnailPhotoUrl': 'https://www.google.com/s2/photos/private/placeholder',
+            'aliases': list(body.get('aliases', []))
+        })
+        return user
+
+    def seed_users(self, count, domain='example.com', suspended_every=10):
+        """Ombor'ni tezda count ta foydalanuvchi bilan to'ldirish"""
+        with self._lock:
+            for i in range(count):
+                user = self._build_user({
+                    'primaryEmail': f"seed.user{i}@{domain}",
+                    'name': {'givenName': 'Seed', 'familyName': f"User{i}"},
+                    'suspended': suspended_every and i % suspended_every == 0
+                })
+                self._store(user)
+
+    def seed_group(self, email, members=(), name=None):
+        """Guruh yaratish va unga a'zolar qo'shish"""
+        with self._lock:
+            group = self._insert_group({'email': email, 'name': name or email.split('@')[0]})
+            for member in members:
+                self._insert_member(group, {'email': member})
+
+    def members(self, group_email):
+        """Guruh a'zolari email'lari (saralangan)"""
+        with self._lock:
+            return sorted(self._members.get(group_email.lower(), {}))
+
+    def users(self):
+        """Ombordagi barcha foydalanuvchilar (nusxa)"""
+        with self._lock:
+            return [json.loads(json.dumps(user)) for user in self._users.values()]
+
+    def channels(self):
+        """Faol watch kanallari (nusxa)"""
+        with self._lock:
+            return [dict(channel) for channel in self._channels.values()]
+
+    # --- push xabarlar (users.watch) ---
+
+    def _watch(self, params, body):
+        """users.watch: web_hook kanalini ro'yxatdan o'tkazish"""
+        event = params.get('event', 'update')
+        now_ms = int(time.time() * 1000)
+        expiration = int(body.get('expiration') or now_ms + 6 * 3600 * 1000)
+        channel = {
+            'id': body['id'],
+            'event': event,
+            'address': body['address'],
+            'token': body.get('token'),
+            'expiration': expiration,
+            'resourceId': uuid.uuid4().hex,
+            'resourceUri': (f"https://admin.googleapis.com/admin/directory/v1/users?"
+                            f"domain={params.get('domain', '')}&event={event}&alt=json"),
+            'message_number': 0
+        }
+        self._channels[channel['id']] = channel
+        # Google ro'yxatdan o'tgandan keyin "sync" xabarini yuboradi
+        self._queue_notification(channel, 'sync', None)
+        return {'kind': 'api#channel', 'id': channel['id'], 'resourceId': channel['resourceId'],
+                'resourceUri': channel['resourceUri'], 'token': channel['token'],
+                'expiration': str(expiration)}
+
+    def _stop_channel(self, body):
+        channel = self._channels.get(body.get('id'))
+        if channel is None or channel['resourceId'] != body.get('resourceId'):
+            raise ApiError(404, 'notFound', 'Channel not found')
+        del self._channels[channel['id']]
+
+    def _notify(self, event, user):
+        """Hodisaga obuna bo'lgan kanallarga xabar navbatga qo'yish (lock ostida chaqiriladi)"""
+        now_ms = int(time.time() * 1000)
+        payload = {'kind': 'admin#directory#user', 'id': user['id'], 'etag': user['etag'],
+                   'primaryEmail': user['primaryEmail']}
+        for channel in list(self._channels.values()):
+            if channel['expiration'] <= now_ms:
+                del self._channels[channel['id']]
+            elif channel['event'] == event:
+                self._queue_notification(channel, event, payload)
+
+    def _queue_notification(self, channel, state, payload):
+        channel['message_number'] += 1
+        if self.drop_notifications:
+            self.drop_notifications -= 1
+            return
+        if self._notifications is None:
+            self._notifications = queue.Queue()
+            threading.Thread(target=self._deliver, args=(self._notifications,), daemon=True).start()
+        headers = {
+            'X-Goog-Channel-ID': channel['id'],
+            'X-Goog-Channel-Expiration': time.strftime(
+                '%a, %d %b %Y %H:%M:%S GMT', time.gmtime(channel['expiration'] / 1000)),
+            'X-Goog-Resource-ID': channel['resourceId'],
+            'X-Goog-Resource-URI': channel['resourceUri'],
+            'X-Goog-Resource-State': state,
+            'X-Goog-Message-Number': str(channel['message_number'])
+        }
+        if channel['token']:
+            headers['X-Goog-Channel-Token'] = channel['token']
+        self._notifications.put((channel['address'], headers, payload))
+
+    @staticmethod
+    def _deliver(notifications):
+        """Fon thread: xabarlarni kanal manziliga POST qilish (tartib saqlanadi)"""
+        while True:
+            address, headers, payload = notifications.get()
+            data = json.dumps(payload).encode('utf-8') if payload is not None else b''
+            request = urllib.request.Request(address, data=data, method='POST', headers=dict(
+                headers, **{'Content-Type': 'application/json; charset=UTF-8'}))
+            try:
+                urllib.request.urlopen(request, timeout=5).close()
+            except OSError:
+                pass
+
+    # --- endpoint'lar ---
+
+    def _matches(self, user, filters):
+        for key, value in filters:
+            if key == 'isSuspended' and user.get('suspended', False) != (value == 'true'):
+                return False
+            if key == 'orgUnitPath' and not user.get('orgUnitPath', '/').startswith(value):
+                return False
+        return True
+
+    def _list(self, params):
+        prefix = ''
+        filters = []
+        for clause in params.get('query', '').split():
+            if clause.startswith('email:'):
+                prefix = clause[len('email:'):].rstrip('*').lower()
+            elif '=' in clause:
+                filters.append(tuple(clause.split('=', 1)))
+
+        max_results = min(int(params.get('maxResults', 100)), 500)
+        emails = self._sorted_emails
+        start = bisect_left(emails, prefix)
+        if params.get('pageToken'):
+            start = max(start, bisect_right(emails, params['pageToken']))
+
+        page = []
+        position = start
+        while position < len(emails) and len(page) < max_results:
+            email = emails[position]
+            if not email.startswith(prefix):
+                break
+            user = self._users[self._by_email[email]]
+            if self._matches(user, filters):
+                page.append(user)
+            position += 1
+
+        response = {'kind': 'admin#directory#users', 'users': page}
+        if position < len(emails) and emails[position].startswith(prefix) and page:
+            response['nextPageToken'] = page[-1]['primaryEmail'].lower()
+        return response
+
+    def _find_group(self, group_key):
+        group = self._groups.get(group_key.lower())
+        if group is None:
+            group = next((item for item in self._groups.values() if item['id'] == group_key), None)
+        if group is None:
+            raise ApiError(404, 'notFound', 'Resource Not Found: groupKey')
+        return group
+
+    def _insert_group(self, body):
+        email = body['email'].lower()
+        if email in self._groups:
+            raise ApiError(409, 'duplicate', 'Entity already exists.')
+        group = {
+            'kind': 'admin#directory#group',
+            'id': self._new_id(),
+            'etag': f'"{uuid.uuid4().hex}"',
+            'email': body['email'],
+            'name': body.get('name', email.split('@')[0]),
+            'description': body.get('description', ''),
+            'directMembersCount': '0',
+            'adminCreated': True
+        }
+        self._groups[email] = group
+        self._members[email] = {}
+        return group
+
+    def _insert_member(self, group, body):
+        members = self._members[group['email'].lower()]
+        email = body['email'].lower()
+        if email in members:
+            raise ApiError(409, 'duplicate', 'Member already exists.')
+        member = {
+            'kind': 'admin#directory#member',
+            'id': self._by_email.get(email, self._new_id()),
+            'email': body['email'],
+            'role': body.get('role', 'MEMBER'),
+            'type': 'USER',
+            'status': 'ACTIVE'
+        }
+        members[email] = member
+        group['directMembersCount'] = str(len(members))
+        return member
+
+    @staticmethod
+    def _page(items, params, key):
+        """Saralangan ro'yxatdan bitta sahifa (pageToken - oxirgi element kaliti)"""
+        max_results = min(int(params.get('maxResults', 200)), 200)
+        keys = [key(item) for item in items]
+        start = bisect_right(keys, params['pageToken']) if params.get('pageToken') else 0
+        page = items[start:start + max_results]
+        token = key(page[-1]) if page and start + max_results < len(items) else None
+        return page, token
+
+    def _handle_groups(self, method, path, params, body):
+        """groups va groups/{groupKey}/members endpoint'lari"""
+        parts = [unquote(part) for part in path.split('/') if part]
+
+        if not parts:
+            if method == 'GET':
+                groups = sorted(self._groups.values(), key=lambda group: group['email'].lower())
+                page, token = self._page(groups, params, lambda group: group['email'].lower())
+                response = {'kind': 'admin#directory#groups', 'groups': page}
+                if token:
+                    response['nextPageToken'] = token
+                return 200, response
+            if method == 'POST':
+                return 200, self._insert_group(body)
+
+        group = self._find_group(parts[0]) if parts else None
+        if len(parts) == 1:
+            if method == 'GET':
+                return 200, group
+            if method == 'DELETE':
+                del self._groups[group['email'].lower()]
+                del self._members[group['email'].lower()]
+                return 204, None
+
+        elif len(parts) >= 2 and parts[1] == 'members':
+            members = self._members[group['email'].lower()]
+            if len(parts) == 2:
+                if method == 'GET':
+                    page, token = self._page([members[email] for email in sorted(members)], params,
+                                             lambda member: member['email'].lower())
+                    response = {'kind': 'admin#directory#members', 'members': page}
+                    if token:
+                        response['nextPageToken'] = token
+                    return 200, response
+                if method == 'POST':
+                    return 200, self._insert_member(group, body)
+            else:
+                member = members.get(parts[2].lower())
+                if member is None:
+                    raise ApiError(404, 'notFound', 'Resource Not Found: memberKey')
+                if method == 'GET':
+                    return 200, member
+                if method == 'DELETE':
+                    del members[parts[2].lower()]
+                    group['directMembersCount'] = str(len(members))
+                    return 204, None
+
+        raise ApiError(400, 'invalid', f"Unsupported request: {method} {path}")
+
+    def handle(self, method, path, params, body):
+        """Bitta so'rovni bajarish: (status, javob lug'ati yoki None)"""
+        with self._lock:
+            self.request_counts[method] = self.request_counts.get(method, 0) + 1
+            roll = self.random.random()
+
+        if roll < self.throttle_rate:
+            raise ApiError(429, 'rateLimitExceeded', 'Rate Limit Exceeded')
+        if roll < self.throttle_rate + self.error_rate:
+            raise ApiError(503, 'backendError', 'Backend Error')
+
+        if path.startswith(GROUPS_PATH):
+            with self._lock:
+                return self._handle_groups(method, path[len(GROUPS_PATH):], params, body)
+        if path == CHANNELS_STOP_PATH and method == 'POST':
+            with self._lock:
+                self._stop_channel(body)
+            return 204, None
+        if not path.startswith(USERS_PATH):
+            raise ApiError(404, 'notFound', 'Not Found')
+        user_key = unquote(path[len(USERS_PATH):].lstrip('/'))
+
+        with self._lock:
+            if not user_key:
+                if method == 'GET':
+                    return 200, self._list(params)
+                if method == 'POST':
+                    if body['primaryEmail'].lower() in self._by_email:
+                        raise ApiError(409, 'duplicate', 'Entity already exists.')
+                    user = self._build_user(body)
+                    self._store(user)
+                    self._notify('add', user)
+                    return 200, user
+
+            elif user_key == WATCH_KEY and method == 'POST':
+                return 200, self._watch(params, body)
+
+            elif method == 'GET':
+                return 200, self._find(user_key)
+
+            elif method in ('PUT', 'PATCH'):
+                user = self._find(user_key)
+                for key, value in body.items():
+                    if key == 'name' and method == 'PATCH':
+                        user['name'] = dict(user['name'], **value)
+                    elif key not in ('password', 'hashFunction', 'id'):
+                        user[key] = value
+                self._store(user)
+                self._notify('update', user)
+                return 200, user
+
+            elif method == 'DELETE':
+                user = self._find(user_key)
+                self._unstore(user)
+                self._notify('delete', user)
+                return 204, None
+
+        raise ApiError(400, 'invalid', f"Unsupported request: {method} {path}")
+
+    def respond(self, method, target, body):
+        """So'rovni bajarib, (status, JSON matni) qaytarish - fields qo'llangan holda"""
+        url = urlsplit(target)
+        params = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        try:
+            status, payload = self.handle(method, url.path, params,
+                                          json.loads(body) if body else {})
+        except ApiError as e:
+            return e.status, json.dumps(e.body())
+
+        if payload is None:
+            return status, ''
+        if params.get('fields'):
+            payload = project(payload, parse_fields(params['fields']))
+        return status, json.dumps(payload)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        pass
+
+    def _accepts_gzip(self):
+        # Google faqat Accept-Encoding va User-Agent ikkalasida "gzip" bo'lsa siqadi
+        return ('gzip' in self.headers.get('Accept-Encoding', '')
+                and 'gzip' in self.headers.get('User-Agent', ''))
+
+    def _send(self, status, content, content_type='application/json; charset=UTF-8'):
+        data = content.encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        if data and self._accepts_gzip():
+            data = gzip.compress(data)
+            self.send_header('Content-Encoding', 'gzip')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _handle(self):
+        directory = self.server.directory
+        length = int(self.headers.get('Content-Length', 0))
+        body = self.rfile.read(length) if length else b''
+
+        if directory.latency:
+            time.sleep(directory.latency)
+
+        if urlsplit(self.path).path == BATCH_PATH:
+            self._send(*self._batch(body))
+        else:
+            status, content = directory.respond(self.command, self.path, body)
+            self._send(status, content)
+
+    def _batch(self, body):
+        """multipart/mixed batch so'rovini bajarish"""
+        content_type = self.headers['Content-Type']
+        message = BytesParser().parsebytes(
+            b'Content-Type: ' + content_type.encode() + b'\r\n\r\n' + body)
+
+        boundary = uuid.uuid4().hex
+        parts = []
+        for part in message.get_payload():
+            content_id = part['Content-ID'].strip('<>')
+            raw = part.get_payload(decode=False)
+            head, _, sub_body = raw.partition('\r\n\r\n') if '\r\n\r\n' in raw else raw.partition('\n\n')
+            method, target, _ = head.splitlines()[0].split(' ', 2)
+
+            status, content = self.server.directory.respond(method, target, sub_body.strip())
+            parts.append(
+                f"--{boundary}\r\n"
+                f"Content-Type: application/http\r\n"
+                f"Content-ID: <response-{content_id}>\r\n\r\n"
+                f"HTTP/1.1 {status} {HTTP_REASONS.get(status, 'Error')}\r\n"
+                f"Content-Type: application/json; charset=UTF-8\r\n"
+                f"Content-Length: {len(content.encode('utf-8'))}\r\n\r\n"
+                f"{content}\r\n"
+            )
+        parts.append(f"--{boundary}--\r\n")
+        return 200, ''.join(parts), f"multipart/mixed; boundary={boundary}"
+
+    do_GET = do_POST = do_PUT = do_PATCH = do_DELETE = _handle
+
+
+class FakeDirectoryServer:
+    """FakeDirectory'ni localhost'da HTTP server sifatida ishga tushirish
+
+    Misol:
+        with FakeDirectoryServer(latency=0.005) as server:
+            config["api_endpoint"] = server.url
+    """
+
+    def __init__(self, host='127.0.0.1', port=0, **options):
+        self.directory = FakeDirectory(**options)
+        self._server = ThreadingHTTPServer((host, port), _Handler)
+        self._server.daemon_threads = True
+        self._server.directory = self.directory
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/"
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
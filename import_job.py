@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""
+CSV/JSONL fayldan foydalanuvchilarni import qilish
+Har bir qator natijasi checkpoint faylga yoziladi - to'xtab qolgan job
+qayta ishga tushirilganda aynan to'xtagan joyidan davom etadi
+"""
+
+import csv
+import json
+import logging
+import os
+import time
+
+# Checkpoint'dagi qator holatlari
+STARTED = 'started'
+CREATED = 'created'
+FAILED = 'failed'
+
+
+def iter_rows(source):
+    """Manba fayldan (qator raqami, qator) juftliklarini o'qish
+
+    .jsonl / .ndjson fayllar JSON Lines, qolganlari CSV sifatida o'qiladi.
+    """
+    if source.endswith(('.jsonl', '.ndjson')):
+        with open(source, 'r', encoding='utf-8') as f:
+            row_number = 0
+            for line in f:
+                if line.strip():
+                    row_number += 1
+                    yield row_number, json.loads(line)
+    else:
+        with open(source, 'r', newline='', encoding='utf-8') as f:
+            for row_number, row in enumerate(csv.DictReader(f), 1):
+                yield row_number, row
+
+
+def default_row_mapper(row):
+    """Qatorni create_multiple_users formatiga o'tkazish"""
+    return {
+        'first_name': row['first_name'],
+        'last_name': row['last_name'],
+        'username': row.get('username') or None,
+        'password': row.get('password') or None
+    }
+
+
+class ImportJob:
+    """Qayta ishga tushirish mumkin bo'lgan import job"""
+
+    def __init__(self, creator, source, checkpoint_file=None, row_mapper=default_row_mapper,
+                 chunk_size=100, batch_size=None, workers=None, retry_failed=True,
+                 preflight=False, on_progress=None):
+        self.creator = creator
+        self.source = source
+        self.checkpoint_file = checkpoint_file or f"{source}.checkpoint.jsonl"
+        self.row_mapper = row_mapper
+        self.chunk_size = chunk_size
+        self.batch_size = batch_size
+        self.workers = workers
+        self.retry_failed = retry_failed
+        self.preflight = preflight
+        self.on_progress = on_progress
+        self.logger = logging.getLogger(__name__)
+
+    def load_checkpoint(self):
+        """Checkpoint'dan har bir qatorning oxirgi holatini o'qish"""
+        states = {}
+        if not os.path.exists(self.checkpoint_file):
+            return states
+
+        with open(self.checkpoint_file, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # Jarayon yozish paytida to'xtagan bo'lsa, oxirgi qator chala qoladi
+                    continue
+                states[record['row']] = record
+        return states
+
+    def _write(self, checkpoint, records):
+        """Yozuvlarni checkpoint'ga qo'shish va diskka majburan yozish"""
+        for record in records:
+            checkpoint.write(json.dumps(record) + '\n')
+        checkpoint.flush()
+        os.fsync(checkpoint.fileno())
+
+    def _recover(self, record, user_data):
+        """Natijasi noma'lum qator: foydalanuvchi yaratilganmi, API'dan tekshirish
+
+        Manzil band bo'lmasa None qaytadi (qator qayta yuboriladi). Band
+        bo'lsa, u faqat ism-familiya mos kelsa va "started" yozuvidagi
+        vaqtdan keyin yaratilgan bo'lsa shu import'niki hisoblanadi;
+        aks holda qator to'qnashuv sifatida FAILED bo'ladi.
+        """
+        user = self.creator._lookup_user(record['email'])
+        if user is None:
+            return None
+
+        # Eski checkpoint'larda urinish vaqti yo'q - bunday qatorni tasdiqlab bo'lmaydi
+        user_id = self.creator._created_by_attempt(
+            record['email'], user, user_data['first_name'], user_data['last_name'],
+            {'first_attempt': record['attempt']}) if 'attempt' in record else None
+        if user_id is None:
+            return {'row': record['row'], 'status': FAILED, 'email': record['email'],
+                    'error': f"User already exists and was not created by this import: {record['email']}"}
+
+        if self.creator.ledger.get(record['email']) is None:
+            self.creator.ledger.add({
+                'email': record['email'],
+                'password': None,
+                'first_name': user_data['first_name'],
+                'last_name': user_data['last_name'],
+                'created_at': None,
+                'user_id': user_id
+            })
+        return {'row': record['row'], 'status': CREATED, 'email': record['email'],
+                'user_id': user_id, 'recovered': True}
+
+    def _process(self, checkpoint, chunk, states, stats, index=None):
+        """Bitta qatorlar guruhini yaratish va natijalarni checkpoint'ga yozish"""
+        pending = []
+        outcomes = []
+        for row_number, user_data in chunk:
+            previous = states.get(row_number)
+            if previous and previous['status'] == STARTED:
+                recovered = self._recover(previous, user_data)
+                if recovered:
+                    outcomes.append(recovered)
+                    stats['created' if recovered['status'] == CREATED else 'failed'] += 1
+                    continue
+            pending.append((row_number, user_data))
+
+        # Username'lar "started" yozuvidan oldin hal qilinadi - checkpoint'dagi
+        # email haqiqatda yuboriladigan email bilan bir xil bo'lishi uchun
+        if index is not None:
+            resolved = self.creator.resolve_usernames([user_data for _, user_data in pending], index)
+            pending = [(row_number, user_data)
+                       for (row_number, _), user_data in zip(pending, resolved)]
+
+        # Yuborishdan oldin "started" yozuvi - jarayon shu yerda to'xtasa,
+        # qayta ishga tushirishda foydalanuvchi API'dan tekshiriladi
+        attempt = time.time()
+        self._write(checkpoint, outcomes + [
+            {'row': row_number, 'status': STARTED, 'attempt': attempt,
+             'email': self.creator.user_email(user_data['first_name'], user_data['last_name'],
+                                              user_data.get('username'))}
+            for row_number, user_data in pending
+        ])
+
+        results = self.creator.create_multiple_users(
+            [user_data for _, user_data in pending],
+            batch_size=self.batch_size,
+            workers=self.workers,
+            preflight=False
+        ) if pending else []
+
+        records = []
+        for (row_number, _), result in zip(pending, results):
+            if result['success']:
+                stats['created'] += 1
+                records.append({'row': row_number, 'status': CREATED,
+                                'email': result['email'], 'user_id': result['user_id']})
+            else:
+                stats['failed'] += 1
+                records.append({'row': row_number, 'status': FAILED,
+                                'email': result['email'], 'error': result['error']})
+        self._write(checkpoint, records)
+
+    def _report(self, stats, started):
+        elapsed = time.monotonic() - started
+        stats['elapsed'] = round(elapsed, 3)
+        stats['users_per_sec'] = round(
+            (stats['created'] + stats['failed']) / elapsed, 2) if elapsed > 0 else 0.0
+        self.logger.info(
+            f"Import progress: {stats['processed']} rows, {stats['created']} created, "
+            f"{stats['failed']} failed, {stats['skipped']} skipped "
+            f"({stats['users_per_sec']} users/sec)")
+        if self.on_progress:
+            self.on_progress(dict(stats))
+
+    def run(self):
+        """Job'ni ishga tushirish yoki to'xtagan joyidan davom ettirish"""
+        states = self.load_checkpoint()
+        stats = {'processed': 0, 'created': 0, 'failed': 0, 'skipped': 0}
+        started = time.monotonic()
+
+        if states:
+            self.logger.info(f"Resuming import from {self.checkpoint_file} ({len(states)} rows recorded)")
+
+        index = self.creator.build_username_index() if self.preflight else None
+
+        with open(self.checkpoint_file, 'a', encoding='utf-8') as checkpoint:
+            chunk = []
+            for row_number, row in iter_rows(self.source):
+                stats['processed'] += 1
+                previous = states.get(row_number)
+                if previous and (previous['status'] == CREATED or
+                                 (previous['status'] == FAILED and not self.retry_failed)):
+                    stats['skipped'] += 1
+                    continue
+
+                chunk.append((row_number, self.row_mapper(row)))
+                if len(chunk) >= self.chunk_size:
+                    self._process(checkpoint, chunk, states, stats, index)
+                    self._report(stats, started)
+                    chunk = []
+
+            if chunk:
+                self._process(checkpoint, chunk, states, stats, index)
+            self._report(stats, started)
+
+        return stats
+
+    def results(self):
+        """Checkpoint'dagi har bir qatorning yakuniy natijasi (qator tartibida)"""
+        states = self.load_checkpoint()
+        return [states[row_number] for row_number in sorted(states)]
@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""
+Tarmoqdan o'tgan baytlarni hisoblaydigan httplib2 ulanishi
+httplib2 gzip javobni o'zi ochadi va content-length'ni ochilgan hajmga
+almashtiradi - siqilgan (haqiqiy) hajm faqat javob o'qilayotganda ko'rinadi
+
+Ochiq request() metodi ochilgan javobni qaytaradi, shuning uchun httplib2'ning
+ichki _conn_request metodi o'raladi. Uning imzosi (conn, request_uri, method,
+body, headers) requirements.txt'da qotirilgan httplib2 versiyasi uchun
+tekshirilgan - versiyani o'zgartirganda shu faylni ham tekshiring.
+"""
+
+import httplib2
+
+
+class MeteredHttp(httplib2.Http):
+    """httplib2.Http + yuborilgan va qabul qilingan body baytlari hisoblagichlari
+
+    Hisoblagichlar faqat o'sib boradi: bitta so'rov hajmi - bajarilishidan
+    oldingi va keyingi qiymatlar farqi. Ulanishlar thread bo'yicha alohida
+    (workspace_email_creator._thread_http), shuning uchun lock kerak emas.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.bytes_sent = 0
+        self.bytes_received = 0
+
+    def _conn_request(self, conn, request_uri, method, body, headers):
+        getresponse = conn.getresponse
+
+        def metered_response():
+            response = getresponse()
+            read = response.read
+
+            def metered_read(*args):
+                data = read(*args)
+                self.bytes_received += len(data)
+                return data
+
+            response.read = metered_read
+            return response
+
+        if body:
+            self.bytes_sent += len(body.encode('utf-8') if isinstance(body, str) else body)
+        conn.getresponse = metered_response
+        try:
+            return super()._conn_request(conn, request_uri, method, body, headers)
+        finally:
+            # Ulanish keyingi so'rovlar uchun pool'da qoladi - asl metod tiklanadi
+            del conn.getresponse
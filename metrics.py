@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+"""
+Latency va throughput metrikalari
+Histogram, counter va gauge'lar - Prometheus matn formatida yoki JSON sifatida chiqariladi
+"""
+
+import cProfile
+import json
+import os
+import random
+import threading
+import time
+from contextlib import contextmanager
+
+# Histogram chegaralari (soniya)
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def _label_key(labels):
+    return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+
+def _format_labels(key, extra=()):
+    pairs = list(key) + list(extra)
+    if not pairs:
+        return ''
+    body = ','.join('{}="{}"'.format(name, value.replace('\\', '\\\\').replace('"', '\\"'))
+                    for name, value in pairs)
+    return '{' + body + '}'
+
+
+class Metrics:
+    """Thread-safe metrikalar reestri"""
+
+    def __init__(self, prefix='workspace', buckets=DEFAULT_BUCKETS):
+        self.prefix = prefix
+        self.buckets = tuple(buckets)
+        self._counters = {}
+        self._gauges = {}
+        self._histograms = {}
+        self._lock = threading.Lock()
+
+    def _name(self, name):
+        return f"{self.prefix}_{name}" if self.prefix else name
+
+    # --- yozish ---
+
+    def inc(self, name, value=1, **labels):
+        """Counter'ni oshirish"""
+        key = (self._name(name), _label_key(labels))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def gauge_add(self, name, delta, **labels):
+        """Gauge qiymatini o'zgartirish"""
+        key = (self._name(name), _label_key(labels))
+        with self._lock:
+            self._gauges[key] = self._gauges.get(key, 0) + delta
+
+    def observe(self, name, value, **labels):
+        """Histogram'ga qiymat (odatda soniya) qo'shish"""
+        key = (self._name(name), _label_key(labels))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = {
+                    'buckets': [0] * len(self.buckets), 'sum': 0.0, 'count': 0}
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    histogram['buckets'][i] += 1
+                    break
+            histogram['sum'] += value
+            histogram['count'] += 1
+
+    @contextmanager
+    def timer(self, name, **labels):
+        """Blok bajarilish vaqtini histogram'ga yozish"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - started, **labels)
+
+    @contextmanager
+    def in_flight(self, name, **labels):
+        """Blok bajarilayotgan paytda gauge'ni 1 ga oshirib turish"""
+        self.gauge_add(name, 1, **labels)
+        try:
+            yield
+        finally:
+            self.gauge_add(name, -1, **labels)
+
+    @contextmanager
+    def profile(self, name, sample_rate, directory='profiles'):
+        """sample_rate ehtimollik bilan blokni cProfile ostida bajarish
+
+        Natija directory/<name>-<vaqt>.prof fayliga yoziladi (pstats/snakeviz bilan ochiladi).
+        """
+        if not sample_rate or random.random() >= sample_rate:
+            yield None
+            return
+
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            yield profiler
+        finally:
+            profiler.disable()
+            os.makedirs(directory, exist_ok=True)
+            path = os.path.join(directory, f"{name}-{int(time.time() * 1000)}.prof")
+            profiler.dump_stats(path)
+            self.inc('profiles_total', operation=name)
+
+    def merge(self, snapshot, **labels):
+        """Boshqa reestr snapshot'ini qo'shish (masalan, worker jarayonlardan)
+
+        labels har bir metrikaga qo'shiladi (masalan, domain="a.com").
+        Histogram chegaralari bir xil bo'lishi kerak.
+        """
+        with self._lock:
+            for entry in snapshot.get('counters', []):
+                key = (entry['name'], _label_key(dict(entry['labels'], **labels)))
+                self._counters[key] = self._counters.get(key, 0) + entry['value']
+            for entry in snapshot.get('gauges', []):
+                key = (entry['name'], _label_key(dict(entry['labels'], **labels)))
+                self._gauges[key] = self._gauges.get(key, 0) + entry['value']
+            for entry in snapshot.get('histograms', []):
+                key = (entry['name'], _label_key(dict(entry['labels'], **labels)))
+                histogram = self._histograms.setdefault(
+                    key, {'buckets': [0] * len(self.buckets), 'sum': 0.0, 'count': 0})
+                for i, count in enumerate(entry['buckets'].values()):
+                    histogram['buckets'][i] += count
+                histogram['sum'] += entry['sum']
+                histogram['count'] += entry['count']
+
+    # --- o'qish ---
+
+    def snapshot(self):
+        """Barcha metrikalar JSON'ga mos lug'at sifatida"""
+        with self._lock:
+            counters = dict(self._counters)
+            gauges = dict(self._gauges)
+            histograms = {key: {'buckets': list(value['buckets']), 'sum': value['sum'],
+                                'count': value['count']}
+                          for key, value in self._histograms.items()}
+
+        def entries(items, render):
+            return [dict(name=name, labels=dict(labels), **render(value))
+                    for (name, labels), value in sorted(items.items())]
+
+        return {
+            'counters': entries(counters, lambda value: {'value': value}),
+            'gauges': entries(gauges, lambda value: {'value': value}),
+            'histograms': entries(histograms, lambda value: {
+                'buckets': dict(zip([str(bound) for bound in self.buckets], value['buckets'])),
+                'sum': round(value['sum'], 6),
+                'count': value['count']
+            })
+        }
+
+    def dump_json(self, path):
+        """Snapshot'ni JSON faylga yozish"""
+        with open(path, 'w') as f:
+            json.dump(self.snapshot(), f, indent=2)
+
+    def to_prometheus(self):
+        """Prometheus text exposition formati"""
+        with self._lock:
+            counters = sorted(self._counters.items())
+            gauges = sorted(self._gauges.items())
+            histograms = sorted((key, dict(value, buckets=list(value['buckets'])))
+                                for key, value in self._histograms.items())
+
+        lines = []
+        typed = set()
+
+        def declare(name, kind):
+            if name not in typed:
+                typed.add(name)
+                lines.append(f"# TYPE {name} {kind}")
+
+        for (name, labels), value in counters:
+            declare(name, 'counter')
+            lines.append(f"{name}{_format_labels(labels)} {value}")
+        for (name, labels), value in gauges:
+            declare(name, 'gauge')
+            lines.append(f"{name}{_format_labels(labels)} {value}")
+        for (name, labels), value in histograms:
+            declare(name, 'histogram')
+            cumulative = 0
+            for bound, count in zip(self.buckets, value['buckets']):
+                cumulative += count
+                lines.append(f"{name}_bucket{_format_labels(labels, [('le', str(bound))])} {cumulative}")
+            lines.append(f"{name}_bucket{_format_labels(labels, [('le', '+Inf')])} {value['count']}")
+            lines.append(f"{name}_sum{_format_labels(labels)} {value['sum']}")
+            lines.append(f"{name}_count{_format_labels(labels)} {value['count']}")
+        return '\n'.join(lines) + '\n'
+
+    def serve(self, port=9108, host='127.0.0.1'):
+        """/metrics endpoint'ini fon thread'ida ishga tushirish; server obyektini qaytaradi"""
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+        metrics = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                pass
+
+            def do_GET(self):
+                if self.path.split('?')[0] != '/metrics':
+                    self.send_error(404)
+                    return
+                body = metrics.to_prometheus().encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain; version=0.0.4')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        server = ThreadingHTTPServer((host, port), Handler)
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        return server
@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+Ko'p domenli runner: list, stats va import job'larini domenlar bo'yicha
+jarayonlar pool'ida parallel bajarish va natijalarni bitta hisobotga birlashtirish
+
+Manifest (JSON):
+    {
+      "max_workers": 4,
+      "global_qps": 40,
+      "domains": [
+        {"domain": "a.com", "config_file": "a.json", "credentials_file": "a-credentials.json",
+         "max_qps": 10, "import_file": "a-employees.csv"},
+        {"domain": "b.com", "config_file": "b.json", "credentials_file": "b-credentials.json"}
+      ]
+    }
+
+Buyruqlar qatoridan: workspace_cli.py multi-domain
+"""
+
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from metrics import Metrics
+
+JOBS = ('list', 'stats', 'import')
+
+# Manifest'dagi bitta domen uchun config'ni almashtiradigan kalitlar
+CONFIG_OVERRIDES = ('credentials_file', 'token_file', 'ledger_file', 'mirror_file',
+                    'log_file', 'audit_log_file', 'api_endpoint', 'batch_size', 'workers')
+
+# Domenlar bir-birining token, reestr, nusxa va loglarini ishlatmasligi uchun standart fayl nomlari
+DOMAIN_FILES = {
+    'token_file': '{domain}_token.pickle',
+    'ledger_file': '{domain}_users.db',
+    'mirror_file': '{domain}_directory.db',
+    'log_file': '{domain}_emails.log',
+    'audit_log_file': '{domain}_audit.jsonl'
+}
+
+# Manifest papkasiga nisbatan olinadigan fayl yo'llari
+PATH_KEYS = ('config_file', 'credentials_file', 'import_file') + tuple(DOMAIN_FILES)
+
+
+def load_manifest(path):
+    """Manifest'ni o'qish; nisbiy fayl yo'llari manifest papkasiga nisbatan olinadi
+
+    DOMAIN_FILES'dagi fayllar (token, reestr, nusxa, log va audit log)
+    berilmasa, har bir domen o'z fayllarini oladi (masalan, a.com_users.db) -
+    ular domen config'idagi qiymatlardan ustun turadi.
+    """
+    with open(path, 'r') as f:
+        manifest = json.load(f)
+
+    base = os.path.dirname(os.path.abspath(path))
+    for entry in manifest['domains']:
+        entry.setdefault('config_file', f"{entry['domain']}.json")
+        for key, pattern in DOMAIN_FILES.items():
+            entry.setdefault(key, pattern.format(domain=entry['domain']))
+        for key in PATH_KEYS:
+            if entry.get(key) and not os.path.isabs(entry[key]):
+                entry[key] = os.path.join(base, entry[key])
+    return manifest
+
+
+def domain_qps(entry, manifest, workers):
+    """Domen uchun QPS: domen kvotasi va global kvotaning bir jarayonga tushadigan ulushi
+
+    Bir vaqtda ko'pi bilan workers ta domen ishlaydi, shuning uchun har biriga
+    global_qps / workers berilsa, jami tezlik global kvotadan oshmaydi.
+    """
+    limits = [entry.get('max_qps'), manifest.get('max_qps_per_domain')]
+    if manifest.get('global_qps'):
+        limits.append(manifest['global_qps'] / workers)
+    limits = [limit for limit in limits if limit]
+    return min(limits) if limits else None
+
+
+def run_domain(entry, job, qps=None, options=None):
+    """Bitta domen uchun job (worker jarayonda bajariladi)
+
+    Natija JSON'ga mos lug'at: result, error, elapsed va metrikalar snapshot'i.
+    """
+    from workspace_email_creator import WorkspaceEmailCreator
+
+    options = options or {}
+    started = time.monotonic()
+    report = {'domain': entry['domain'], 'job': job, 'success': False}
+    creator = None
+    try:
+        overrides = {key: entry[key] for key in CONFIG_OVERRIDES if entry.get(key) is not None}
+        creator = WorkspaceEmailCreator(entry['domain'], config_file=entry['config_file'],
+                                        config_overrides=overrides)
+        if qps:
+            creator.rate_limiter.qps = min(creator.rate_limiter.qps, qps)
+            creator.rate_limiter.max_qps = min(creator.rate_limiter.max_qps, qps)
+
+        if job == 'list':
+            # list_users xatoda bo'sh ro'yxat qaytaradi - bu yerda xato hisobotga tushishi kerak
+            users = list(creator.iter_user_summaries())
+            if options.get('output_dir'):
+                path = os.path.join(options['output_dir'], f"{entry['domain']}_users.json")
+                with open(path, 'w') as f:
+                    json.dump(users, f, indent=2)
+                report['output'] = path
+            report['result'] = {'users': len(users)}
+        elif job == 'stats':
+            info = creator.get_domain_info()
+            if info is None:
+                raise RuntimeError(f"Could not get domain info for {entry['domain']}")
+            report['result'] = info
+        elif job == 'import':
+            if not entry.get('import_file'):
+                raise ValueError(f"No import_file in manifest for {entry['domain']}")
+            report['result'] = creator.import_users(
+                entry['import_file'], batch_size=options.get('batch_size'),
+                workers=options.get('workers'))
+        else:
+            raise ValueError(f"Unknown job: {job}")
+        report['success'] = True
+
+    except Exception as e:
+        report['error'] = f"{type(e).__name__}: {str(e)}"
+
+    report['elapsed'] = round(time.monotonic() - started, 3)
+    report['metrics'] = creator.metrics.snapshot() if creator else {}
+    return report
+
+
+def _totals(reports):
+    """Muvaffaqiyatli domenlar natijalaridagi raqamli qiymatlar yig'indisi"""
+    totals = {}
+    for report in reports:
+        for key, value in report.get('result', {}).items():
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                totals[key] = totals.get(key, 0) + value
+    return totals
+
+
+def run(manifest, job, max_workers=None, options=None, on_result=None):
+    """Job'ni manifest'dagi barcha domenlar uchun jarayonlar pool'ida bajarish
+
+    Natija: domenlar bo'yicha hisobotlar, jami qiymatlar va domain label'i
+    bilan birlashtirilgan metrikalar (Metrics obyekti "metrics" kalitida).
+    """
+    if job not in JOBS:
+        raise ValueError(f"job must be one of {JOBS}")
+
+    entries = manifest['domains']
+    workers = max(1, min(max_workers or manifest.get('max_workers') or os.cpu_count() or 1,
+                         len(entries) or 1))
+    started = time.monotonic()
+
+    reports = []
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(run_domain, entry, job, domain_qps(entry, manifest, workers),
+                                   options)
+                   for entry in entries]
+        for future in as_completed(futures):
+            report = future.result()
+            reports.append(report)
+            if on_result:
+                on_result(report)
+
+    merged = Metrics()
+    for report in reports:
+        merged.merge(report.pop('metrics'), domain=report['domain'])
+
+    reports.sort(key=lambda report: report['domain'])
+    return {
+        'job': job,
+        'domains': reports,
+        'succeeded': sum(1 for report in reports if report['success']),
+        'failed': sum(1 for report in reports if not report['success']),
+        'totals': _totals(report for report in reports if report['success']),
+        'elapsed': round(time.monotonic() - started, 3),
+        'metrics': merged
+    }
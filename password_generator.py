@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+Ommaviy parol generatori
+N ta parol bitta katta os.urandom buferidan olinadi: har bir belgi uchun
+alohida tizim chaqiruvi qilinmaydi, rejection sampling tufayli belgilar
+alifbo bo'yicha teng taqsimlangan (modulo bias yo'q)
+"""
+
+import hashlib
+import os
+import string
+import warnings
+
+SYMBOLS = '!@#$%^&*'
+
+# Bir-biriga o'xshash, qo'lda terishda adashtiriladigan belgilar
+AMBIGUOUS_CHARS = 'Il1O0o'
+
+# Google parol talablari: 8-100 belgi
+MIN_LENGTH = 8
+MAX_LENGTH = 100
+
+# Directory API qabul qiladigan hashFunction qiymatlari
+HASH_FUNCTIONS = ('SHA-1', 'MD5', 'crypt')
+
+CHARACTER_CLASSES = {
+    'lower': string.ascii_lowercase,
+    'upper': string.ascii_uppercase,
+    'digit': string.digits,
+    'symbol': SYMBOLS
+}
+
+
+class PasswordPolicy:
+    """Parol siyosati: uzunlik, majburiy belgi sinflari va chiqarib tashlanadigan belgilar"""
+
+    def __init__(self, length=12, required_classes=('lower', 'upper', 'digit', 'symbol'),
+                 exclude_ambiguous=False, exclude=''):
+        unknown = set(required_classes) - set(CHARACTER_CLASSES)
+        if unknown:
+            raise ValueError(f"Unknown character classes: {sorted(unknown)}")
+        if not MIN_LENGTH <= length <= MAX_LENGTH:
+            raise ValueError(f"Password length must be between {MIN_LENGTH} and {MAX_LENGTH}")
+        if length < len(required_classes):
+            raise ValueError("Password length is shorter than the number of required classes")
+
+        excluded = set(exclude) | (set(AMBIGUOUS_CHARS) if exclude_ambiguous else set())
+        self.length = length
+        self.required_classes = tuple(required_classes)
+        self.classes = {}
+        for name, chars in CHARACTER_CLASSES.items():
+            chars = ''.join(char for char in chars if char not in excluded)
+            if not chars and name in self.required_classes:
+                raise ValueError(f"All characters of required class '{name}' are excluded")
+            self.classes[name] = chars
+        self.alphabet = ''.join(self.classes.values())
+
+    @classmethod
+    def from_config(cls, config):
+        """config'dagi "default_password_length", "password_required_classes",
+        "password_exclude_ambiguous" va "password_exclude_chars" kalitlaridan
+        """
+        return cls(
+            length=config.get('default_password_length', 12),
+            required_classes=config.get('password_required_classes',
+                                        ('lower', 'upper', 'digit', 'symbol')),
+            exclude_ambiguous=config.get('password_exclude_ambiguous', False),
+            exclude=config.get('password_exclude_chars', '')
+        )
+
+    def violations(self, password, classes=True):
+        """Parol siyosatga mos kelmaydigan sabablar ro'yxati (mos bo'lsa - bo'sh)
+
+        classes=False bo'lsa, faqat Google'ning qat'iy talabi (8-100 belgi) tekshiriladi.
+        """
+        problems = []
+        if not MIN_LENGTH <= len(password) <= MAX_LENGTH:
+            problems.append(f"length must be between {MIN_LENGTH} and {MAX_LENGTH}")
+        if not classes:
+            return problems
+        for name in self.required_classes:
+            if set(CHARACTER_CLASSES[name]).isdisjoint(password):
+                problems.append(f"missing {name} character")
+        return problems
+
+
+class PasswordGenerator:
+    """Siyosatga mos parollarni bitta tasodifiy buferdan ommaviy generatsiya qilish
+
+    Bayt b faqat b < 256 - 256 % len(alphabet) bo'lsa qabul qilinadi va
+    alphabet[b % len(alphabet)] ga aylanadi - qolgan baytlar tashlab yuboriladi.
+    Bu bytes.translate bilan bitta C-darajadagi o'tishda bajariladi.
+    Majburiy sinflardan biri bo'lmagan parol butunlay tashlanadi va o'rniga
+    yangisi olinadi, shuning uchun natija siyosatga mos barcha parollar
+    orasida teng taqsimlangan.
+    """
+
+    def __init__(self, policy=None):
+        self.policy = policy or PasswordPolicy()
+        alphabet = self.policy.alphabet.encode('ascii')
+        limit = 256 - 256 % len(alphabet)
+        self._table = bytes(alphabet[value % len(alphabet)] if value < limit else 0
+                            for value in range(256))
+        self._rejected = bytes(range(limit, 256))
+        self._required = [frozenset(self.policy.classes[name])
+                          for name in self.policy.required_classes]
+        # Qabul qilinadigan baytlar ulushi (bufer hajmini hisoblash uchun)
+        self._acceptance = limit / 256
+
+    def _random_chars(self, count):
+        """Kamida count ta teng taqsimlangan alifbo belgisi"""
+        chars = b''
+        while len(chars) < count:
+            needed = count - len(chars)
+            size = int(needed / self._acceptance * 1.1) + 64
+            chars += os.urandom(size).translate(self._table, self._rejected)
+        return chars.decode('ascii')
+
+    def _valid(self, password):
+        return all(not required.isdisjoint(password) for required in self._required)
+
+    def generate(self, count=1, length=None):
+        """count ta parol ro'yxati"""
+        length = length or self.policy.length
+        if not MIN_LENGTH <= length <= MAX_LENGTH:
+            raise ValueError(f"Password length must be between {MIN_LENGTH} and {MAX_LENGTH}")
+
+        passwords = []
+        while len(passwords) < count:
+            # Rad etilgan parollar o'rnini to'ldirish uchun biroz ko'proq olinadi
+            missing = count - len(passwords)
+            chars = self._random_chars(length * (missing + missing // 2 + 1))
+            for start in range(0, len(chars) - length + 1, length):
+                password = chars[start:start + length]
+                if self._valid(password):
+                    passwords.append(password)
+                    if len(passwords) == count:
+                        break
+        return passwords
+
+
+def hash_password(password, hash_function):
+    """Parolni Directory API hashFunction formatida hash qilish
+
+    SHA-1 va MD5 - hex digest, crypt - tasodifiy tuzli SHA-512 crypt ($6$).
+    """
+    if hash_function == 'SHA-1':
+        return hashlib.sha1(password.encode('utf-8')).hexdigest()
+    if hash_function == 'MD5':
+        return hashlib.md5(password.encode('utf-8')).hexdigest()
+    if hash_function == 'crypt':
+        try:
+            with warnings.catch_warnings():
+                warnings.simplefilter('ignore', DeprecationWarning)
+                import crypt
+        except ImportError:  # Python 3.13+
+            raise ValueError("crypt hashing is not available in this Python version")
+        return crypt.crypt(password, crypt.mksalt(crypt.METHOD_SHA512))
+    raise ValueError(f"hash_function must be one of {HASH_FUNCTIONS}")
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Adaptiv token-bucket rate limiter
+Directory API so'rovlarini kvota doirasida ushlab turish uchun
+"""
+
+import threading
+import time
+
+
+class AdaptiveRateLimiter:
+    """Token-bucket limiter: muvaffaqiyatda tezlikni oshiradi, throttling'da kamaytiradi"""
+
+    def __init__(self, qps, max_qps=None, min_qps=0.5, increase_step=0.1,
+                 backoff_factor=0.5, backoff_interval=1.0):
+        self.qps = float(qps)
+        self.max_qps = float(max_qps or qps)
+        self.min_qps = min(float(min_qps), self.qps)
+        self.increase_step = increase_step
+        self.backoff_factor = backoff_factor
+        self.backoff_interval = backoff_interval
+        self.throttle_count = 0
+
+        self._tokens = self._burst()
+        self._updated = time.monotonic()
+        self._last_backoff = 0.0
+        self._lock = threading.Lock()
+
+    def _burst(self):
+        """Bucket sig'imi - bir soniyalik so'rovlar soni"""
+        return max(1.0, self.qps)
+
+    def _refill(self, now):
+        """O'tgan vaqt uchun tokenlarni qo'shish"""
+        self._tokens = min(self._burst(), self._tokens + (now - self._updated) * self.qps)
+        self._updated = now
+
+    def reserve(self, tokens=1):
+        """Token band qilish va kutish kerak bo'lgan vaqtni qaytarish (kutmasdan)
+
+        Bucket'dan katta so'rovlar (masalan, batch) qarzga olinadi va
+        keyingi chaqiruvlar qarz uzilguncha kutadi. asyncio kodida
+        qaytgan vaqt asyncio.sleep bilan kutiladi.
+        """
+        with self._lock:
+            self._refill(time.monotonic())
+            self._tokens -= tokens
+            return -self._tokens / self.qps if self._tokens < 0 else 0.0
+
+    def acquire(self, tokens=1):
+        """Token olish; yetarli token bo'lmasa kutish
+
+        Kutilgan vaqt (soniyalarda) qaytariladi.
+        """
+        wait = self.reserve(tokens)
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    def on_success(self):
+        """Muvaffaqiyatli javob - tezlikni kvota chegarasigacha asta oshirish"""
+        with self._lock:
+            if self.qps < self.max_qps:
+                self.qps = min(self.max_qps, self.qps + self.increase_step)
+
+    def on_throttle(self, retry_after=None):
+        """Throttling javobi (429 / rateLimitExceeded) - tezlikni kamaytirish
+
+        Bir vaqtda kelgan bir nechta throttling javoblari tezlikni
+        faqat bir marta kamaytiradi.
+        """
+        with self._lock:
+            self.throttle_count += 1
+            now = time.monotonic()
+            self._refill(now)
+
+            if now - self._last_backoff >= self.backoff_interval:
+                self.qps = max(self.min_qps, self.qps * self.backoff_factor)
+                self._last_backoff = now
+
+            # Bucket'ni bo'shatish, Retry-After bo'lsa shuncha vaqt to'xtatish
+            pause = float(retry_after) if retry_after else 0.0
+            self._tokens = min(self._tokens, -pause * self.qps)
@@ -0,0 +1,298 @@
+#!/usr/bin/env python3
+"""
+Desired-state reconcile: HR ro'yxatini Directory bilan solishtirish
+plan - faqat kerakli create/patch/suspend/delete'lar ro'yxati
+apply - rejani batch yoki parallel so'rovlar bilan bajarish
+
+Buyruqlar qatoridan: workspace_cli.py reconcile
+"""
+
+import json
+import time
+
+from googleapiclient.errors import HttpError
+
+from import_job import iter_rows
+
+# Snapshot uchun o'qiladigan maydonlar
+RECONCILE_FIELDS = 'primaryEmail,name(givenName,familyName),orgUnitPath,suspended'
+
+# Ro'yxatda yo'q foydalanuvchilar bilan nima qilish
+ON_MISSING = ('suspend', 'delete', 'ignore')
+
+TRUE_VALUES = {'true', '1', 'yes', 'y', 'ha'}
+FALSE_VALUES = {'false', '0', 'no', 'n', "yo'q"}
+
+
+def _parse_bool(value):
+    """CSV/JSON qiymatini True/False ga o'tkazish; bo'sh qiymat - None (boshqarilmaydi)"""
+    if value is None or isinstance(value, bool):
+        return value
+    value = str(value).strip().lower()
+    if value in TRUE_VALUES:
+        return True
+    if value in FALSE_VALUES:
+        return False
+    return None
+
+
+def desired_row_mapper(row):
+    """Qatorni desired-state yozuviga o'tkazish
+
+    Bo'sh ustunlar (org_unit, suspended) boshqarilmaydi - Directory'dagi qiymat o'zgartirilmaydi.
+    """
+    return {
+        'email': (row.get('email') or '').strip() or None,
+        'first_name': row['first_name'],
+        'last_name': row['last_name'],
+        'username': row.get('username') or None,
+        'password': row.get('password') or None,
+        'org_unit': row.get('org_unit') or None,
+        'suspended': _parse_bool(row.get('suspended'))
+    }
+
+
+def diff_user(current, desired):
+    """Joriy va kerakli holat orasidagi minimal patch body (o'zgarish bo'lmasa - bo'sh lug'at)"""
+    patch = {}
+    name = current.get('name', {})
+    name_patch = {}
+    if desired.get('first_name') and name.get('givenName') != desired['first_name']:
+        name_patch['givenName'] = desired['first_name']
+    if desired.get('last_name') and name.get('familyName') != desired['last_name']:
+        name_patch['familyName'] = desired['last_name']
+    if name_patch:
+        patch['name'] = name_patch
+
+    if desired.get('org_unit') and current.get('orgUnitPath', '/') != desired['org_unit']:
+        patch['orgUnitPath'] = desired['org_unit']
+    if desired.get('suspended') is not None and current.get('suspended', False) != desired['suspended']:
+        patch['suspended'] = desired['suspended']
+    return patch
+
+
+class ReconcilePlan:
+    """Reconcile rejasi: creates, updates (minimal patch), suspends va deletes"""
+
+    def __init__(self, creates=None, updates=None, suspends=None, deletes=None, unchanged=0):
+        self.creates = creates or []
+        self.updates = updates or []
+        self.suspends = suspends or []
+        self.deletes = deletes or []
+        self.unchanged = unchanged
+
+    def __len__(self):
+        """Rejadagi yozish amallari soni"""
+        return len(self.creates) + len(self.updates) + len(self.suspends) + len(self.deletes)
+
+    def summary(self):
+        return {
+            'create': len(self.creates),
+            'update': len(self.updates),
+            'suspend': len(self.suspends),
+            'delete': len(self.deletes),
+            'unchanged': self.unchanged
+        }
+
+    def to_dict(self):
+        # Parollar reja fayliga yozilmaydi - yaratishda yangi parol generatsiya qilinadi
+        creates = [{key: value for key, value in user.items() if key != 'password'}
+                   for user in self.creates]
+        return {'creates': creates, 'updates': self.updates, 'suspends': self.suspends,
+                'deletes': self.deletes, 'unchanged': self.unchanged}
+
+    def save(self, path):
+        """Rejani JSON faylga yozish (ko'rib chiqish va keyinroq apply qilish uchun)"""
+        with open(path, 'w') as f:
+            json.dump(self.to_dict(), f, indent=2, ensure_ascii=False)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'r') as f:
+            return cls(**json.load(f))
+
+
+def _existing_users(creator, emails):
+    """Skanga tushmagan manzillar uchun batch get: {so'ralgan email: foydalanuvchi}"""
+    users = creator._users()
+    requests = [users.get(userKey=email, fields=RECONCILE_FIELDS) for email in emails]
+    existing = {}
+    for outcomes in creator._execute_batch(requests):
+        for index, user, error in outcomes:
+            if error is None:
+                existing[emails[index]] = user
+            elif not (isinstance(error, HttpError) and error.resp.status == 404):
+                raise error
+    return existing
+
+
+def _plan_update(plan, email, current, wanted):
+    """Mavjud foydalanuvchi uchun patch (yoki unchanged) qo'shish"""
+    patch = diff_user(current, wanted)
+    if patch:
+        plan.updates.append({'email': email, 'patch': patch})
+    else:
+        plan.unchanged += 1
+
+
+def build_plan(creator, source, row_mapper=desired_row_mapper, on_missing='suspend',
+               query=None, shards=None, protected=()):
+    """Desired-state fayl va Directory snapshot'idan reja tuzish
+
+    Directory bitta field-masked skan bilan oqim sifatida o'qiladi va har bir
+    foydalanuvchi darhol kerakli holat bilan solishtiriladi. query (masalan,
+    "orgUnitPath=/Staff") boshqariladigan foydalanuvchilarni cheklaydi -
+    undan tashqaridagilar suspend/delete qilinmaydi. Skanga tushmagan
+    ro'yxatdagi manzillar butun domen bo'yicha (batch get) tekshiriladi:
+    boshqa bo'limda mavjud foydalanuvchi yaratilmaydi, balki patch
+    (masalan, org_unit bo'yicha ko'chirish) qilinadi. Admin email va
+    protected'dagi manzillarga hech qachon tegilmaydi.
+    """
+    if on_missing not in ON_MISSING:
+        raise ValueError(f"on_missing must be one of {ON_MISSING}")
+
+    desired = {}
+    for _, row in iter_rows(source):
+        user = row_mapper(row)
+        if user.get('email'):
+            user['username'] = user['email'].split('@')[0]
+        email = creator.user_email(user['first_name'], user['last_name'], user.get('username'))
+        desired[email.lower()] = user
+
+    protected = {email.lower() for email in protected}
+    if creator.config.get('admin_email'):
+        protected.add(creator.config['admin_email'].lower())
+
+    plan = ReconcilePlan()
+    for current in creator._scan_users(fields=RECONCILE_FIELDS, shards=shards, query=query):
+        email = current['primaryEmail'].lower()
+        wanted = desired.pop(email, None)
+        if wanted is None:
+            if email in protected or on_missing == 'ignore':
+                continue
+            if on_missing == 'delete':
+                plan.deletes.append(email)
+            elif not current.get('suspended', False):
+                plan.suspends.append(email)
+            continue
+
+        _plan_update(plan, email, current, wanted)
+
+    # Skan doirasidan tashqarida mavjud bo'lganlar yaratilmaydi
+    if query and desired:
+        for email, current in _existing_users(creator, list(desired)).items():
+            wanted = desired.pop(email)
+            if current['primaryEmail'].lower() != email:
+                creator.logger.warning(
+                    f"{email} is an alias of {current['primaryEmail']}, not reconciled")
+                continue
+            _plan_update(plan, email, current, wanted)
+
+    # Qolganlar - yangi foydalanuvchilar
+    plan.creates.extend(desired.values())
+
+    creator.logger.info(f"Reconcile plan: {plan.summary()}")
+    return plan
+
+
+def _write_requests(creator, plan):
+    """Rejadagi patch/suspend/delete amallari: (amal, email, so'rov)"""
+    users = creator._users()
+    writes = [('update_user', item['email'], users.patch(userKey=item['email'], body=item['patch']))
+              for item in plan.updates]
+    writes += [('suspend_user', email, users.patch(userKey=email, body={'suspended': True}))
+               for email in plan.suspends]
+    writes += [('delete_user', email, users.delete(userKey=email)) for email in plan.deletes]
+    return writes
+
+
+def _patch_bodies(plan):
+    """{email: patch tanasi} - lokal nusxaga yozish uchun"""
+    bodies = {item['email']: item['patch'] for item in plan.updates}
+    bodies.update((email, {'suspended': True}) for email in plan.suspends)
+    return bodies
+
+
+def apply_plan(creator, plan, batch_size=None, workers=None):
+    """Rejani bajarish
+
+    Yaratishlar create_multiple_users orqali (org_unit va suspended insert
+    tanasining o'zida), patch/suspend/delete'lar
+    batch so'rovlar bilan (workers berilsa va batch_size berilmasa - thread
+    pool'da parallel) yuboriladi. Natija: har bir amal turi bo'yicha
+    muvaffaqiyatlar soni va xatolar ro'yxati.
+    """
+    if not creator.service:
+        creator.authenticate()
+
+    stats = {'created': 0, 'updated': 0, 'suspended': 0, 'deleted': 0, 'failed': 0, 'errors': []}
+
+    if plan.creates:
+        for result in creator.create_multiple_users(
+                plan.creates, batch_size=batch_size, workers=workers, preflight=False):
+            if result['success']:
+                stats['created'] += 1
+            else:
+                stats['failed'] += 1
+                stats['errors'].append(result)
+
+    writes = _write_requests(creator, plan)
+
+    counters = {'update_user': 'updated', 'suspend_user': 'suspended', 'delete_user': 'deleted'}
+    bodies = _patch_bodies(plan)
+    deleted = []
+    patched = []
+
+    def record(operation, email, error, started, retry_stats):
+        if error is None:
+            if operation == 'delete_user':
+                deleted.append(email)
+            else:
+                patched.append((email, bodies[email]))
+            stats[counters[operation]] += 1
+            result = {'success': True, 'email': email}
+        else:
+            stats['failed'] += 1
+            result = {'success': False, 'email': email,
+                      'error': f"Error in {operation} for {email}: {str(error)}"}
+            creator.logger.error(result['error'])
+            stats['errors'].append(result)
+        creator._audit_result(operation, email, result, started, retry_stats, reconcile=True)
+
+    batch_size = batch_size or creator.config.get('batch_size')
+    workers = workers or creator.config.get('workers')
+    if workers and not batch_size:
+        def execute(write):
+            operation, email, request = write
+            retry_stats = {}
+            started = time.perf_counter()
+            try:
+                creator._execute(request, retry_stats)
+                error = None
+            except Exception as e:
+                error = e
+            return operation, email, error, started, retry_stats
+
+        for outcome in creator._run_concurrent(execute, writes, workers):
+            record(*outcome)
+    else:
+        retry_stats = {}
+        started = time.perf_counter()
+        for outcomes in creator._execute_batch([request for _, _, request in writes],
+                                               batch_size, retry_stats):
+            for index, _, error in outcomes:
+                operation, email, _ = writes[index]
+                record(operation, email, error, started, retry_stats.get(index, {}))
+            started = time.perf_counter()
+
+    # Reestrdan o'chirilganlar bitta tranzaksiyada olib tashlanadi
+    with creator.metrics.timer('local_io_seconds', operation='ledger_remove'):
+        creator.ledger.remove_many(deleted)
+    creator._mirror_write_through('patch_many', patched)
+    creator._mirror_write_through('remove_emails', deleted)
+
+    creator.logger.info(
+        f"Reconcile applied: {stats['created']} created, {stats['updated']} updated, "
+        f"{stats['suspended']} suspended, {stats['deleted']} deleted, {stats['failed']} failed")
+    return stats
+
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Lokal nusxaga (DirectoryMirror) yozish testlari - fake_directory serveri ustida
+Ishlatish:
+    python3 -m unittest test_directory_mirror
+"""
+
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import tempfile
+import unittest
+
+from fake_directory import FakeDirectoryServer
+from workspace_email_creator import WorkspaceEmailCreator
+
+try:
+    from async_workspace_email_creator import AsyncWorkspaceEmailCreator, aiohttp
+except ImportError:
+    aiohttp = None
+
+
+class MirrorWriteThroughTest(unittest.TestCase):
+
+    def setUp(self):
+        logging.disable(logging.CRITICAL)
+        self.addCleanup(logging.disable, logging.NOTSET)
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.server = FakeDirectoryServer(seed=1)
+        self.server.__enter__()
+        self.addCleanup(self.server.__exit__, None, None, None)
+        self.server.directory.seed_users(3, 'ex.com')
+
+        path = lambda name: os.path.join(self.directory.name, name)
+        self.mirror_file = path('mirror.db')
+        self.config_file = path('config.json')
+        with open(self.config_file, 'w') as f:
+            json.dump({
+                'domain': 'ex.com', 'credentials_file': path('credentials.json'),
+                'token_file': path('token.pickle'), 'organizational_unit': '/',
+                'api_endpoint': self.server.url, 'ledger_file': path('ledger.db'),
+                'mirror_file': self.mirror_file, 'mirror_max_staleness': 300,
+                'log_file': path('emails.log'), 'audit_log_file': path('audit.jsonl')
+            }, f)
+
+    def _stored_users(self):
+        with sqlite3.connect(self.mirror_file) as conn:
+            return [json.loads(data) for (data,) in conn.execute('SELECT data FROM users')]
+
+    def assertNoSecrets(self):
+        for user in self._stored_users():
+            for key in ('password', 'hashFunction', 'changePasswordAtNextLogin'):
+                self.assertNotIn(key, user)
+
+    def test_created_and_updated_users_are_mirrored_without_password(self):
+        creator = WorkspaceEmailCreator('ex.com', config_file=self.config_file)
+        self.assertEqual(len(creator.list_users()), 3)
+
+        result = creator.create_user('Ali', 'Valiyev', custom_password='Password123')
+        self.assertTrue(result['success'])
+        update = creator.update_user('ali.valiyev@ex.com', {
+            'password': 'S3cret-Plain!', 'hashFunction': 'SHA-1',
+            'changePasswordAtNextLogin': True, 'orgUnitPath': '/Sales'
+        })
+        self.assertTrue(update['success'])
+
+        user = creator.mirror.get_by_email('ali.valiyev@ex.com')
+        self.assertEqual(user['orgUnitPath'], '/Sales')
+        self.assertEqual(len(creator.list_users()), 4)
+        self.assertNoSecrets()
+
+        creator.delete_user('ali.valiyev@ex.com')
+        self.assertIsNone(creator.mirror.get_by_email('ali.valiyev@ex.com'))
+
+    @unittest.skipIf(aiohttp is None, "aiohttp o'rnatilmagan")
+    def test_async_creator_writes_through(self):
+        WorkspaceEmailCreator('ex.com', config_file=self.config_file).sync_mirror()
+
+        async def run():
+            async with AsyncWorkspaceEmailCreator('ex.com', config_file=self.config_file) as creator:
+                await creator.create_multiple_users([{'first_name': 'Ali', 'last_name': 'Valiyev'}])
+                await creator.update_user('ali.valiyev@ex.com', {'password': 'S3cret-Plain!'})
+                return creator.creator.mirror.get_by_email('ali.valiyev@ex.com')
+
+        self.assertIsNotNone(asyncio.run(run()))
+        self.assertNoSecrets()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Yaratilgan foydalanuvchilar reestri (SQLite)
+Har bir yozuv alohida tranzaksiyada saqlanadi, email va user_id bo'yicha indekslangan
+"""
+
+import json
+import logging
+import sqlite3
+import threading
+
+# PRAGMA user_version: 1 - email kalitlari kichik harflarda
+SCHEMA_VERSION = 1
+
+logger = logging.getLogger(__name__)
+
+
+class UserLedger:
+    """Script tomonidan yaratilgan foydalanuvchilar ro'yxati"""
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=FULL')
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS created_users ('
+            ' email TEXT PRIMARY KEY,'
+            ' user_id TEXT,'
+            ' created_at TEXT,'
+            ' data TEXT NOT NULL)'
+        )
+        self._conn.execute(
+            'CREATE INDEX IF NOT EXISTS idx_created_users_user_id ON created_users (user_id)'
+        )
+        self._conn.commit()
+        if self._conn.execute('PRAGMA user_version').fetchone()[0] < SCHEMA_VERSION:
+            self._migrate()
+
+    def _migrate(self):
+        """Bir martalik migratsiya: email kalitlarini kichik harfga o'tkazish
+
+        Directory API email'larni katta-kichik harf farqsiz ko'radi. Bir manzil
+        ikki xil yozilgan bo'lsa, keyin qo'shilgan yozuv qoladi va bu logga yoziladi.
+        """
+        with self._lock:
+            self._conn.execute('BEGIN IMMEDIATE')
+            try:
+                # Boshqa jarayon migratsiyani allaqachon bajargan bo'lishi mumkin
+                if self._conn.execute('PRAGMA user_version').fetchone()[0] < SCHEMA_VERSION:
+                    rows = self._conn.execute(
+                        'SELECT rowid, email FROM created_users WHERE email != lower(email) '
+                        'ORDER BY rowid'
+                    ).fetchall()
+                    for rowid, email in rows:
+                        existing = self._conn.execute(
+                            'SELECT rowid FROM created_users WHERE email = ?', (email.lower(),)
+                        ).fetchone()
+                        if existing:
+                            keep, drop = max(rowid, existing[0]), min(rowid, existing[0])
+                            logger.warning(f"Ledger: merged duplicate rows for {email.lower()}, "
+                                           f"kept rowid {keep}")
+                            self._conn.execute('DELETE FROM created_users WHERE rowid = ?', (drop,))
+                            if drop == rowid:
+                                continue
+                        self._conn.execute('UPDATE created_users SET email = ? WHERE rowid = ?',
+                                           (email.lower(), rowid))
+                    self._conn.execute(f'PRAGMA user_version = {SCHEMA_VERSION}')
+                self._conn.commit()
+            except Exception:
+                self._conn.rollback()
+                raise
+
+    @staticmethod
+    def _row(user_info):
+        return (
+            user_info['email'].lower(),
+            user_info.get('user_id'),
+            user_info.get('created_at'),
+            json.dumps(user_info)
+        )
+
+    def add(self, user_info):
+        """Bitta foydalanuvchini qo'shish (darhol diskka yoziladi)"""
+        self.add_many([user_info])
+
+    def add_many(self, users):
+        """Bir nechta foydalanuvchini bitta tranzaksiyada qo'shish"""
+        rows = [self._row(user_info) for user_info in users]
+        if not rows:
+            return
+        with self._lock, self._conn:
+            self._conn.executemany(
+                'INSERT OR REPLACE INTO created_users (email, user_id, created_at, data) '
+                'VALUES (?, ?, ?, ?)',
+                rows
+            )
+
+    def remove(self, email):
+        """Foydalanuvchini email bo'yicha o'chirish"""
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                'DELETE FROM created_users WHERE email = ?', (email.lower(),)
+            )
+        return cursor.rowcount > 0
+
+    def remove_many(self, emails):
+        """Foydalanuvchilarni bitta tranzaksiyada o'chirish (o'chirilganlar soni)"""
+        rows = [(email.lower(),) for email in emails]
+        if not rows:
+            return 0
+        with self._lock, self._conn:
+            cursor = self._conn.executemany('DELETE FROM created_users WHERE email = ?', rows)
+        return cursor.rowcount
+
+    def _fetch_one(self, query, params):
+        with self._lock:
+            row = self._conn.execute(query, params).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def get(self, email):
+        """Foydalanuvchini email bo'yicha topish"""
+        return self._fetch_one(
+            'SELECT data FROM created_users WHERE email = ?', (email.lower(),)
+        )
+
+    def get_by_user_id(self, user_id):
+        """Foydalanuvchini Google user_id bo'yicha topish"""
+        return self._fetch_one('SELECT data FROM created_users WHERE user_id = ?', (user_id,))
+
+    def count(self):
+        """Reestrdagi foydalanuvchilar soni"""
+        with self._lock:
+            return self._conn.execute('SELECT COUNT(*) FROM created_users').fetchone()[0]
+
+    def iter_users(self):
+        """Barcha yozuvlarni qo'shilish tartibida qaytarish"""
+        with self._lock:
+            rows = self._conn.execute('SELECT data FROM created_users ORDER BY rowid').fetchall()
+        for (data,) in rows:
+            yield json.loads(data)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
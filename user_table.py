@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""
+Katta Directory snapshot'lari uchun ixcham ustunli (columnar) foydalanuvchilar jadvali
+Har bir foydalanuvchi uchun lug'at o'rniga: satrlar umumiy UTF-8 buferda,
+suspended - bitset, vaqtlar - int64 epoch (millisekund) massivlarida saqlanadi
+"""
+
+from array import array
+from collections.abc import Mapping
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from itertools import accumulate
+
+# Vaqt qiymati yo'q (None) belgisi
+NULL_TIME = -2 ** 63
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_MILLISECOND = timedelta(milliseconds=1)
+
+COLUMNS = ('email', 'name', 'suspended', 'created_time', 'last_login')
+
+
+def parse_time(value):
+    """RFC 3339 vaqt ("2024-01-31T12:00:00.000Z") -> epoch millisekund (yo'q bo'lsa NULL_TIME)
+
+    datetime.fromisoformat (C'da) ishlatiladi; butun sonli timedelta bo'lish
+    float yaxlitlash xatosisiz aniq millisekund beradi.
+    """
+    if not value:
+        return NULL_TIME
+    if value[-1] == 'Z':
+        # Python 3.11'gacha fromisoformat "Z"ni qabul qilmaydi
+        value = value[:-1] + '+00:00'
+    return (datetime.fromisoformat(value) - _EPOCH) // _MILLISECOND
+
+
+@lru_cache(maxsize=8192)
+def _day_string(day_number):
+    """epoch kun raqami -> "YYYY-MM-DD" (format_time uchun keshlanadi)"""
+    return datetime.fromtimestamp(day_number * 86400, timezone.utc).strftime('%Y-%m-%d')
+
+
+def format_time(millis):
+    """epoch millisekund -> Directory API formatidagi vaqt (NULL_TIME -> None)"""
+    if millis == NULL_TIME:
+        return None
+    seconds, millis = divmod(millis, 1000)
+    day_number, seconds = divmod(seconds, 86400)
+    hours, seconds = divmod(seconds, 3600)
+    minutes, seconds = divmod(seconds, 60)
+    return f"{_day_string(day_number)}T{hours:02d}:{minutes:02d}:{seconds:02d}.{millis:03d}Z"
+
+
+class StringColumn:
+    """Satrlar ustuni: barcha qiymatlar bitta bytearray'da, chegaralari offsets massivida
+
+    Har bir qiymat uchun alohida str obyekti (~50 bayt qo'shimcha xotira) saqlanmaydi -
+    satr faqat o'qilganda buferdan dekodlanadi.
+    """
+
+    def __init__(self):
+        self._data = bytearray()
+        self._offsets = array('Q', [0])
+
+    def append(self, value):
+        self._data += (value or '').encode('utf-8')
+        self._offsets.append(len(self._data))
+
+    def extend(self, values):
+        """Ko'p qiymatni bitta join bilan qo'shish"""
+        encoded = [(value or '').encode('utf-8') for value in values]
+        offsets = accumulate(map(len, encoded), initial=len(self._data))
+        next(offsets)  # joriy oxir - allaqachon offsets'da
+        self._offsets.extend(offsets)
+        self._data += b''.join(encoded)
+
+    def __getitem__(self, index):
+        return self._data[self._offsets[index]:self._offsets[index + 1]].decode('utf-8')
+
+    def __len__(self):
+        return len(self._offsets) - 1
+
+    def nbytes(self):
+        return len(self._data) + self._offsets.itemsize * len(self._offsets)
+
+
+class UserRow(Mapping):
+    """Jadvaldagi bitta qatorning ko'rinishi (view) - list_users lug'ati kabi o'qiladi"""
+
+    __slots__ = ('_table', '_index')
+
+    def __init__(self, table, index):
+        self._table = table
+        self._index = index
+
+    def __getitem__(self, key):
+        table, index = self._table, self._index
+        if key == 'email':
+            return table.emails[index]
+        if key == 'name':
+            return table.names[index]
+        if key == 'suspended':
+            return table.is_suspended(index)
+        if key == 'created_time':
+            return format_time(table.created[index])
+        if key == 'last_login':
+            return format_time(table.last_login[index])
+        raise KeyError(key)
+
+    def __iter__(self):
+        return iter(COLUMNS)
+
+    def __len__(self):
+        return len(COLUMNS)
+
+    def __repr__(self):
+        return f"UserRow({dict(self)!r})"
+
+
+class UserTable:
+    """list_users natijasining ustunli varianti
+
+    Qatorlar faqat so'ralganda UserRow ko'rinishi sifatida yaratiladi;
+    agregatlar massivlar ustida (C darajasida) hisoblanadi.
+    Misol:
+        table = creator.list_users(as_table=True)
+        print(len(table), table.summary())
+        for user in table:
+            print(user['email'], user['suspended'])
+    """
+
+    def __init__(self):
+        self.emails = StringColumn()
+        self.names = StringColumn()
+        self.suspended = bytearray()
+        self.created = array('q')
+        self.last_login = array('q')
+        self._size = 0
+
+    @classmethod
+    def from_users(cls, users):
+        """Directory API foydalanuvchilaridan (oqim sifatida) jadval tuzish"""
+        table = cls()
+        for user in users:
+            table.append(user)
+        return table
+
+    def append(self, user):
+        """Directory API foydalanuvchi obyektini qo'shish"""
+        index = self._size
+        if index % 8 == 0:
+            self.suspended.append(0)
+        if user.get('suspended', False):
+            self.suspended[index >> 3] |= 1 << (index & 7)
+
+        self.emails.append(user['primaryEmail'])
+        self.names.append(user.get('name', {}).get('fullName'))
+        self.created.append(parse_time(user.get('creationTime')))
+        self.last_login.append(parse_time(user.get('lastLoginTime')))
+        self._size += 1
+
+    def is_suspended(self, index):
+        if not 0 <= index < self._size:
+            raise IndexError(index)
+        return bool(self.suspended[index >> 3] & (1 << (index & 7)))
+
+    def __len__(self):
+        return self._size
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += self._size
+        if not 0 <= index < self._size:
+            raise IndexError(index)
+        return UserRow(self, index)
+
+    def __iter__(self):
+        for index in range(self._size):
+            yield UserRow(self, index)
+
+    def to_dicts(self):
+        """list_users'ning oddiy formati (lug'atlar ro'yxati)"""
+        return [dict(row) for row in self]
+
+    def suspended_count(self):
+        """To'xtatilgan foydalanuvchilar soni (bitset'dagi birliklar)"""
+        return bin(int.from_bytes(self.suspended, 'little')).count('1')
+
+    def summary(self):
+        """get_domain_info'dagi hisoblagichlar - har biri bitta massiv o'tishida"""
+        suspended = self.suspended_count()
+        return {
+            'total_users': self._size,
+            'active_users': self._size - suspended,
+            'suspended_users': suspended,
+            # Google hech kirmagan foydalanuvchi uchun 1970-01-01 qaytaradi
+            'never_logged_in': self.last_login.count(0) + self.last_login.count(NULL_TIME)
+        }
+
+    def nbytes(self):
+        """Jadval ma'lumotlari egallagan taxminiy xotira (bayt)"""
+        return (self.emails.nbytes() + self.names.nbytes() + len(self.suspended)
+                + self.created.itemsize * len(self.created)
+                + self.last_login.itemsize * len(self.last_login))
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Mavjud email manzillari indeksi
+Username to'qnashuvlarini API'ga so'rov yubormasdan lokal aniqlash uchun
+"""
+
+import hashlib
+import math
+from bisect import bisect_left
+
+from user_table import StringColumn
+
+
+class BloomFilter:
+    """Ixcham ehtimoliy to'plam: "yo'q" javobi aniq, "bor" javobi tekshirilishi kerak"""
+
+    def __init__(self, capacity, false_positive_rate=0.01):
+        capacity = max(1, capacity)
+        self.size = max(8, int(-capacity * math.log(false_positive_rate) / math.log(2) ** 2))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, key):
+        digest = hashlib.blake2b(key.encode('utf-8'), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], 'little')
+        second = int.from_bytes(digest[8:], 'little') | 1
+        return [(first + i * second) % self.size for i in range(self.hash_count)]
+
+    def add(self, key):
+        for position in self._positions(key):
+            self.bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, key):
+        return all(self.bits[position >> 3] & (1 << (position & 7))
+                   for position in self._positions(key))
+
+
+class UsernameIndex:
+    """Band qilingan email manzillari: Bloom filtr + saralangan ustunda aniq tekshiruv
+
+    Manzillar alohida str obyektlari sifatida emas, bitta StringColumn
+    buferida saqlanadi - satr faqat bisect tekshiruvida dekodlanadi.
+    """
+
+    def __init__(self, emails=(), false_positive_rate=0.01):
+        emails = sorted({email.lower() for email in emails})
+        self._bloom = BloomFilter(len(emails) or 1, false_positive_rate)
+        for email in emails:
+            self._bloom.add(email)
+        self._sorted = StringColumn()
+        self._sorted.extend(emails)
+        self._reserved = set()
+
+    def __len__(self):
+        return len(self._sorted) + len(self._reserved)
+
+    def __contains__(self, email):
+        email = email.lower()
+        if email not in self._bloom:
+            return False
+        if email in self._reserved:
+            return True
+        position = bisect_left(self._sorted, email)
+        return position < len(self._sorted) and self._sorted[position] == email
+
+    def reserve(self, email):
+        """Manzilni band qilish (shu bulk job ichida takrorlanmasligi uchun)"""
+        email = email.lower()
+        self._reserved.add(email)
+        self._bloom.add(email)
+
+    def resolve(self, email):
+        """Bo'sh manzilni topish va band qilish
+
+        Manzil band bo'lsa, username'ga 2, 3, ... qo'shimchasi qo'shiladi:
+        ali.karimov@domain -> ali.karimov2@domain
+        """
+        username, _, domain = email.partition('@')
+        candidate = email
+        suffix = 1
+        while candidate in self:
+            suffix += 1
+            candidate = f"{username}{suffix}@{domain}"
+
+        self.reserve(candidate)
+        return candidate
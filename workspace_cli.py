@@ -0,0 +1,367 @@
+#!/usr/bin/env python3
+"""
+Skriptlar va cron uchun buyruqlar qatori interfeysi (interaktiv menyusiz)
+Natijalar stdout'ga table/json/jsonl/csv formatida, loglar stderr'ga yoziladi;
+biror amal muvaffaqiyatsiz bo'lsa, exit code 1 qaytadi
+
+Ishlatish:
+    python3 workspace_cli.py --domain mycompany.com create Ali Valiyev
+    python3 workspace_cli.py --domain mycompany.com bulk-import employees.csv --batch-size 100
+    python3 workspace_cli.py --domain mycompany.com --format csv list > users.csv
+    python3 workspace_cli.py --domain mycompany.com --format json stats
+    python3 workspace_cli.py --domain mycompany.com query --org-unit /Sales --last-login-before 2026-03-01
+    python3 workspace_cli.py --domain mycompany.com delete old.user@mycompany.com --yes
+    python3 workspace_cli.py --domain mycompany.com suspend --inactive-days 180 --yes
+    python3 workspace_cli.py --domain mycompany.com delete --query "orgUnitPath=/Contractors" --suspend-first --yes
+    python3 workspace_cli.py --domain mycompany.com export users.csv.gz
+    python3 workspace_cli.py --domain mycompany.com --format csv export --ledger created.csv
+    python3 workspace_cli.py --domain mycompany.com reconcile roster.csv --apply --workers 8
+    python3 workspace_cli.py multi-domain manifest.json stats --report report.json --metrics metrics.prom
+"""
+
+import argparse
+import csv
+import json
+import logging
+import sys
+
+import multi_domain
+from directory_export import EXPORT_FIELDS, FORMATS
+from reconcile import ON_MISSING, ReconcilePlan
+
+# Google kutubxonalari bu yerda import qilinmaydi: workspace_email_creator
+# ularni faqat API'ga murojaat qilinganda yuklaydi (masalan, "export --ledger" offline)
+
+OUTPUT_FORMATS = ('table', 'json', 'jsonl', 'csv')
+
+
+def _columns(rows):
+    """Barcha qatorlardagi kalitlar (birinchi uchragan tartibda)"""
+    columns = {}
+    for row in rows:
+        columns.update(dict.fromkeys(row))
+    return list(columns)
+
+
+def write_rows(rows, output_format, stream=sys.stdout):
+    """Natija qatorlarini (lug'atlar ro'yxati) tanlangan formatda yozish"""
+    if output_format == 'json':
+        json.dump(rows, stream, indent=2, ensure_ascii=False)
+        stream.write('\n')
+    elif output_format == 'jsonl':
+        for row in rows:
+            stream.write(json.dumps(row, ensure_ascii=False) + '\n')
+    elif output_format == 'csv':
+        writer = csv.DictWriter(stream, fieldnames=_columns(rows), extrasaction='ignore')
+        writer.writeheader()
+        writer.writerows(rows)
+    else:
+        columns = _columns(rows)
+        cells = [[str(row.get(column, '')) if row.get(column) is not None else ''
+                  for column in columns] for row in rows]
+        widths = [max([len(column)] + [len(line[i]) for line in cells])
+                  for i, column in enumerate(columns)]
+        for line in [columns] + cells:
+            stream.write('  '.join(value.ljust(width) for value, width in zip(line, widths)).rstrip()
+                         + '\n')
+
+
+def _output(args, rows, path=None):
+    """Qatorlarni faylga (path yoki --output) yoki stdout'ga yozish"""
+    path = path or args.output
+    if path and path != '-':
+        with open(path, 'w', newline='', encoding='utf-8') as f:
+            write_rows(rows, args.format, f)
+    else:
+        write_rows(rows, args.format)
+
+
+def _creator(args):
+    """WorkspaceEmailCreator (domen --domain yoki config'dagi "domain"dan)"""
+    from workspace_email_creator import WorkspaceEmailCreator
+
+    domain = args.domain
+    if not domain:
+        try:
+            with open(args.config, 'r') as f:
+                domain = json.load(f).get('domain')
+        except (OSError, ValueError):
+            domain = None
+    if not domain:
+        raise SystemExit("--domain kerak (yoki config faylida \"domain\")")
+
+    creator = WorkspaceEmailCreator(domain, config_file=args.config)
+    if args.quiet:
+        logging.getLogger().setLevel(logging.WARNING)
+    return creator
+
+
+def _result_rows(results):
+    """create/delete natijalari: muvaffaqiyat, email va parol yoki xato"""
+    return [{'success': result['success'], 'email': result.get('email'),
+             'password': result.get('password'), 'error': result.get('error')}
+            for result in results]
+
+
+def cmd_create(args, creator):
+    result = creator.create_user(args.first_name, args.last_name, username=args.username,
+                                 custom_password=args.password)
+    _output(args, _result_rows([result]))
+    return 0 if result['success'] else 1
+
+
+def cmd_bulk_import(args, creator):
+    stats = creator.import_users(
+        args.source, checkpoint_file=args.checkpoint, chunk_size=args.chunk_size,
+        batch_size=args.batch_size, workers=args.workers,
+        retry_failed=not args.no_retry_failed, preflight=args.preflight)
+    _output(args, [stats])
+    return 1 if stats['failed'] else 0
+
+
+def cmd_list(args, creator):
+    users = list(creator.iter_user_summaries(shards=args.shards, query=args.query))
+    _output(args, users)
+    return 0
+
+
+def cmd_query(args, creator):
+    filters = {
+        'org_unit': args.org_unit, 'include_children': not args.no_children,
+        'suspended': args.suspended, 'prefix': args.prefix,
+        'last_login_after': args.last_login_after, 'last_login_before': args.last_login_before,
+        'created_after': args.created_after, 'created_before': args.created_before
+    }
+    if args.count:
+        _output(args, [{'count': creator.directory_index(args.max_staleness).count(**filters)}])
+    else:
+        _output(args, creator.query_users(max_staleness=args.max_staleness, limit=args.limit,
+                                          **filters))
+    return 0
+
+
+def cmd_stats(args, creator):
+    info = creator.get_domain_info(shards=args.shards)
+    if info is None:
+        return 1
+    _output(args, [info])
+    return 0
+
+
+def _offboard_emails(args, creator, action, suspended=None):
+    """Email'lar: argumentlar va --from-file yoki --query/--inactive-days bo'yicha tanlov"""
+    emails = list(args.emails)
+    if args.from_file:
+        source = sys.stdin if args.from_file == '-' else open(args.from_file, 'r')
+        with source:
+            emails.extend(line.strip() for line in source if line.strip())
+    if not emails:
+        if not args.query and args.inactive_days is None:
+            raise SystemExit(f"{action} uchun email, --query yoki --inactive-days kerak")
+        emails = creator.select_users(query=args.query, inactive_days=args.inactive_days,
+                                      suspended=suspended, shards=args.shards)
+    if emails and not args.yes:
+        raise SystemExit(f"{len(emails)} ta foydalanuvchini {action} uchun --yes kerak")
+    return emails
+
+
+def cmd_suspend(args, creator):
+    emails = _offboard_emails(args, creator, "to'xtatish", suspended=False)
+    results = creator.suspend_users(emails, batch_size=args.batch_size, workers=args.workers)
+    _output(args, _result_rows(results))
+    return 0 if all(result['success'] for result in results) else 1
+
+
+def cmd_delete(args, creator):
+    emails = _offboard_emails(args, creator, "o'chirish")
+    results = creator.delete_users(emails, workers=args.workers, batch_size=args.batch_size,
+                                   suspend_first=args.suspend_first)
+    _output(args, _result_rows(results))
+    return 0 if all(result['success'] for result in results) else 1
+
+
+def cmd_export(args, creator):
+    if args.ledger:
+        # Faqat lokal reestr - API'ga murojaat yo'q
+        _output(args, list(creator.ledger.iter_users()), args.filename)
+        return 0
+
+    if not args.filename or args.filename == '-':
+        raise SystemExit("Directory eksporti uchun fayl nomi kerak")
+    stats = creator.export_directory(args.filename, fields=args.fields, query=args.query,
+                                     file_format=args.file_format, resume=not args.no_resume)
+    _output(args, [stats])
+    return 0
+
+
+def cmd_reconcile(args, creator):
+    if args.from_plan:
+        plan = ReconcilePlan.load(args.from_plan)
+    elif args.source:
+        plan = creator.plan_reconcile(args.source, on_missing=args.on_missing,
+                                      query=args.query, shards=args.shards)
+    else:
+        raise SystemExit("source yoki --from-plan kerak")
+
+    if args.plan:
+        plan.save(args.plan)
+
+    summary = dict(plan.summary(), applied=False)
+    status = 0
+    if args.apply and len(plan):
+        stats = creator.apply_reconcile(plan, batch_size=args.batch_size, workers=args.workers)
+        summary.update(applied=True, created=stats['created'], updated=stats['updated'],
+                       suspended=stats['suspended'], deleted=stats['deleted'],
+                       failed=stats['failed'])
+        status = 1 if stats['failed'] else 0
+    _output(args, [summary])
+    return status
+
+
+def cmd_multi_domain(args, creator):
+    report = multi_domain.run(multi_domain.load_manifest(args.manifest), args.job,
+                              max_workers=args.max_workers,
+                              options={'batch_size': args.batch_size, 'workers': args.workers,
+                                       'output_dir': args.output_dir})
+
+    metrics = report.pop('metrics')
+    if args.report:
+        with open(args.report, 'w') as f:
+            json.dump(dict(report, metrics=metrics.snapshot()), f, indent=2)
+    if args.metrics:
+        with open(args.metrics, 'w') as f:
+            f.write(metrics.to_prometheus())
+
+    rows = [{'domain': domain['domain'], 'success': domain['success'],
+             'result': domain.get('result'), 'error': domain.get('error'),
+             'elapsed': domain['elapsed']} for domain in report['domains']]
+    rows.append({'domain': 'total', 'success': not report['failed'], 'result': report['totals'],
+                 'error': None, 'elapsed': report['elapsed']})
+    _output(args, rows)
+    return 1 if report['failed'] else 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Google Workspace foydalanuvchilarini boshqarish")
+    parser.add_argument('--domain', help="domen (berilmasa config'dagi \"domain\")")
+    parser.add_argument('--config', default='workspace_config.json')
+    parser.add_argument('--format', choices=OUTPUT_FORMATS, default='table',
+                        help="natija formati (standart: table)")
+    parser.add_argument('--output', help="natijani faylga yozish (standart: stdout)")
+    parser.add_argument('--quiet', action='store_true', help="faqat ogohlantirish va xatolarni loglash")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    command = commands.add_parser('create', help="bitta foydalanuvchi yaratish")
+    command.add_argument('first_name')
+    command.add_argument('last_name')
+    command.add_argument('--username')
+    command.add_argument('--password', help="berilmasa xavfsiz parol generatsiya qilinadi")
+    command.set_defaults(func=cmd_create)
+
+    command = commands.add_parser('bulk-import', help="CSV/JSONL fayldan import (checkpoint bilan)")
+    command.add_argument('source')
+    command.add_argument('--checkpoint', help="checkpoint fayli (standart: <source>.checkpoint.jsonl)")
+    command.add_argument('--chunk-size', type=int, default=100)
+    command.add_argument('--batch-size', type=int)
+    command.add_argument('--workers', type=int)
+    command.add_argument('--preflight', action='store_true', help="username to'qnashuvlarini oldindan hal qilish")
+    command.add_argument('--no-retry-failed', action='store_true',
+                         help="avval xato bergan qatorlarni qayta urinmaslik")
+    command.set_defaults(func=cmd_bulk_import)
+
+    command = commands.add_parser('list', help="domen foydalanuvchilari")
+    command.add_argument('--query', help='users().list query, masalan "isSuspended=true"')
+    command.add_argument('--shards', type=int)
+    command.set_defaults(func=cmd_list)
+
+    command = commands.add_parser('query', help="lokal nusxadan indeksli qidiruv (API'siz)")
+    command.add_argument('--org-unit', help="bo'lim, masalan /Sales (ichki bo'limlar bilan)")
+    command.add_argument('--no-children', action='store_true', help="ichki bo'limlarni qo'shmaslik")
+    command.add_argument('--suspended', action='store_const', const=True, default=None)
+    command.add_argument('--active', dest='suspended', action='store_const', const=False)
+    command.add_argument('--prefix', help="email, alias yoki ism so'zining boshi")
+    command.add_argument('--last-login-after', help="YYYY-MM-DD yoki RFC 3339")
+    command.add_argument('--last-login-before')
+    command.add_argument('--created-after')
+    command.add_argument('--created-before')
+    command.add_argument('--limit', type=int)
+    command.add_argument('--count', action='store_true', help="faqat soni")
+    command.add_argument('--max-staleness', type=float,
+                         help="nusxa shu soniyadan eski bo'lsa, avval sinxronlash")
+    command.set_defaults(func=cmd_query)
+
+    command = commands.add_parser('stats', help="domen statistikasi")
+    command.add_argument('--shards', type=int)
+    command.set_defaults(func=cmd_stats)
+
+    for name, func, help_text in (('suspend', cmd_suspend, "foydalanuvchilarni to'xtatish"),
+                                  ('delete', cmd_delete, "foydalanuvchilarni o'chirish")):
+        command = commands.add_parser(name, help=help_text)
+        command.add_argument('emails', nargs='*')
+        command.add_argument('--from-file', help="har qatorda bitta email ('-' - stdin)")
+        command.add_argument('--query', help="email berilmasa: users().list query bo'yicha tanlash")
+        command.add_argument('--inactive-days', type=int,
+                             help="email berilmasa: shuncha kundan beri kirmaganlarni tanlash")
+        command.add_argument('--shards', type=int)
+        command.add_argument('--batch-size', type=int)
+        command.add_argument('--workers', type=int)
+        command.add_argument('--yes', action='store_true', help="amalni tasdiqlash")
+        command.set_defaults(func=func)
+    command.add_argument('--suspend-first', action='store_true',
+                         help="ikki bosqich: avval hammasini to'xtatish, keyin o'chirish")
+
+    command = commands.add_parser('export', help="Directory'ni yoki lokal reestrni eksport qilish")
+    command.add_argument('filename', nargs='?', help=".csv, .jsonl yoki .gz fayl (--ledger'da '-' - stdout)")
+    command.add_argument('--ledger', action='store_true',
+                         help="script yaratgan foydalanuvchilar reestrini eksport qilish (offline)")
+    command.add_argument('--fields', default=EXPORT_FIELDS, help="field mask")
+    command.add_argument('--query')
+    command.add_argument('--file-format', choices=FORMATS, help="kengaytmadan aniqlanmasa")
+    command.add_argument('--no-resume', action='store_true')
+    command.set_defaults(func=cmd_export)
+
+    command = commands.add_parser('reconcile', help="HR ro'yxati bilan reconcile (plan/apply)")
+    command.add_argument('source', nargs='?')
+    command.add_argument('--from-plan')
+    command.add_argument('--plan', help="rejani JSON faylga yozish")
+    command.add_argument('--apply', action='store_true')
+    command.add_argument('--on-missing', choices=ON_MISSING, default='suspend',
+                         help="ro'yxatda yo'q foydalanuvchilar bilan nima qilish")
+    command.add_argument('--query',
+                         help='boshqariladigan foydalanuvchilar filtri, masalan "orgUnitPath=/Staff"')
+    command.add_argument('--shards', type=int)
+    command.add_argument('--batch-size', type=int)
+    command.add_argument('--workers', type=int)
+    command.set_defaults(func=cmd_reconcile)
+
+    # --domain va --config ishlatilmaydi - har bir domen config'i manifest'da
+    command = commands.add_parser('multi-domain', help="manifest'dagi domenlar uchun parallel job")
+    command.add_argument('manifest', help="domenlar manifest'i (JSON)")
+    command.add_argument('job', choices=multi_domain.JOBS)
+    command.add_argument('--max-workers', type=int, help="bir vaqtda ishlaydigan jarayonlar soni")
+    command.add_argument('--batch-size', type=int, help="import uchun batch hajmi")
+    command.add_argument('--workers', type=int, help="import uchun har bir domendagi thread'lar")
+    command.add_argument('--output-dir', help="list natijalarini domenlar bo'yicha yozish papkasi")
+    command.add_argument('--report', help="birlashtirilgan hisobotni JSON faylga yozish")
+    command.add_argument('--metrics', help="birlashtirilgan metrikalarni Prometheus formatida yozish")
+    command.set_defaults(func=cmd_multi_domain, needs_creator=False)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    creator = _creator(args) if getattr(args, 'needs_creator', True) else None
+    try:
+        status = args.func(args, creator)
+    except Exception as e:
+        print(f"❌ {type(e).__name__}: {e}", file=sys.stderr)
+        status = 1
+
+    # Ish yakunidagi metrikalar (config'da "metrics_file" berilsa)
+    if creator and creator.config.get('metrics_file'):
+        creator.metrics.dump_json(creator.config['metrics_file'])
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
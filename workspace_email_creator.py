@@ -6,34 +6,285 @@ Bu kod to'liq qonuniy va Google tomonidan qo'llab-quvvatlanadi
 
 import json
 import logging
-import secrets
+import queue
+import random
+import re
+import socket
 import string
-from datetime import datetime
-from googleapiclient.discovery import build
-from google_auth_oauthlib.flow import InstalledAppFlow
-from google.auth.transport.requests import Request
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from urllib.parse import parse_qs, urlencode, urlsplit
+# Og'ir Google kutubxonalari (discovery, httplib2, OAuth flow) faqat tarmoqqa
+# murojaat kerak bo'lganda import qilinadi - offline buyruqlar tez ishga tushadi
+from googleapiclient.errors import HttpError
 import pickle
 import os
 
+from audit_log import (AUDIT_LOGGER, CompressingRotatingFileHandler, audit_handler,
+                       start_queue_logging)
+from directory_export import EXPORT_FIELDS, DirectoryExport
+from directory_mirror import DirectoryMirror
+from directory_query import DirectoryIndex
+from import_job import ImportJob, default_row_mapper, iter_rows
+from metrics import Metrics
+from password_generator import PasswordGenerator, PasswordPolicy, hash_password
+from rate_limiter import AdaptiveRateLimiter
+from reconcile import apply_plan, build_plan
+from user_ledger import UserLedger
+from user_table import UserTable, format_time, parse_time
+from username_index import UsernameIndex
+
+# Directory API kvotasi uchun boshlang'ich va maksimal so'rov tezligi (QPS)
+DEFAULT_QPS = 10
+DEFAULT_MAX_QPS = 40
+
+# Qayta urinishlar: maksimal soni va exponential backoff chegaralari (soniya)
+MAX_RETRIES = 5
+RETRY_BASE_DELAY = 0.5
+RETRY_MAX_DELAY = 32.0
+
+# Bitta batch so'rovdagi maksimal so'rovlar soni (googleapiclient.http.MAX_BATCH_LIMIT)
+MAX_BATCH_LIMIT = 1000
+
+# HTTP ulanish timeout'i (soniya)
+HTTP_TIMEOUT = 60
+
+# Log fayllarini aylantirish: maksimal hajm (bayt) va saqlanadigan .gz nusxalar soni
+LOG_MAX_BYTES = 10 * 1024 * 1024
+LOG_BACKUP_COUNT = 5
+LOG_FORMAT = '%(asctime)s - %(levelname)s - %(message)s'
+
+RATE_LIMIT_REASONS = {'rateLimitExceeded', 'userRateLimitExceeded', 'quotaExceeded'}
+RETRIABLE_STATUSES = {429, 500, 502, 503, 504}
+
+# Javob kelmay qolgan tarmoq xatolari (so'rov serverda bajarilgan bo'lishi mumkin)
+TRANSIENT_ERRORS = (socket.timeout, TimeoutError, ConnectionError)
+
+# Insert'ga 409 kelganda foydalanuvchi avvalgi urinishda yaratilganini tekshirish uchun maydonlar
+RECOVERY_FIELDS = 'id,name(givenName,familyName),creationTime'
+
+# creationTime'ni birinchi urinish vaqti bilan solishtirishda soatlar farqi uchun zaxira (soniya)
+CLOCK_SKEW_SECONDS = 5
+
+SCOPES = [
+    'https://www.googleapis.com/auth/admin.directory.user',
+    'https://www.googleapis.com/auth/admin.directory.group'
+]
+
+# Jarayon bo'yicha umumiy credentials va service keshi (token fayli bo'yicha)
+_CREDENTIALS_CACHE = {}
+_SERVICE_CACHE = {}
+_AUTH_LOCK = threading.Lock()
+
+# Har bir thread uchun bitta HTTP ulanishlar pool'i (httplib2 thread-safe emas)
+_HTTP_LOCAL = threading.local()
+
+# users().list uchun maksimal sahifa hajmi
+MAX_PAGE_SIZE = 500
+
+# list_users o'qiydigan maydonlar
+USER_SUMMARY_FIELDS = 'primaryEmail,name/fullName,suspended,creationTime,lastLoginTime'
+
+# Lokal nusxa (mirror) uchun saqlanadigan maydonlar
+MIRROR_FIELDS = ('id,etag,primaryEmail,name(givenName,familyName,fullName),suspended,'
+                 'orgUnitPath,creationTime,lastLoginTime,aliases,nonEditableAliases')
+
+# Nusxadagi yuqori darajali kalitlar - yozish so'rovi tanasidan faqat shular nusxaga o'tadi
+# (password, hashFunction va boshqa maxfiy yoki saqlanmaydigan maydonlar tashlanadi)
+MIRROR_KEYS = frozenset(re.sub(r'\([^)]*\)', '', MIRROR_FIELDS).split(','))
+
+# fields berilmagan yozish so'rovlari javobidan kod o'qiydigan maydonlar -
+# to'liq resurs (masalan, update javobidagi butun foydalanuvchi) qaytarilmaydi
+RESPONSE_FIELDS = {
+    'users.insert': 'id',
+    'users.update': 'id',
+    'users.patch': 'id',
+    'users.watch': 'id,resourceId,expiration',
+    'groups.insert': 'id',
+    'members.insert': 'email'
+}
+
+# update_user shu sondan ko'p bo'lmagan maydonni o'zgartirsa, users().patch ishlatiladi
+PATCH_MAX_KEYS = 5
+
+# Offboarding uchun foydalanuvchilarni tanlashda o'qiladigan maydonlar
+OFFBOARD_FIELDS = 'primaryEmail,suspended,creationTime,lastLoginTime'
+
+# groups().list va members().list uchun maksimal sahifa hajmi
+MAX_GROUP_PAGE_SIZE = 200
+
+# Sharded scan uchun email prefikslari va standart shard soni
+EMAIL_SHARD_PREFIXES = string.ascii_lowercase + string.digits
+DEFAULT_SHARDS = 8
+
+
+def _error_reasons(error):
+    """HttpError javobidagi "reason" qiymatlarini olish"""
+    try:
+        data = json.loads(error.content.decode('utf-8'))
+        return {item.get('reason') for item in data['error'].get('errors', [])}
+    except (ValueError, KeyError, TypeError, AttributeError):
+        return set()
+
+
+def _is_rate_limited(error):
+    """Xato Google tomonidan throttling ekanligini aniqlash"""
+    if not isinstance(error, HttpError):
+        return False
+    if error.resp.status == 429:
+        return True
+    return error.resp.status == 403 and bool(_error_reasons(error) & RATE_LIMIT_REASONS)
+
+
+def _is_retriable(error):
+    """Xato vaqtinchalik (qayta urinish mumkin) ekanligini aniqlash"""
+    if isinstance(error, HttpError):
+        return error.resp.status in RETRIABLE_STATUSES or _is_rate_limited(error)
+    return isinstance(error, TRANSIENT_ERRORS)
+
+
+def _may_have_applied(error):
+    """Qayta yuborilgan so'rov serverda baribir bajarilgan bo'lishi mumkinmi
+
+    Javob umuman kelmagan (tarmoq xatosi) yoki 5xx qaytgan urinishlar -
+    Google 500/503 qaytarib ham yozuvni saqlab qolishi mumkin. 429 esa
+    so'rov bajarilmaganini bildiradi.
+    """
+    return not isinstance(error, HttpError) or error.resp.status >= 500
+
+
+def _error_reason(error):
+    """Metrikalar uchun xato sababi: API "reason", HTTP status yoki istisno turi"""
+    if isinstance(error, HttpError):
+        reasons = sorted(reason for reason in _error_reasons(error) if reason)
+        return reasons[0] if reasons else f"http_{error.resp.status}"
+    return type(error).__name__
+
+
+def _method_name(request):
+    """So'rovning API metodi (masalan, "users.insert")"""
+    method_id = getattr(request, 'methodId', None) or 'unknown'
+    return method_id[len('directory.'):] if method_id.startswith('directory.') else method_id
+
+
+def _retry_after(error):
+    """Retry-After sarlavhasini soniyalarga o'tkazish (soniya yoki HTTP sana)"""
+    value = getattr(error, 'resp', None) and error.resp.get('retry-after')
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, (parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds())
+    except (TypeError, ValueError):
+        return None
+
+
+def _wire_counters(http):
+    """(bytes_sent, bytes_received) - metered_http.MeteredHttp hisoblagichlari"""
+    http = getattr(http, 'http', http)  # AuthorizedHttp ichidagi ulanish
+    return getattr(http, 'bytes_sent', 0), getattr(http, 'bytes_received', 0)
+
+
+def _mirrored_fields(fields):
+    """Yozish so'rovi tanasidan nusxada saqlanadigan maydonlar (MIRROR_KEYS)"""
+    return {key: value for key, value in fields.items() if key in MIRROR_KEYS}
+
+
+def _with_retry_stats(result, stats):
+    """Natijaga qayta urinishlar soni va backoff vaqtini qo'shish"""
+    result['retries'] = stats.get('retries', 0)
+    result['backoff_seconds'] = round(stats.get('backoff_seconds', 0.0), 3)
+    return result
+
+
 class WorkspaceEmailCreator:
-    def __init__(self, domain, config_file="workspace_config.json"):
+    def __init__(self, domain, config_file="workspace_config.json", config_overrides=None):
+        """config_overrides - fayldagi config ustiga yoziladigan qiymatlar (faylga saqlanmaydi);
+        ular reestr, log va nusxa ochilishidan oldin qo'llanadi"""
         self.domain = domain
         self.config_file = config_file
-        self.setup_logging()
+        self.metrics = Metrics()
         self.service = None
+        self.credentials = None
+        self._mirror = None
+        self._mirror_version = 0
+        self._index = None
+        self._index_lock = threading.Lock()
+        self._auth_key = None
+        self._resources = (None, {})
+        self._group_cache = None
+        self._member_cache = {}
+        self._group_lock = threading.Lock()
+        self._override_keys = frozenset()
+        self._file_values = {}
         self.load_config()
+        self._apply_overrides(config_overrides or {})
+        self.setup_logging()
+        self.password_generator = PasswordGenerator(PasswordPolicy.from_config(self.config))
+        self.ledger = UserLedger(self.config.get('ledger_file', 'workspace_users.db'))
+        self._migrate_created_users()
+        self.rate_limiter = AdaptiveRateLimiter(
+            qps=self.config.get('rate_limit_qps', DEFAULT_QPS),
+            max_qps=self.config.get('max_qps', DEFAULT_MAX_QPS)
+        )
     
     def setup_logging(self):
-        """Logging sistemasini sozlash"""
-        logging.basicConfig(
-            level=logging.INFO,
-            format='%(asctime)s - %(levelname)s - %(message)s',
-            handlers=[
-                logging.FileHandler('workspace_emails.log'),
-                logging.StreamHandler()
-            ]
-        )
+        """Logging sistemasini sozlash
+        
+        config'da "log_mode": "async" bo'lsa, yozuvlar navbat orqali fon
+        thread'ida yoziladi va log fayli hajm bo'yicha aylantirilib siqiladi -
+        worker'lar fayl va konsolga yozishni kutmaydi.
+        Audit hodisalari (JSON lines) har doim "audit_log_file"ga navbat
+        orqali yoziladi - sinxron rejimda ham so'rov yo'lida fayl yozuvi qo'shilmaydi.
+        """
+        asynchronous = self.config.get('log_mode') == 'async'
+        max_bytes = self.config.get('log_max_bytes', LOG_MAX_BYTES)
+        backup_count = self.config.get('log_backup_count', LOG_BACKUP_COUNT)
+        log_file = self.config.get('log_file', 'workspace_emails.log')
+        
+        root = logging.getLogger()
+        if asynchronous and not root.handlers:
+            handlers = [CompressingRotatingFileHandler(log_file, max_bytes, backup_count),
+                        logging.StreamHandler()]
+            for handler in handlers:
+                handler.setFormatter(logging.Formatter(LOG_FORMAT))
+            root.setLevel(logging.INFO)
+            start_queue_logging(root, handlers)
+        else:
+            logging.basicConfig(
+                level=logging.INFO,
+                format=LOG_FORMAT,
+                handlers=[
+                    logging.FileHandler(log_file),
+                    logging.StreamHandler()
+                ]
+            )
+        
+        audit_logger = logging.getLogger(AUDIT_LOGGER)
+        if not audit_logger.handlers:
+            audit_logger.setLevel(logging.INFO)
+            audit_logger.propagate = False
+            handler = audit_handler(self.config.get('audit_log_file', 'workspace_audit.jsonl'),
+                                    max_bytes, backup_count)
+            start_queue_logging(audit_logger, [handler])
+        
         self.logger = logging.getLogger(__name__)
+        self.audit_logger = audit_logger
+    
+    def _audit(self, operation, email, outcome, started=None, **fields):
+        """Audit hodisasini yozish (JSON lines); parollar hech qachon yozilmaydi"""
+        if not self.audit_logger.isEnabledFor(logging.INFO):
+            return
+        fields.update(operation=operation, domain=self.domain, email=email, outcome=outcome)
+        if started is not None:
+            fields['latency_ms'] = round((time.perf_counter() - started) * 1000, 2)
+        self.audit_logger.info(operation, extra={'audit': fields})
     
     def load_config(self):
         """Konfiguratsiya faylini yuklash"""
@@ -41,9 +292,12 @@ class WorkspaceEmailCreator:
             "domain": self.domain,
             "admin_email": f"admin@{self.domain}",
             "credentials_file": "credentials.json",
+            "token_file": "workspace_token.pickle",
             "organizational_unit": "/",
             "default_password_length": 12,
-            "created_users": []
+            "ledger_file": "workspace_users.db",
+            "mirror_file": "workspace_directory.db",
+            "mirror_max_staleness": 300
         }
         
         try:
@@ -53,20 +307,39 @@ class WorkspaceEmailCreator:
             self.config = default_config
             self.save_config()
     
+    def _apply_overrides(self, overrides):
+        """config_overrides'ni qo'llash; fayldagi asl qiymatlar save_config uchun eslab qolinadi"""
+        self._override_keys = frozenset(overrides)
+        self._file_values = {key: self.config[key] for key in overrides if key in self.config}
+        self.config.update(overrides)
+    
     def save_config(self):
-        """Konfiguratsiyani saqlash"""
-        with open(self.config_file, 'w') as f:
-            json.dump(self.config, f, indent=2)
+        """Konfiguratsiyani saqlash (config_overrides o'rniga fayldagi asl qiymatlar yoziladi)"""
+        config = {key: self._file_values.get(key, value) for key, value in self.config.items()
+                  if key not in self._override_keys or key in self._file_values}
+        with self.metrics.timer('local_io_seconds', operation='save_config'):
+            with open(self.config_file, 'w') as f:
+                json.dump(config, f, indent=2)
     
-    def authenticate(self):
-        """Google Workspace API bilan authentication"""
-        SCOPES = [
-            'https://www.googleapis.com/auth/admin.directory.user',
-            'https://www.googleapis.com/auth/admin.directory.group'
-        ]
+    def _migrate_created_users(self):
+        """Eski config'dagi "created_users" ro'yxatini reestrga ko'chirish"""
+        created_users = self.config.pop('created_users', None)
+        if created_users is None:
+            return
+        
+        self.ledger.add_many(created_users)
+        self.save_config()
+        self.logger.info(f"Migrated {len(created_users)} created users to {self.ledger.path}")
+    
+    def _token_file(self):
+        return self.config.get('token_file', 'workspace_token.pickle')
+    
+    def _load_credentials(self, token_file):
+        """Tokenni fayldan yuklash, kerak bo'lsa yangilash yoki OAuth flow'ni ishga tushirish"""
+        from google.auth.transport.requests import Request
+        from google_auth_oauthlib.flow import InstalledAppFlow
         
         creds = None
-        token_file = 'workspace_token.pickle'
         
         # Mavjud tokenni yuklash
         if os.path.exists(token_file):
@@ -86,26 +359,309 @@ class WorkspaceEmailCreator:
             with open(token_file, 'wb') as token:
                 pickle.dump(creds, token)
         
-        self.service = build('admin', 'directory_v1', credentials=creds)
+        return creds
+    
+    def authenticate(self):
+        """Google Workspace API bilan authentication
+        
+        Credentials va Directory service jarayon bo'yicha keshlanadi: bir xil
+        token fayli bilan ishlaydigan keyingi creator'lar discovery hujjatini
+        qayta o'qimaydi va token faylini qayta yuklamaydi.
+        """
+        api_endpoint = self.config.get('api_endpoint')
+        if api_endpoint:
+            self._authenticate_endpoint(api_endpoint)
+            return
+        
+        token_file = self._token_file()
+        key = (os.path.abspath(token_file), os.path.abspath(self.config['credentials_file']))
+        
+        with _AUTH_LOCK:
+            creds = _CREDENTIALS_CACHE.get(key)
+            if creds is None:
+                creds = self._load_credentials(token_file)
+                _CREDENTIALS_CACHE[key] = creds
+            
+            service = _SERVICE_CACHE.get(key)
+            if service is None:
+                from googleapiclient.discovery import build
+                
+                # Kutubxonadagi statik discovery hujjati - tarmoqqa murojaat yo'q
+                service = build('admin', 'directory_v1', credentials=creds,
+                                static_discovery=True, cache_discovery=False)
+                _SERVICE_CACHE[key] = service
+        
+        self._auth_key = key
+        self.credentials = creds
+        self.service = service
         self.logger.info("Successfully authenticated with Google Workspace API")
     
-    def generate_secure_password(self, length=12):
-        """Xavfsiz parol yaratish"""
-        alphabet = string.ascii_letters + string.digits + "!@#$%^&*"
-        return ''.join(secrets.choice(alphabet) for _ in range(length))
+    def _authenticate_endpoint(self, api_endpoint):
+        """config'dagi "api_endpoint"ga (masalan, fake_directory server) ulanish
+        
+        Bunday endpoint'lar uchun OAuth ishlatilmaydi.
+        """
+        key = ('endpoint', api_endpoint)
+        with _AUTH_LOCK:
+            service = _SERVICE_CACHE.get(key)
+            if service is None:
+                import httplib2
+                from googleapiclient.discovery import build
+                
+                service = build('admin', 'directory_v1', http=httplib2.Http(),
+                                static_discovery=True, cache_discovery=False,
+                                client_options={'api_endpoint': api_endpoint})
+                _SERVICE_CACHE[key] = service
+        
+        self._auth_key = key
+        self.credentials = None
+        self.service = service
+        self.logger.info(f"Using Directory API endpoint {api_endpoint}")
     
-    def create_user(self, first_name, last_name, username=None, custom_password=None):
-        """Yangi foydalanuvchi yaratish"""
-        if not self.service:
-            self.authenticate()
+    def _refresh_credentials(self):
+        """Muddati o'tgan tokenni thread-safe tarzda yangilash
+        
+        Bir nechta thread bir vaqtda kelsa, token faqat bir marta yangilanadi.
+        """
+        from google.auth.transport.requests import Request
+        
+        with _AUTH_LOCK:
+            if self.credentials.valid:
+                return
+            with self.metrics.timer('token_refresh_seconds'):
+                self.credentials.refresh(Request())
+            with self.metrics.timer('local_io_seconds', operation='save_token'):
+                with open(self._token_file(), 'wb') as token:
+                    pickle.dump(self.credentials, token)
+        self.logger.info("Access token refreshed")
+    
+    def _thread_http(self):
+        """Joriy thread uchun umumiy HTTP ulanish (bir xil credentials'li creator'lar bo'lishadi)"""
+        pool = getattr(_HTTP_LOCAL, 'pool', None)
+        if pool is None:
+            pool = _HTTP_LOCAL.pool = {}
+        
+        http = pool.get(self._auth_key)
+        if http is None:
+            from google_auth_httplib2 import AuthorizedHttp
+            from metered_http import MeteredHttp
+            
+            http = MeteredHttp(timeout=self.config.get('http_timeout', HTTP_TIMEOUT))
+            if self.credentials is not None:
+                http = AuthorizedHttp(self.credentials, http=http)
+            pool[self._auth_key] = http
+        return http
+    
+    def _http(self):
+        """So'rovlar uchun HTTP ulanish; kerak bo'lsa token oldindan yangilanadi"""
+        if self._auth_key is None:
+            return None
+        if self.credentials is not None and not self.credentials.valid:
+            self._refresh_credentials()
+        return self._thread_http()
+    
+    def _resource(self, name):
+        """Directory resursi (users, groups, members)
+        
+        service.users() kabi chaqiruvlar har safar discovery hujjatidan barcha
+        metodlarni qayta quradi, shuning uchun resurslar service bo'yicha keshlanadi.
+        """
+        service, resources = self._resources
+        if service is not self.service:
+            resources = {}
+            self._resources = (self.service, resources)
+        resource = resources.get(name)
+        if resource is None:
+            resource = resources[name] = getattr(self.service, name)()
+        return resource
+    
+    def _users(self):
+        """Directory users() resursi"""
+        return self._resource('users')
+    
+    def _new_batch(self, callback):
+        """Batch so'rov yaratish (api_endpoint sozlangan bo'lsa, o'sha manzilga)"""
+        api_endpoint = self.config.get('api_endpoint')
+        if api_endpoint:
+            from googleapiclient.http import BatchHttpRequest
+            return BatchHttpRequest(callback=callback, batch_uri=api_endpoint.rstrip('/') + '/batch')
+        return self.service.new_batch_http_request(callback=callback)
+    
+    def _retry_delay(self, attempt, retry_after=None):
+        """Keyingi urinishgacha kutish: capped exponential backoff + full jitter"""
+        base = self.config.get('retry_base_delay', RETRY_BASE_DELAY)
+        cap = self.config.get('retry_max_delay', RETRY_MAX_DELAY)
+        delay = random.uniform(0, min(cap, base * 2 ** attempt))
+        if retry_after:
+            delay = max(delay, retry_after)
+        return delay
+    
+    def _acquire(self, tokens=1):
+        """Rate limiter'dan token olish va kutilgan vaqtni metrikaga yozish"""
+        waited = self.rate_limiter.acquire(tokens)
+        if waited:
+            self.metrics.observe('rate_limit_wait_seconds', waited)
+    
+    def _record_call(self, method, started, error=None):
+        """Bitta API chaqiruvi: latency histogrammasi va natija counter'lari"""
+        self.metrics.observe('api_call_seconds', time.perf_counter() - started, method=method)
+        self._record_outcome(method, error)
+    
+    def _record_outcome(self, method, error=None):
+        self.metrics.inc('api_calls_total', method=method,
+                         outcome='success' if error is None else 'error')
+        if error is not None:
+            self.metrics.inc('api_errors_total', method=method, reason=_error_reason(error))
+    
+    def _record_retry(self, method, error, delay, count=1):
+        self.metrics.inc('api_retries_total', count, method=method, reason=_error_reason(error))
+        self.metrics.inc('backoff_seconds_total', delay * count, method=method)
+    
+    def _profile(self, operation):
+        """Bulk job'ni config'dagi "profile_sample_rate" ehtimollik bilan cProfile ostida bajarish"""
+        return self.metrics.profile(
+            operation,
+            self.config.get('profile_sample_rate', 0),
+            directory=self.config.get('profile_dir', 'profiles')
+        )
+    
+    def _shape(self, request):
+        """So'rovni yuborishdan oldin moslash (har bir so'rovga bir marta)
+        
+        - fields berilmagan bo'lsa, RESPONSE_FIELDS'dagi minimal field mask qo'shiladi
+        - javobni JSON'dan o'qish vaqti va ochilgan hajmi metrikaga yoziladi
+        """
+        if getattr(request, '_shaped', False):
+            return request
+        request._shaped = True
+        method = _method_name(request)
+        
+        fields = RESPONSE_FIELDS.get(method)
+        if fields and 'fields' not in parse_qs(urlsplit(request.uri).query):
+            separator = '&' if '?' in request.uri else '?'
+            request.uri += separator + urlencode({'fields': fields})
+        
+        postproc = request.postproc
+        
+        def parse(resp, content):
+            started = time.perf_counter()
+            try:
+                return postproc(resp, content)
+            finally:
+                self.metrics.observe('response_parse_seconds', time.perf_counter() - started,
+                                     method=method)
+                self.metrics.inc('api_response_bytes_total', len(content or b''), method=method)
         
+        request.postproc = parse
+        return request
+    
+    def _record_wire(self, method, http, before):
+        """Chaqiruv davomida tarmoqdan o'tgan (siqilgan) baytlar"""
+        sent, received = _wire_counters(http)
+        self.metrics.inc('api_wire_bytes_total', sent - before[0], method=method, direction='sent')
+        self.metrics.inc('api_wire_bytes_total', received - before[1], method=method,
+                         direction='received')
+    
+    def _execute(self, request, stats=None):
+        """Directory API so'rovini bajarish: rate limiter, qayta urinishlar va backoff
+        
+        429, rateLimitExceeded, 5xx va tarmoq timeout'lari max_retries
+        martagacha qayta yuboriladi (Retry-After hisobga olinadi).
+        stats lug'ati berilsa, unga "retries" va "backoff_seconds", shuningdek
+        "first_attempt" (epoch) va natijasi noma'lum qolgan (javobsiz yoki 5xx)
+        urinishlar soni "unanswered" yoziladi.
+        """
+        if stats is None:
+            stats = {}
+        stats.setdefault('retries', 0)
+        stats.setdefault('backoff_seconds', 0.0)
+        stats.setdefault('first_attempt', time.time())
+        max_retries = self.config.get('max_retries', MAX_RETRIES)
+        method = _method_name(request)
+        self._shape(request)
+        
+        attempt = 0
+        with self.metrics.in_flight('api_in_flight', method=method):
+            while True:
+                self._acquire()
+                http = self._http()
+                wire = _wire_counters(http)
+                started = time.perf_counter()
+                try:
+                    response = request.execute(http=http)
+                except Exception as e:
+                    self._record_call(method, started, e)
+                    self._record_wire(method, http, wire)
+                    if not _is_retriable(e) or attempt >= max_retries:
+                        raise
+                    if _may_have_applied(e):
+                        # So'rov serverda bajarilgan bo'lishi mumkin
+                        stats['unanswered'] = stats.get('unanswered', 0) + 1
+                    
+                    retry_after = _retry_after(e)
+                    if _is_rate_limited(e):
+                        self.rate_limiter.on_throttle(retry_after)
+                    
+                    delay = self._retry_delay(attempt, retry_after)
+                    attempt += 1
+                    stats['retries'] += 1
+                    stats['backoff_seconds'] += delay
+                    self._record_retry(method, e, delay)
+                    self.logger.warning(
+                        f"Retrying after error ({attempt}/{max_retries}, {delay:.2f}s): {str(e)}")
+                    time.sleep(delay)
+                    continue
+                
+                self._record_call(method, started)
+                self._record_wire(method, http, wire)
+                self.rate_limiter.on_success()
+                return response
+    
+    def generate_secure_password(self, length=None):
+        """Xavfsiz parol yaratish (config'dagi parol siyosati bo'yicha)"""
+        return self.password_generator.generate(1, length)[0]
+    
+    def generate_passwords(self, count, length=None):
+        """count ta parolni bitta chaqiruvda yaratish (ommaviy job'lar uchun)"""
+        return self.password_generator.generate(count, length)
+    
+    def _with_passwords(self, users_data):
+        """Paroli berilmagan foydalanuvchilarga oldindan, bitta chaqiruvda parol biriktirish"""
+        missing = sum(1 for user_data in users_data if not user_data.get('password'))
+        if not missing:
+            return users_data
+        passwords = iter(self.generate_passwords(missing))
+        return [user_data if user_data.get('password') else dict(user_data, password=next(passwords))
+                for user_data in users_data]
+    
+    def user_email(self, first_name, last_name, username=None):
+        """Foydalanuvchi uchun email manzilini aniqlash"""
         # Username yaratish
         if not username:
             username = f"{first_name.lower()}.{last_name.lower()}"
         
-        email = f"{username}@{self.domain}"
+        return f"{username}@{self.domain}"
+    
+    def _prepare_user(self, first_name, last_name, username=None, custom_password=None,
+                      org_unit=None, suspended=None):
+        """Foydalanuvchi uchun email, parol va so'rov tanasini tayyorlash
+        
+        org_unit berilmasa, config'dagi "organizational_unit" ishlatiladi;
+        suspended=True bo'lsa, foydalanuvchi to'xtatilgan holda yaratiladi.
+        Berilgan parol Google talabiga (8-100 belgi) - config'da
+        "enforce_password_policy": true bo'lsa, butun siyosatga - mos kelmasa,
+        API so'rovisiz ValueError ko'tariladi.
+        config'da "password_hash_function" (SHA-1, MD5 yoki crypt) bo'lsa,
+        API'ga ochiq parol o'rniga uning hash'i yuboriladi.
+        """
+        email = self.user_email(first_name, last_name, username)
         
         # Parol yaratish
+        if custom_password:
+            problems = self.password_generator.policy.violations(
+                custom_password, classes=self.config.get('enforce_password_policy', False))
+            if problems:
+                raise ValueError(f"Password for {email} does not meet policy: {', '.join(problems)}")
         password = custom_password or self.generate_secure_password()
         
         user_body = {
@@ -115,138 +671,1198 @@ class WorkspaceEmailCreator:
             },
             'primaryEmail': email,
             'password': password,
-            'orgUnitPath': self.config['organizational_unit'],
-            'suspended': False,
+            'orgUnitPath': org_unit or self.config['organizational_unit'],
+            'suspended': bool(suspended),
             'changePasswordAtNextLogin': True  # Birinchi kirishda parol o'zgartirishni majburlash
         }
         
+        hash_function = self.config.get('password_hash_function')
+        if hash_function:
+            user_body['password'] = hash_password(password, hash_function)
+            user_body['hashFunction'] = hash_function
+        
+        return email, password, user_body
+    
+    def _record_created_user(self, email, password, first_name, last_name, user_id,
+                             pending=None):
+        """Yaratilgan foydalanuvchini saqlash va natija qaytarish
+        
+        pending ro'yxati berilsa, yozuv reestrga darhol emas, keyinroq
+        bitta tranzaksiyada yozish uchun shu ro'yxatga qo'shiladi.
+        """
+        # Muvaffaqiyatli yaratilgan ma'lumotlarni saqlash
+        # (hash yuborilganda ochiq parol reestrda saqlanmaydi - u faqat natijada qaytadi)
+        user_info = {
+            'email': email,
+            'password': None if self.config.get('password_hash_function') else password,
+            'first_name': first_name,
+            'last_name': last_name,
+            'created_at': datetime.now().isoformat(),
+            'user_id': user_id
+        }
+        
+        if pending is None:
+            with self.metrics.timer('local_io_seconds', operation='ledger_add'):
+                self.ledger.add(user_info)
+        else:
+            pending.append(user_info)
+        
+        # Xavfsizlik uchun parolni logga yozmaslik
+        self.logger.info(f"Successfully created user: {email}")
+        
+        return {
+            'success': True,
+            'email': email,
+            'password': password,
+            'user_id': user_id,
+            'message': f"User {email} created successfully"
+        }
+    
+    def _create_user_failed(self, email, error):
+        """Yaratishdagi xato uchun natija qaytarish"""
+        error_msg = f"Error creating user {email}: {str(error)}"
+        self.logger.error(error_msg)
+        return {
+            'success': False,
+            'email': email,
+            'error': error_msg
+        }
+    
+    def create_user(self, first_name, last_name, username=None, custom_password=None,
+                    org_unit=None, suspended=None):
+        """Yangi foydalanuvchi yaratish (org_unit va suspended - _prepare_user'ga qarang)"""
+        if not self.service:
+            self.authenticate()
+        
+        started = time.perf_counter()
+        email = self.user_email(first_name, last_name, username)
+        
+        stats = {}
         try:
+            email, password, user_body = self._prepare_user(
+                first_name, last_name, username, custom_password, org_unit, suspended)
+            
             # Foydalanuvchini yaratish
-            user = self.service.users().insert(body=user_body).execute()
-            
-            # Muvaffaqiyatli yaratilgan ma'lumotlarni saqlash
-            user_info = {
-                'email': email,
-                'password': password,
-                'first_name': first_name,
-                'last_name': last_name,
-                'created_at': datetime.now().isoformat(),
-                'user_id': user['id']
-            }
+            try:
+                user = self._execute(self._users().insert(body=user_body), stats)
+            except HttpError as e:
+                user_id = None
+                if e.resp.status == 409 and stats.get('unanswered'):
+                    user_id = self._recover_conflict(email, first_name, last_name, stats)
+                if user_id is None:
+                    raise
+                user = {'id': user_id}
             
-            self.config['created_users'].append(user_info)
-            self.save_config()
+            result = self._record_created_user(
+                email, password, first_name, last_name, user['id'])
+            self._mirror_write_through('upsert_many', [self._mirror_record(user['id'], user_body)])
             
-            # Xavfsizlik uchun parolni logga yozmaslik
-            self.logger.info(f"Successfully created user: {email}")
+        except Exception as e:
+            result = self._create_user_failed(email, e)
+        
+        self._audit_result('create_user', email, result, started, stats)
+        return _with_retry_stats(result, stats)
+    
+    def _audit_result(self, operation, email, result, started, stats, **fields):
+        """Natija lug'atidan audit hodisasi"""
+        self._audit(operation, email, 'success' if result['success'] else 'failure', started,
+                    user_id=result.get('user_id'), retries=stats.get('retries'),
+                    error=result.get('error'), **fields)
+    
+    def _recover_conflict(self, email, first_name, last_name, stats):
+        """Qayta yuborilgan insert'ga 409 kelsa: foydalanuvchi avvalgi (javobi
+        yo'qolgan) urinishda yaratilganmi tekshirish
+        
+        Faqat natijasi noma'lum urinish (javobsiz yoki 5xx) bo'lganda
+        chaqiriladi - 429 javobi hech narsa yaratmagan. Foydalanuvchi id'si qaytariladi, agar ism va
+        familiya mos kelsa va u birinchi urinishdan keyin yaratilgan bo'lsa;
+        aks holda None - 409 haqiqiy to'qnashuv sifatida qaytadi.
+        """
+        try:
+            user = self._execute(self._users().get(userKey=email, fields=RECOVERY_FIELDS))
+        except HttpError:
+            return None
+        return self._created_by_attempt(email, user, first_name, last_name, stats)
+    
+    def _created_by_attempt(self, email, user, first_name, last_name, stats):
+        """users.get natijasi shu insert urinishlari yaratgan foydalanuvchimi (id yoki None)"""
+        name = user.get('name', {})
+        if name.get('givenName') != first_name or name.get('familyName') != last_name:
+            return None
+        if parse_time(user.get('creationTime')) < (
+                stats['first_attempt'] - CLOCK_SKEW_SECONDS) * 1000:
+            return None
+        self.logger.info(f"Insert for {email} already applied by an earlier attempt")
+        return user['id']
+    
+    def _lookup_user(self, email, fields=RECOVERY_FIELDS):
+        """Foydalanuvchi mavjud bo'lsa uning ma'lumotlarini, aks holda None qaytarish"""
+        if not self.service:
+            self.authenticate()
+        
+        try:
+            return self._execute(self._users().get(userKey=email, fields=fields))
+        except HttpError as e:
+            if e.resp.status == 404:
+                return None
+            raise
+    
+    def _execute_batch(self, requests, batch_size=None, retry_stats=None):
+        """So'rovlarni Google API batch'lari orqali bajarish
+        
+        Har bir batch bajarilgandan keyin uning natijalari
+        (index, response, exception) ro'yxati sifatida qaytariladi.
+        Vaqtinchalik xato bilan qaytgan so'rovlar backoff bilan keyingi
+        batch'da qayta yuboriladi; retry_stats lug'ati berilsa, unga har bir
+        qayta yuborilgan index uchun "retries", "backoff_seconds",
+        "first_attempt" va "unanswered" (_execute'dagi kabi) yoziladi.
+        """
+        batch_size = max(1, min(batch_size or MAX_BATCH_LIMIT, MAX_BATCH_LIMIT))
+        max_retries = self.config.get('max_retries', MAX_RETRIES)
+        
+        for start in range(0, len(requests), batch_size):
+            outcomes = {}
+            pending = list(range(start, min(start + batch_size, len(requests))))
+            attempt = 0
+            first_attempt = time.time()
             
-            return {
-                'success': True,
-                'email': email,
-                'password': password,
-                'user_id': user['id'],
-                'message': f"User {email} created successfully"
-            }
+            while pending:
+                def callback(request_id, response, exception):
+                    outcomes[int(request_id)] = (response, exception)
+                
+                batch = self._new_batch(callback)
+                for index in pending:
+                    batch.add(self._shape(requests[index]), request_id=str(index))
+                
+                self._acquire(len(pending))
+                http = self._http()
+                wire = _wire_counters(http)
+                started = time.perf_counter()
+                try:
+                    with self.metrics.in_flight('api_in_flight', method='batch'):
+                        batch.execute(http=http)
+                except Exception as e:
+                    # Butun batch muvaffaqiyatsiz bo'lsa, javobsiz qolganlarni xato deb belgilash
+                    self.logger.error(f"Batch request failed: {str(e)}")
+                    for index in pending:
+                        if index not in outcomes or outcomes[index][1] is not None:
+                            outcomes[index] = (None, e)
+                self.metrics.observe('api_call_seconds', time.perf_counter() - started, method='batch')
+                self._record_wire('batch', http, wire)
+                self.metrics.inc('batched_requests_total', len(pending))
+                for index in pending:
+                    self._record_outcome(_method_name(requests[index]), outcomes[index][1])
+                
+                errors = [outcomes[index][1] for index in pending
+                          if outcomes[index][1] is not None and _is_retriable(outcomes[index][1])]
+                if not errors:
+                    self.rate_limiter.on_success()
+                    break
+                if attempt >= max_retries:
+                    break
+                
+                retry_after = max((_retry_after(error) or 0.0) for error in errors) or None
+                if any(_is_rate_limited(error) for error in errors):
+                    self.rate_limiter.on_throttle(retry_after)
+                
+                delay = self._retry_delay(attempt, retry_after)
+                attempt += 1
+                pending = [index for index in pending
+                           if outcomes[index][1] is not None and _is_retriable(outcomes[index][1])]
+                for index in pending:
+                    self._record_retry(_method_name(requests[index]), outcomes[index][1], delay)
+                if retry_stats is not None:
+                    for index in pending:
+                        stats = retry_stats.setdefault(index, {
+                            'retries': 0, 'backoff_seconds': 0.0, 'first_attempt': first_attempt})
+                        stats['retries'] += 1
+                        stats['backoff_seconds'] += delay
+                        if _may_have_applied(outcomes[index][1]):
+                            stats['unanswered'] = stats.get('unanswered', 0) + 1
+                
+                self.logger.warning(
+                    f"Retrying {len(pending)} batched requests "
+                    f"({attempt}/{max_retries}, {delay:.2f}s)")
+                time.sleep(delay)
             
-        except Exception as e:
-            error_msg = f"Error creating user {email}: {str(e)}"
-            self.logger.error(error_msg)
-            return {
-                'success': False,
-                'email': email,
-                'error': error_msg
-            }
+            yield [(index,) + outcomes[index] for index in sorted(outcomes)]
     
-    def create_multiple_users(self, users_data):
-        """Ko'p foydalanuvchilarni yaratish"""
-        results = []
+    def _create_users_batched(self, users_data, batch_size):
+        """Foydalanuvchilarni batch so'rovlar orqali yaratish"""
+        if not self.service:
+            self.authenticate()
         
-        for user_data in users_data:
-            result = self.create_user(
-                first_name=user_data['first_name'],
-                last_name=user_data['last_name'],
-                username=user_data.get('username'),
-                custom_password=user_data.get('password')
-            )
-            results.append(result)
+        results = [None] * len(users_data)
+        prepared = []
+        requests = []
+        for position, user_data in enumerate(users_data):
+            try:
+                email, password, user_body = self._prepare_user(
+                    first_name=user_data['first_name'],
+                    last_name=user_data['last_name'],
+                    username=user_data.get('username'),
+                    custom_password=user_data.get('password'),
+                    org_unit=user_data.get('org_unit'),
+                    suspended=user_data.get('suspended')
+                )
+            except ValueError as e:
+                # Siyosatga mos kelmagan parol - so'rov yuborilmaydi
+                email = self.user_email(user_data['first_name'], user_data['last_name'],
+                                        user_data.get('username'))
+                result = self._create_user_failed(email, e)
+                self._audit_result('create_user', email, result, None, {}, batched=True)
+                results[position] = _with_retry_stats(result, {})
+                continue
+            prepared.append((position, user_data, email, password, user_body))
+            requests.append(self._users().insert(body=user_body))
+        
+        retry_stats = {}
+        started = time.perf_counter()
+        for outcomes in self._execute_batch(requests, batch_size, retry_stats):
+            pending = []
+            records = []
+            for index, user, error in outcomes:
+                position, user_data, email, password, user_body = prepared[index]
+                stats = retry_stats.get(index, {})
+                
+                if (isinstance(error, HttpError) and error.resp.status == 409
+                        and stats.get('unanswered')):
+                    user_id = self._recover_conflict(
+                        email, user_data['first_name'], user_data['last_name'], stats)
+                    if user_id is not None:
+                        user, error = {'id': user_id}, None
+                
+                if error is not None:
+                    result = self._create_user_failed(email, error)
+                else:
+                    result = self._record_created_user(
+                        email, password, user_data['first_name'],
+                        user_data['last_name'], user['id'], pending=pending)
+                    records.append(self._mirror_record(user['id'], user_body))
+                self._audit_result('create_user', email, result, started, stats, batched=True)
+                results[position] = _with_retry_stats(result, stats)
             
-            # API rate limiting uchun kutish
-            import time
-            time.sleep(1)
+            # Har bir batch natijalari reestrga bitta tranzaksiyada yoziladi
+            with self.metrics.timer('local_io_seconds', operation='ledger_add_many'):
+                self.ledger.add_many(pending)
+            self._mirror_write_through('upsert_many', records)
+            started = time.perf_counter()
         
         return results
     
-    def list_users(self):
-        """Barcha foydalanuvchilarni ko'rsatish"""
+    def build_username_index(self, max_staleness=None):
+        """Domendagi band email manzillari (primary va alias) indeksini yaratish
+        
+        Lokal nusxa ishlatilsa (config'dagi "mirror_max_staleness"), u avval
+        sinxronlanadi - eskirgan nusxa band manzilni bo'sh deb ko'rsatib, 409
+        bilan tugaydigan so'rovga olib keladi. Sinxronlash faqat o'zgargan
+        foydalanuvchilarni oladi; max_staleness berilsa, shundan yangi nusxa
+        qayta sinxronlanmaydi. Nusxa ishlatilmasa - bitta field-masked skan.
+        """
+        if max_staleness is None and self.config.get('mirror_max_staleness') is not None:
+            max_staleness = 0
+        
+        if max_staleness is not None:
+            users = self._fresh_mirror(max_staleness).iter_users()
+        else:
+            users = self._scan_users(fields='primaryEmail,aliases,nonEditableAliases')
+        
+        def addresses():
+            for user in users:
+                yield user['primaryEmail']
+                yield from user.get('aliases', [])
+                yield from user.get('nonEditableAliases', [])
+        
+        index = UsernameIndex(addresses())
+        self.logger.info(f"Username index built with {len(index)} addresses")
+        return index
+    
+    def resolve_usernames(self, users_data, index=None):
+        """Username to'qnashuvlarini API'ga so'rov yubormasdan lokal hal qilish
+        
+        Band manzillarga 2, 3, ... qo'shimchasi qo'shiladi (ali.karimov2).
+        O'zgargan foydalanuvchilar uchun yangi "username" bilan nusxa qaytariladi.
+        """
+        if index is None:
+            index = self.build_username_index()
+        
+        resolved = []
+        for user_data in users_data:
+            email = self.user_email(
+                user_data['first_name'], user_data['last_name'], user_data.get('username'))
+            available = index.resolve(email)
+            if available != email:
+                self.logger.info(f"Username collision resolved: {email} -> {available}")
+                user_data = dict(user_data, username=available.split('@')[0])
+            resolved.append(user_data)
+        return resolved
+    
+    def import_users(self, source, **options):
+        """CSV/JSONL fayldan foydalanuvchilarni import qilish (checkpoint bilan)
+        
+        Parametrlar uchun import_job.ImportJob'ga qarang.
+        """
+        with self._profile('import_users'):
+            return ImportJob(self, source, **options).run()
+    
+    def plan_reconcile(self, source, **options):
+        """Desired-state fayl (HR ro'yxati) bo'yicha o'zgarishlar rejasi
+        
+        Parametrlar uchun reconcile.build_plan'ga qarang.
+        """
+        return build_plan(self, source, **options)
+    
+    def apply_reconcile(self, plan, batch_size=None, workers=None):
+        """plan_reconcile rejasini bajarish (faqat kerakli yozish so'rovlari)"""
+        with self._profile('apply_reconcile'):
+            return apply_plan(self, plan, batch_size=batch_size, workers=workers)
+    
+    def _run_concurrent(self, func, items, workers):
+        """Funksiyani thread pool'da bajarish (natijalar kirish tartibida)
+        
+        So'rov tezligi umumiy rate limiter orqali cheklanadi.
+        """
+        items = list(items)
+        if not items:
+            return []
+        
         if not self.service:
             self.authenticate()
         
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(func, items))
+    
+    def create_multiple_users(self, users_data, batch_size=None, workers=None, preflight=None):
+        """Ko'p foydalanuvchilarni yaratish
+        
+        batch_size berilsa (yoki config'da "batch_size" bo'lsa), so'rovlar
+        Google API batch'lari orqali yuboriladi (bitta batch'da ko'pi bilan 1000 ta).
+        workers berilsa (yoki config'da "workers" bo'lsa), foydalanuvchilar
+        thread pool'da parallel yaratiladi.
+        preflight (yoki config'dagi "preflight_usernames") yoqilgan bo'lsa,
+        username to'qnashuvlari yuborishdan oldin lokal hal qilinadi.
+        Har bir lug'atda ixtiyoriy "org_unit" va "suspended" bo'lishi mumkin -
+        ular insert so'rovining o'zida yuboriladi.
+        """
+        with self._profile('create_multiple_users'):
+            if preflight is None:
+                preflight = self.config.get('preflight_usernames', False)
+            if preflight:
+                users_data = self.resolve_usernames(users_data)
+            # Barcha parollar bitta tasodifiy buferdan
+            users_data = self._with_passwords(list(users_data))
+            
+            batch_size = batch_size or self.config.get('batch_size')
+            if batch_size:
+                return self._create_users_batched(users_data, batch_size)
+            
+            def create(user_data):
+                return self.create_user(
+                    first_name=user_data['first_name'],
+                    last_name=user_data['last_name'],
+                    username=user_data.get('username'),
+                    custom_password=user_data.get('password'),
+                    org_unit=user_data.get('org_unit'),
+                    suspended=user_data.get('suspended')
+                )
+            
+            # So'rov tezligi rate limiter orqali boshqariladi
+            workers = workers or self.config.get('workers')
+            if workers:
+                return self._run_concurrent(create, users_data, workers)
+            
+            return [create(user_data) for user_data in users_data]
+    
+    def iter_users(self, fields=USER_SUMMARY_FIELDS, query=None, max_results=MAX_PAGE_SIZE):
+        """Domen foydalanuvchilarini sahifama-sahifa qaytarish (generator)
+        
+        Barcha sahifalar nextPageToken orqali o'qiladi, javobda faqat
+        fields'dagi maydonlar so'raladi. Xatolar chaqiruvchiga uzatiladi.
+        """
+        for users, _ in self.iter_user_pages(fields=fields, query=query, max_results=max_results):
+            yield from users
+    
+    def iter_user_pages(self, fields=USER_SUMMARY_FIELDS, query=None, max_results=MAX_PAGE_SIZE,
+                        page_token=None):
+        """users().list sahifalari: (foydalanuvchilar, keyingi sahifa tokeni) juftliklari
+        
+        page_token berilsa, o'qish shu sahifadan davom ettiriladi.
+        Oxirgi sahifa uchun token None bo'ladi.
+        """
+        if not self.service:
+            self.authenticate()
+        
+        while True:
+            request = self._users().list(
+                domain=self.domain,
+                query=query,
+                maxResults=max_results,
+                pageToken=page_token,
+                fields=f"nextPageToken,users({fields})"
+            )
+            response = self._execute(request)
+            
+            page_token = response.get('nextPageToken')
+            yield response.get('users', []), page_token
+            
+            if not page_token:
+                break
+    
+    def iter_users_sharded(self, fields=USER_SUMMARY_FIELDS, shards=DEFAULT_SHARDS, query=None):
+        """Domenni bir nechta parallel kursor bilan skanerlash (generator)
+        
+        Email'lar bosh harfi bo'yicha (email:a*, email:b*, ...) server
+        tomonida bo'linadi, har bir shard alohida thread'da o'qiladi va
+        natijalar primaryEmail bo'yicha takrorlanmasdan bitta oqimga
+        birlashtiriladi. Prefikslar harf yoki raqam bilan boshlanadigan
+        username'larni qamrab oladi.
+        """
+        if not self.service:
+            self.authenticate()
+        
+        if 'primaryEmail' not in fields.split(','):
+            fields = f"{fields},primaryEmail"
+        
+        shards = max(1, min(shards, len(EMAIL_SHARD_PREFIXES)))
+        groups = [EMAIL_SHARD_PREFIXES[i::shards] for i in range(shards)]
+        
+        results = queue.Queue(maxsize=MAX_PAGE_SIZE * shards)
+        stop = threading.Event()
+        done = object()
+        
+        def put(item):
+            # Iste'molchi to'xtasa, navbat to'lib qolgan thread'lar ham chiqadi
+            while not stop.is_set():
+                try:
+                    results.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+        
+        def scan(prefixes):
+            try:
+                for prefix in prefixes:
+                    shard_query = f"email:{prefix}*" + (f" {query}" if query else "")
+                    for user in self.iter_users(fields=fields, query=shard_query):
+                        if not put(user):
+                            return
+            except Exception as e:
+                put(e)
+            finally:
+                put(done)
+        
+        threads = [threading.Thread(target=scan, args=(group,), daemon=True) for group in groups]
+        for thread in threads:
+            thread.start()
+        
+        seen = set()
+        remaining = len(threads)
         try:
-            request = self.service.users().list(domain=self.domain)
-            response = request.execute()
+            while remaining:
+                item = results.get()
+                if item is done:
+                    remaining -= 1
+                    continue
+                if isinstance(item, Exception):
+                    raise item
+                
+                email = item['primaryEmail'].lower()
+                if email in seen:
+                    continue
+                seen.add(email)
+                yield item
+        finally:
+            stop.set()
+    
+    def _scan_users(self, fields=USER_SUMMARY_FIELDS, shards=None, query=None):
+        """shards berilsa (yoki config'da "scan_shards" bo'lsa) sharded, aks holda oddiy skan"""
+        shards = shards or self.config.get('scan_shards')
+        if shards and shards > 1:
+            return self.iter_users_sharded(fields=fields, shards=shards, query=query)
+        return self.iter_users(fields=fields, query=query)
+    
+    @property
+    def mirror(self):
+        """Directory'ning lokal nusxasi (birinchi murojaatda ochiladi)"""
+        if self._mirror is None:
+            self._mirror = DirectoryMirror(self.config.get('mirror_file', 'workspace_directory.db'))
+        return self._mirror
+    
+    def sync_mirror(self, shards=None):
+        """Lokal nusxani Directory bilan sinxronlash
+        
+        users().list updatedMin filtrini qo'llab-quvvatlamaydi, shuning uchun
+        avval faqat id va etag skan qilinadi, so'ng etag'i o'zgargan
+        foydalanuvchilargina batch get orqali to'liq olinadi. Bo'sh nusxa
+        uchun bitta to'liq skan bajariladi.
+        """
+        started = time.time()
+        known = self.mirror.etags()
+        stats = {'added': 0, 'updated': 0, 'removed': 0}
+        
+        if not known:
+            pending = []
+            for user in self._scan_users(fields=MIRROR_FIELDS, shards=shards):
+                pending.append(user)
+                if len(pending) >= MAX_PAGE_SIZE:
+                    self._mirror_write('upsert_many', pending)
+                    stats['added'] += len(pending)
+                    pending = []
+            self._mirror_write('upsert_many', pending)
+            stats['added'] += len(pending)
+        else:
+            changed = []
+            seen = set()
+            for user in self._scan_users(fields='id,etag', shards=shards):
+                seen.add(user['id'])
+                if known.get(user['id']) != user.get('etag'):
+                    changed.append(user['id'])
+            removed = [user_id for user_id in known if user_id not in seen]
             
-            users = response.get('users', [])
+            for fetched, missing in self._fetch_users(changed):
+                for user in fetched:
+                    stats['added' if user['id'] not in known else 'updated'] += 1
+                # Skan va get orasida o'chirilganlar
+                removed.extend(missing)
+                self._mirror_write('upsert_many', fetched)
             
-            users_info = []
-            for user in users:
-                users_info.append({
-                    'email': user['primaryEmail'],
-                    'name': user['name']['fullName'],
-                    'suspended': user.get('suspended', False),
-                    'created_time': user.get('creationTime'),
-                    'last_login': user.get('lastLoginTime')
-                })
+            self._mirror_write('remove_many', removed)
+            stats['removed'] = len(removed)
+        
+        # Sinxronizatsiya paytidagi o'zgarishlar keyingi safar olinadi
+        self.mirror.mark_synced(started)
+        self.logger.info(
+            f"Mirror synced: {stats['added']} added, {stats['updated']} updated, "
+            f"{stats['removed']} removed")
+        return stats
+    
+    def watch_directory(self, **options):
+        """Lokal nusxani users().watch push xabarlari bilan yangilab turish
+        
+        config'dagi "watch_address" (Google yuboradigan public manzil),
+        "watch_host" va "watch_port" (lokal receiver) ishlatiladi. Ishga
+        tushgan DirectoryWatch qaytadi; to'xtatish uchun stop() yoki "with".
+        Parametrlar uchun directory_watch.DirectoryWatch'ga qarang.
+        """
+        from directory_watch import DirectoryWatch
+        
+        options.setdefault('address', self.config.get('watch_address'))
+        options.setdefault('host', self.config.get('watch_host', '127.0.0.1'))
+        options.setdefault('port', self.config.get('watch_port', 0))
+        return DirectoryWatch(self, **options).start()
+    
+    def _fetch_users(self, user_ids, fields=MIRROR_FIELDS):
+        """Foydalanuvchilarni id bo'yicha batch get bilan olish
+        
+        Har bir batch uchun (olingan foydalanuvchilar, topilmagan id'lar) juftligi qaytariladi.
+        """
+        user_ids = list(user_ids)
+        requests = [self._users().get(userKey=user_id, fields=fields) for user_id in user_ids]
+        for outcomes in self._execute_batch(requests):
+            fetched = []
+            missing = []
+            for index, user, error in outcomes:
+                if error is None:
+                    fetched.append(user)
+                elif isinstance(error, HttpError) and error.resp.status == 404:
+                    missing.append(user_ids[index])
+                else:
+                    raise error
+            yield fetched, missing
+    
+    def _mirror_write(self, operation, users):
+        """Lokal nusxaga yozish (vaqti "local_io_seconds" metrikasiga yoziladi)"""
+        with self.metrics.timer('local_io_seconds', operation=f"mirror_{operation}"):
+            getattr(self.mirror, operation)(users)
+        self._mirror_version += 1
+    
+    def _mirror_write_through(self, operation, items):
+        """Script o'zi bajargan o'zgarishni lokal nusxaga ham yozish
+        
+        Nusxa mavjud bo'lsagina (ochilgan yoki fayli bor) yangilanadi - aks
+        holda birinchi sync_mirror baribir to'liq skan qiladi. Nusxaga
+        yozishdagi xato API natijasini o'zgartirmaydi.
+        """
+        items = list(items)
+        if operation == 'patch_many':
+            items = [(email, fields) for email, fields in
+                     ((email, _mirrored_fields(fields)) for email, fields in items) if fields]
+        if not items:
+            return
+        if self._mirror is None and not os.path.exists(
+                self.config.get('mirror_file', 'workspace_directory.db')):
+            return
+        try:
+            self._mirror_write(operation, items)
+        except Exception as e:
+            self.logger.warning(f"Mirror {operation} failed: {str(e)}")
+    
+    @staticmethod
+    def _mirror_record(user_id, user_body):
+        """insert so'rovi tanasidan lokal nusxa yozuvi
+        
+        etag'siz saqlanadi - keyingi sync_mirror foydalanuvchini API'dan to'liq oladi.
+        """
+        name = user_body['name']
+        return {
+            'id': user_id,
+            'primaryEmail': user_body['primaryEmail'],
+            'name': dict(name, fullName=f"{name['givenName']} {name['familyName']}"),
+            'suspended': user_body.get('suspended', False),
+            'orgUnitPath': user_body.get('orgUnitPath', '/'),
+            'creationTime': format_time(int(time.time() * 1000)),
+            # Google hech kirmagan foydalanuvchi uchun shu qiymatni qaytaradi
+            'lastLoginTime': '1970-01-01T00:00:00.000Z'
+        }
+    
+    def _fresh_mirror(self, max_staleness, shards=None):
+        """Nusxa max_staleness soniyadan eski bo'lsa, uni yangilab qaytarish"""
+        age = self.mirror.age()
+        if age is None or age > max_staleness:
+            self.sync_mirror(shards=shards)
+        return self.mirror
+    
+    def directory_index(self, max_staleness=None):
+        """Lokal nusxa ustidagi so'rov indekslari (directory_query.DirectoryIndex)
+        
+        Nusxa hech sinxronlanmagan yoki max_staleness (config'dagi
+        "mirror_max_staleness") soniyadan eski bo'lsa, avval sync_mirror
+        bajariladi. Indeks nusxa o'zgargandagina (sync_mirror, watch yoki
+        boshqa jarayon yozganda) qayta quriladi.
+        """
+        if max_staleness is None:
+            max_staleness = self.config.get('mirror_max_staleness', float('inf'))
+        mirror = self._fresh_mirror(max_staleness)
+        
+        with self._index_lock:
+            # Versiya qurishdan oldin olinadi - qurish paytidagi yozuvlar keyingi so'rovda hisobga olinadi
+            version = (self._mirror_version, mirror.data_version())
+            if self._index is None or self._index[0] != version:
+                with self.metrics.timer('local_io_seconds', operation='index_build'):
+                    index = DirectoryIndex.from_users(mirror.iter_users())
+                self._index = (version, index)
+                self.logger.info(f"Directory index built for {len(index)} users")
+            return self._index[1]
+    
+    def query_users(self, max_staleness=None, limit=None, **filters):
+        """Lokal nusxadan shartlar bo'yicha foydalanuvchilar - API'ga murojaatsiz
+        
+        Shartlar: org_unit, include_children, suspended, last_login_after,
+        last_login_before, created_after, created_before, prefix
+        (directory_query.DirectoryIndex.query'ga qarang).
+        Misol ("/Sales"da 1-martdan beri kirmaganlar):
+            creator.query_users(org_unit='/Sales', last_login_before='2026-03-01')
+        """
+        index = self.directory_index(max_staleness)
+        with self.metrics.timer('query_seconds'):
+            return index.query(limit=limit, **filters)
+    
+    def iter_user_summaries(self, shards=None, query=None):
+        """list_users lug'atlari oqimi - har doim to'g'ridan-to'g'ri API skanidan
+        
+        list_users'dan farqi: lokal nusxa ishlatilmaydi, query (masalan,
+        "orgUnitPath=/Sales") qabul qilinadi va xatolar yutilmaydi.
+        """
+        for user in self._scan_users(shards=shards, query=query):
+            yield self._user_summary(user)
+    
+    @staticmethod
+    def _user_summary(user):
+        """list_users natijasi uchun qisqa ma'lumot"""
+        return {
+            'email': user['primaryEmail'],
+            'name': user['name']['fullName'],
+            'suspended': user.get('suspended', False),
+            'created_time': user.get('creationTime'),
+            'last_login': user.get('lastLoginTime')
+        }
+    
+    def list_users(self, shards=None, max_staleness=None, as_table=False):
+        """Barcha foydalanuvchilarni ko'rsatish
+        
+        shards > 1 bo'lsa, domen parallel shard'lar bilan skanerlanadi.
+        max_staleness (yoki config'dagi "mirror_max_staleness") berilsa,
+        natija shu soniyadan eski bo'lmagan lokal nusxadan o'qiladi.
+        as_table=True bo'lsa, lug'atlar ro'yxati o'rniga ixcham ustunli
+        UserTable qaytadi (katta domenlarda xotira va GC vaqtini tejaydi).
+        """
+        if max_staleness is None:
+            max_staleness = self.config.get('mirror_max_staleness')
+        
+        try:
+            if max_staleness is not None:
+                users = self._fresh_mirror(max_staleness, shards).iter_users()
+            else:
+                users = self._scan_users(shards=shards)
+            
+            if as_table:
+                users_info = UserTable.from_users(users)
+            else:
+                users_info = [self._user_summary(user) for user in users]
             
             self.logger.info(f"Found {len(users_info)} users in domain {self.domain}")
             return users_info
             
         except Exception as e:
             self.logger.error(f"Error listing users: {str(e)}")
-            return []
+            return UserTable() if as_table else []
     
     def delete_user(self, email):
         """Foydalanuvchini o'chirish"""
         if not self.service:
             self.authenticate()
         
+        started = time.perf_counter()
+        stats = {}
         try:
-            self.service.users().delete(userKey=email).execute()
+            self._execute(self._users().delete(userKey=email), stats)
             
-            # Config'dan ham o'chirish
-            self.config['created_users'] = [
-                user for user in self.config['created_users'] 
-                if user['email'] != email
-            ]
-            self.save_config()
+            # Reestrdan ham o'chirish
+            with self.metrics.timer('local_io_seconds', operation='ledger_remove'):
+                self.ledger.remove(email)
+            self._mirror_write_through('remove_emails', [email])
             
             self.logger.info(f"Successfully deleted user: {email}")
-            return {'success': True, 'message': f"User {email} deleted"}
+            result = {'success': True, 'message': f"User {email} deleted"}
             
         except Exception as e:
             error_msg = f"Error deleting user {email}: {str(e)}"
             self.logger.error(error_msg)
-            return {'success': False, 'error': error_msg}
+            result = {'success': False, 'error': error_msg}
+        
+        self._audit_result('delete_user', email, result, started, stats)
+        return _with_retry_stats(result, stats)
     
     def update_user(self, email, updates):
-        """Foydalanuvchi ma'lumotlarini yangilash"""
+        """Foydalanuvchi ma'lumotlarini yangilash
+        
+        Bir nechta maydon o'zgarsa (config'dagi "patch_max_keys", standart 5),
+        users().patch ishlatiladi - faqat berilgan maydonlar yuboriladi va yoziladi.
+        """
         if not self.service:
             self.authenticate()
         
+        started = time.perf_counter()
+        stats = {}
         try:
-            self.service.users().update(userKey=email, body=updates).execute()
+            if len(updates) <= self.config.get('patch_max_keys', PATCH_MAX_KEYS):
+                request = self._users().patch(userKey=email, body=updates)
+            else:
+                request = self._users().update(userKey=email, body=updates)
+            self._execute(request, stats)
+            self._mirror_write_through('patch_many', [(email, updates)])
             self.logger.info(f"Successfully updated user: {email}")
-            return {'success': True, 'message': f"User {email} updated"}
+            result = {'success': True, 'message': f"User {email} updated"}
             
         except Exception as e:
             error_msg = f"Error updating user {email}: {str(e)}"
             self.logger.error(error_msg)
-            return {'success': False, 'error': error_msg}
+            result = {'success': False, 'error': error_msg}
+        
+        self._audit_result('update_user', email, result, started, stats,
+                           changed_fields=sorted(updates))
+        return _with_retry_stats(result, stats)
+    
+    def select_users(self, query=None, inactive_days=None, suspended=None, shards=None):
+        """Offboarding uchun foydalanuvchilar email'lari (bitta field-masked skan)
+        
+        query - users().list query (masalan, "orgUnitPath=/Contractors").
+        inactive_days berilsa, faqat shuncha kundan beri kirmaganlar tanlanadi
+        (hech kirmagan bo'lsa - shuncha kundan oldin yaratilganlar): Directory
+        qidiruvida lastLoginTime filtri yo'q, shuning uchun u skan paytida
+        tekshiriladi. suspended=False - faqat faol foydalanuvchilar.
+        Admin email hech qachon tanlanmaydi.
+        """
+        cutoff = None
+        if inactive_days is not None:
+            cutoff = (time.time() - inactive_days * 86400) * 1000
+        admin_email = (self.config.get('admin_email') or '').lower()
+        
+        emails = []
+        for user in self._scan_users(fields=OFFBOARD_FIELDS, shards=shards, query=query):
+            email = user['primaryEmail']
+            if email.lower() == admin_email:
+                continue
+            if suspended is not None and user.get('suspended', False) != suspended:
+                continue
+            if cutoff is not None:
+                # Google hech kirmagan foydalanuvchi uchun 1970-01-01 qaytaradi
+                last_seen = parse_time(user.get('lastLoginTime'))
+                if last_seen <= 0:
+                    last_seen = parse_time(user.get('creationTime'))
+                if last_seen > cutoff:
+                    continue
+            emails.append(email)
+        
+        self.logger.info(f"Selected {len(emails)} users (query={query!r}, "
+                         f"inactive_days={inactive_days})")
+        return emails
+    
+    def _offboard(self, operation, emails, build_request, batch_size=None, workers=None,
+                  done_statuses=()):
+        """suspend/delete uchun umumiy oqim: batch (yoki thread pool) so'rovlar va audit
+        
+        workers berilsa va batch_size berilmasa, so'rovlar thread pool'da, aks
+        holda batch'larda yuboriladi. Natijalar emails tartibida.
+        """
+        if not self.service:
+            self.authenticate()
+        
+        verb = {'suspend_user': 'suspended', 'delete_user': 'deleted'}[operation]
+        results = [None] * len(emails)
+        
+        def record(index, error, started, stats):
+            email = emails[index]
+            if error is None or (isinstance(error, HttpError)
+                                 and error.resp.status in done_statuses):
+                result = {'success': True, 'email': email, 'message': f"User {email} {verb}"}
+            else:
+                error_msg = f"Error in {operation} for {email}: {str(error)}"
+                self.logger.error(error_msg)
+                result = {'success': False, 'email': email, 'error': error_msg}
+            self._audit_result(operation, email, result, started, stats, bulk=True)
+            results[index] = _with_retry_stats(result, stats)
+        
+        batch_size = batch_size or self.config.get('batch_size')
+        workers = workers or self.config.get('workers')
+        if workers and not batch_size:
+            def execute(index):
+                stats = {}
+                started = time.perf_counter()
+                try:
+                    self._execute(build_request(emails[index]), stats)
+                    error = None
+                except Exception as e:
+                    error = e
+                return index, error, started, stats
+            
+            for outcome in self._run_concurrent(execute, range(len(emails)), workers):
+                record(*outcome)
+        else:
+            retry_stats = {}
+            started = time.perf_counter()
+            requests = [build_request(email) for email in emails]
+            for outcomes in self._execute_batch(requests, batch_size, retry_stats):
+                for index, _, error in outcomes:
+                    record(index, error, started, retry_stats.get(index, {}))
+                started = time.perf_counter()
+        
+        succeeded = sum(result['success'] for result in results)
+        self.logger.info(f"{operation}: {succeeded} {verb}, {len(results) - succeeded} failed")
+        return results
+    
+    def _offboard_targets(self, emails, query, inactive_days, shards, suspended=None):
+        """Berilgan email'lar (takrorlanmas) yoki select_users natijasi"""
+        if emails is None:
+            return self.select_users(query=query, inactive_days=inactive_days,
+                                     suspended=suspended, shards=shards)
+        return list(dict.fromkeys(email.strip() for email in emails if email.strip()))
+    
+    def suspend_users(self, emails=None, query=None, inactive_days=None, batch_size=None,
+                      workers=None, shards=None):
+        """Ko'p foydalanuvchilarni to'xtatish (users().patch batch'lari)
+        
+        emails berilmasa, foydalanuvchilar select_users(query, inactive_days)
+        bilan tanlanadi - allaqachon to'xtatilganlar o'tkazib yuboriladi.
+        Misol (180 kundan beri kirmaganlar):
+            creator.suspend_users(inactive_days=180)
+        """
+        emails = self._offboard_targets(emails, query, inactive_days, shards, suspended=False)
+        users = self._users()
+        with self._profile('suspend_users'):
+            results = self._offboard(
+                'suspend_user', emails,
+                lambda email: users.patch(userKey=email, body={'suspended': True}),
+                batch_size, workers)
+            self._mirror_write_through('patch_many', (
+                (result['email'], {'suspended': True}) for result in results if result['success']))
+            return results
+    
+    def delete_users(self, emails=None, workers=None, batch_size=None, query=None,
+                     inactive_days=None, shards=None, suspend_first=False):
+        """Ko'p foydalanuvchilarni o'chirish (batch so'rovlar, workers berilsa - thread pool)
+        
+        emails berilmasa, foydalanuvchilar select_users(query, inactive_days)
+        bilan tanlanadi. suspend_first=True - ikki bosqich: avval hammasi
+        to'xtatiladi (kirish darhol yopiladi), keyin faqat to'xtatilganlar
+        o'chiriladi. Allaqachon o'chirilgan (404) foydalanuvchi muvaffaqiyat
+        hisoblanadi. Reestrdan o'chirish oxirida bitta tranzaksiyada bajariladi.
+        """
+        emails = self._offboard_targets(emails, query, inactive_days, shards)
+        users = self._users()
+        with self._profile('delete_users'):
+            results = {}
+            targets = emails
+            if suspend_first:
+                suspended = self._offboard(
+                    'suspend_user', emails,
+                    lambda email: users.patch(userKey=email, body={'suspended': True}),
+                    batch_size, workers)
+                results = {result['email']: result for result in suspended if not result['success']}
+                targets = [result['email'] for result in suspended if result['success']]
+                self._mirror_write_through(
+                    'patch_many', ((email, {'suspended': True}) for email in targets))
+            
+            deleted = self._offboard('delete_user', targets,
+                                     lambda email: users.delete(userKey=email),
+                                     batch_size, workers, done_statuses=(404,))
+            results.update((result['email'], result) for result in deleted)
+            
+            with self.metrics.timer('local_io_seconds', operation='ledger_remove'):
+                removed = self.ledger.remove_many(
+                    result['email'] for result in deleted if result['success'])
+            self.logger.info(f"Removed {removed} users from the ledger")
+            self._mirror_write_through(
+                'remove_emails', (result['email'] for result in deleted if result['success']))
+            return [results[email] for email in emails]
+    
+    def update_users(self, updates_by_email, workers=None):
+        """Ko'p foydalanuvchilarni yangilash
+        
+        updates_by_email - {email: updates} lug'ati yoki (email, updates) juftliklari
+        """
+        if isinstance(updates_by_email, dict):
+            updates_by_email = updates_by_email.items()
+        
+        def update(item):
+            email, updates = item
+            return self.update_user(email, updates)
+        
+        workers = workers or self.config.get('workers')
+        with self._profile('update_users'):
+            if workers:
+                return self._run_concurrent(update, updates_by_email, workers)
+            return [update(item) for item in updates_by_email]
+    
+    def group_email(self, name):
+        """Bo'lim nomidan guruh manzili: "Human Resources" -> human-resources@domain"""
+        return f"{'-'.join(name.strip().lower().split())}@{self.domain}"
+    
+    def iter_groups(self):
+        """Domen guruhlarini sahifama-sahifa qaytarish (generator)"""
+        if not self.service:
+            self.authenticate()
+        
+        page_token = None
+        while True:
+            response = self._execute(self._resource('groups').list(
+                domain=self.domain,
+                maxResults=MAX_GROUP_PAGE_SIZE,
+                pageToken=page_token,
+                fields='nextPageToken,groups(email,name)'
+            ))
+            yield from response.get('groups', [])
+            
+            page_token = response.get('nextPageToken')
+            if not page_token:
+                break
+    
+    def iter_group_members(self, group_email):
+        """Guruh a'zolarini sahifama-sahifa qaytarish (generator)"""
+        if not self.service:
+            self.authenticate()
+        
+        page_token = None
+        while True:
+            response = self._execute(self._resource('members').list(
+                groupKey=group_email,
+                maxResults=MAX_GROUP_PAGE_SIZE,
+                pageToken=page_token,
+                fields='nextPageToken,members(email,role)'
+            ))
+            yield from response.get('members', [])
+            
+            page_token = response.get('nextPageToken')
+            if not page_token:
+                break
+    
+    def _existing_groups(self, refresh=False):
+        """Domendagi guruh manzillari to'plami (bir marta o'qilib keshlanadi)"""
+        with self._group_lock:
+            groups = self._group_cache
+        if groups is None or refresh:
+            groups = {group['email'].lower() for group in self.iter_groups()}
+            with self._group_lock:
+                self._group_cache = groups
+        return groups
+    
+    def group_members(self, group_email, refresh=False):
+        """Guruh a'zolari email'lari to'plami (bir marta o'qilib keshlanadi)"""
+        key = group_email.lower()
+        with self._group_lock:
+            members = self._member_cache.get(key)
+        if members is None or refresh:
+            members = {member['email'].lower() for member in self.iter_group_members(group_email)
+                       if member.get('email')}
+            with self._group_lock:
+                self._member_cache[key] = members
+        return members
+    
+    def create_groups(self, groups, batch_size=None):
+        """Guruhlar yaratish (groups().insert batch'lari)
+        
+        groups - email'lar yoki {'email', 'name', 'description'} lug'atlari.
+        Mavjud guruhlar API'ga so'rov yubormasdan o'tkazib yuboriladi.
+        """
+        existing = self._existing_groups()
+        
+        results = []
+        bodies = []
+        seen = set()
+        for group in groups:
+            body = {'email': group} if isinstance(group, str) else dict(group)
+            email = body['email'].lower()
+            if email in existing or email in seen:
+                results.append({'success': True, 'email': email, 'created': False,
+                                'message': f"Group {email} already exists"})
+                continue
+            body.setdefault('name', email.split('@')[0])
+            seen.add(email)
+            bodies.append(body)
+        
+        requests = [self._resource('groups').insert(body=body) for body in bodies]
+        for outcomes in self._execute_batch(requests, batch_size):
+            for index, _, error in outcomes:
+                email = bodies[index]['email'].lower()
+                if error is None or (isinstance(error, HttpError) and error.resp.status == 409):
+                    with self._group_lock:
+                        existing.add(email)
+                        self._member_cache.setdefault(email, set())
+                    self.logger.info(f"Group ready: {email}")
+                    results.append({'success': True, 'email': email, 'created': error is None,
+                                    'message': f"Group {email} created"})
+                else:
+                    error_msg = f"Error creating group {email}: {str(error)}"
+                    self.logger.error(error_msg)
+                    results.append({'success': False, 'email': email, 'error': error_msg})
+        return results
+    
+    @staticmethod
+    def _membership_pairs(memberships):
+        """{group: [members]} yoki (group, member) juftliklarini takrorlanmas juftliklarga o'tkazish"""
+        if isinstance(memberships, dict):
+            memberships = [(group, member) for group, members in memberships.items()
+                           for member in members]
+        return list(dict.fromkeys((group.lower(), member.lower()) for group, member in memberships))
+    
+    def _change_members(self, operation, memberships, batch_size, build_request, skip,
+                        update_cache, done_statuses):
+        """a'zo qo'shish/o'chirish uchun umumiy oqim: keshdan diff, batch, audit"""
+        if not self.service:
+            self.authenticate()
+        
+        stats = {'changed': 0, 'skipped': 0, 'failed': 0, 'errors': []}
+        
+        def failed(group, member, error):
+            error_msg = f"Error in {operation} {member} ({group}): {str(error)}"
+            self.logger.error(error_msg)
+            stats['failed'] += 1
+            stats['errors'].append({'success': False, 'email': member, 'group': group,
+                                    'error': error_msg})
+        
+        targets = []
+        unavailable = {}
+        for group, member in self._membership_pairs(memberships):
+            if group in unavailable:
+                failed(group, member, unavailable[group])
+                continue
+            try:
+                members = self.group_members(group)
+            except HttpError as e:
+                unavailable[group] = e
+                failed(group, member, e)
+                continue
+            if skip(member, members):
+                stats['skipped'] += 1
+            else:
+                targets.append((group, member))
+        
+        requests = [build_request(group, member) for group, member in targets]
+        retry_stats = {}
+        started = time.perf_counter()
+        for outcomes in self._execute_batch(requests, batch_size, retry_stats):
+            for index, _, error in outcomes:
+                group, member = targets[index]
+                if error is None or (isinstance(error, HttpError)
+                                     and error.resp.status in done_statuses):
+                    with self._group_lock:
+                        update_cache(self._member_cache[group], member)
+                    stats['changed'] += 1
+                    outcome = 'success'
+                else:
+                    failed(group, member, error)
+                    outcome = 'failure'
+                self._audit(operation, member, outcome, started, group=group,
+                            retries=retry_stats.get(index, {}).get('retries'))
+            started = time.perf_counter()
+        
+        self.logger.info(
+            f"{operation}: {stats['changed']} changed, {stats['skipped']} skipped, "
+            f"{stats['failed']} failed")
+        return stats
+    
+    def add_group_members(self, memberships, role='MEMBER', batch_size=None):
+        """Ko'p guruhlarga ko'p a'zolar qo'shish (members().insert batch'lari)
+        
+        memberships - {group_email: [member_email, ...]} yoki (group, member) juftliklari.
+        Har bir guruh a'zolari bir marta o'qilib keshlanadi; mavjud a'zoliklar
+        API'ga so'rov yubormasdan o'tkazib yuboriladi.
+        Natija: {'changed', 'skipped', 'failed', 'errors'}
+        """
+        return self._change_members(
+            'add_group_member', memberships, batch_size,
+            lambda group, member: self._resource('members').insert(
+                groupKey=group, body={'email': member, 'role': role}),
+            skip=lambda member, members: member in members,
+            update_cache=set.add,
+            done_statuses=(409,))
+    
+    def remove_group_members(self, memberships, batch_size=None):
+        """Ko'p guruhlardan a'zolarni o'chirish (members().delete batch'lari)
+        
+        Guruhda bo'lmagan a'zolar API'ga so'rov yubormasdan o'tkazib yuboriladi.
+        """
+        return self._change_members(
+            'remove_group_member', memberships, batch_size,
+            lambda group, member: self._resource('members').delete(
+                groupKey=group, memberKey=member),
+            skip=lambda member, members: member not in members,
+            update_cache=set.discard,
+            done_statuses=(404,))
+    
+    def sync_department_groups(self, source, department_column='department',
+                               row_mapper=default_row_mapper, create_missing=True, batch_size=None):
+        """CSV/JSONL fayldagi bo'lim ustuni bo'yicha foydalanuvchilarni bo'lim guruhlariga qo'shish
+        
+        Har bir bo'lim uchun group_email(bo'lim) guruhi ishlatiladi (create_missing
+        bo'lsa, yo'q guruhlar yaratiladi). Foydalanuvchi manzili row_mapper
+        natijasidan import bilan bir xil tarzda aniqlanadi.
+        """
+        groups = {}
+        memberships = []
+        for _, row in iter_rows(source):
+            department = (row.get(department_column) or '').strip()
+            if not department:
+                continue
+            user = row_mapper(row)
+            group = self.group_email(department)
+            groups.setdefault(group, {'email': group, 'name': department})
+            memberships.append(
+                (group, self.user_email(user['first_name'], user['last_name'], user.get('username'))))
+        
+        if create_missing:
+            for result in self.create_groups(groups.values(), batch_size):
+                if not result['success']:
+                    self.logger.error(result['error'])
+        
+        return self.add_group_members(memberships, batch_size=batch_size)
     
     def export_users_to_file(self, filename="created_users.json"):
         """Yaratilgan foydalanuvchilarni faylga eksport qilish"""
         try:
             with open(filename, 'w') as f:
-                json.dump(self.config['created_users'], f, indent=2)
+                json.dump(list(self.ledger.iter_users()), f, indent=2)
             
             self.logger.info(f"Users exported to {filename}")
             return True
@@ -255,21 +1871,46 @@ class WorkspaceEmailCreator:
             self.logger.error(f"Error exporting users: {str(e)}")
             return False
     
-    def get_domain_info(self):
-        """Domen haqida ma'lumot olish"""
-        if not self.service:
-            self.authenticate()
+    def export_directory(self, filename, fields=EXPORT_FIELDS, query=None, **options):
+        """Domendagi barcha foydalanuvchilarni faylga oqim sifatida eksport qilish
+        
+        Format fayl kengaytmasidan aniqlanadi (.csv, .jsonl, .gz). To'xtagan
+        eksport keyingi chaqiruvda oxirgi yozilgan sahifadan davom etadi.
+        Parametrlar uchun directory_export.DirectoryExport'ga qarang.
+        """
+        with self._profile('export_directory'):
+            return DirectoryExport(self, filename, fields=fields, query=query, **options).run()
+    
+    def get_domain_info(self, shards=None, max_staleness=None, table=None):
+        """Domen haqida ma'lumot olish
+        
+        table (list_users(as_table=True) natijasi) berilsa, hisoblagichlar
+        API'ga murojaat qilmasdan shu jadvaldan olinadi.
+        """
+        if max_staleness is None:
+            max_staleness = self.config.get('mirror_max_staleness')
         
         try:
-            # Domen foydalanuvchilarini sanash
-            users = self.list_users()
+            if table is not None:
+                summary = table.summary()
+                total_users, suspended_users = summary['total_users'], summary['suspended_users']
+            elif max_staleness is not None:
+                total_users, suspended_users = self._fresh_mirror(max_staleness, shards).count()
+            else:
+                # Domen foydalanuvchilarini ro'yxatni saqlamasdan sanash
+                total_users = 0
+                suspended_users = 0
+                for user in self._scan_users(fields='suspended', shards=shards):
+                    total_users += 1
+                    if user.get('suspended', False):
+                        suspended_users += 1
             
             domain_info = {
                 'domain': self.domain,
-                'total_users': len(users),
-                'active_users': len([u for u in users if not u['suspended']]),
-                'suspended_users': len([u for u in users if u['suspended']]),
-                'created_by_script': len(self.config['created_users']),
+                'total_users': total_users,
+                'active_users': total_users - suspended_users,
+                'suspended_users': suspended_users,
+                'created_by_script': self.ledger.count(),
                 'last_check': datetime.now().isoformat()
             }
             
@@ -287,6 +1928,10 @@ def main():
     # Email creator'ni yaratish
     creator = WorkspaceEmailCreator(DOMAIN)
     
+    # Prometheus /metrics endpoint'i (config'da "metrics_port" berilsa)
+    if creator.config.get('metrics_port'):
+        creator.metrics.serve(creator.config['metrics_port'])
+    
     print("🚀 Google Workspace Email Creator")
     print(f"📧 Domain: {DOMAIN}")
     print("=" * 50)
@@ -299,9 +1944,10 @@ def main():
         print("4. Domen ma'lumotlari")
         print("5. Foydalanuvchini o'chirish")
         print("6. Eksport qilish")
+        print("7. HR ro'yxati bilan reconcile")
         print("0. Chiqish")
         
-        choice = input("\nTanlovingiz (0-6): ").strip()
+        choice = input("\nTanlovingiz (0-7): ").strip()
         
         if choice == "1":
             # Bitta foydalanuvchi yaratish
@@ -402,7 +2048,32 @@ def main():
             else:
                 print("❌ Eksport qilishda xato!")
         
+        elif choice == "7":
+            # Desired-state reconcile
+            source = input("\nHR ro'yxati fayli (CSV/JSONL): ").strip()
+            try:
+                plan = creator.plan_reconcile(source)
+            except (OSError, KeyError, ValueError) as e:
+                print(f"❌ Faylni o'qishda xato: {e}")
+                continue
+            
+            summary = plan.summary()
+            print(f"\n📋 Reja: {summary['create']} yaratish, {summary['update']} yangilash, "
+                  f"{summary['suspend']} to'xtatish, {summary['unchanged']} o'zgarishsiz")
+            
+            if not len(plan):
+                print("✅ Directory ro'yxat bilan bir xil.")
+            elif input("Rejani bajarish? (ha/yo'q): ").strip().lower() in ['ha', 'yes', 'y']:
+                stats = creator.apply_reconcile(plan)
+                print(f"✅ {stats['created']} yaratildi, {stats['updated']} yangilandi, "
+                      f"{stats['suspended']} to'xtatildi, {stats['failed']} xato")
+            else:
+                print("❌ Bekor qilindi.")
+        
         elif choice == "0":
+            # Ish yakunidagi metrikalar (config'da "metrics_file" berilsa)
+            if creator.config.get('metrics_file'):
+                creator.metrics.dump_json(creator.config['metrics_file'])
             print("👋 Xayr!")
             break
         